@@ -1,15 +1,20 @@
 from __future__ import annotations
 
 import collections
+import concurrent.futures
+import contextlib
+import io
 import itertools
 import functools
 import logging
+import pickle
 import random
 import secrets
 import typing  # this can go away when Python 3.8 support is dropped
 from argparse import Namespace
+from array import array
 from collections import Counter, deque
-from collections.abc import Collection, MutableSequence
+from collections.abc import Collection, ItemsView, KeysView, MutableSequence, ValuesView
 from enum import IntEnum, IntFlag
 from typing import (AbstractSet, Any, Callable, ClassVar, Dict, Iterable, Iterator, List, Mapping, NamedTuple,
                     Optional, Protocol, Set, Tuple, Union, Type)
@@ -22,6 +27,7 @@ import Utils
 
 if typing.TYPE_CHECKING:
     from worlds import AutoWorld
+    from Profiler import Profiler
 
 
 class Group(TypedDict):
@@ -68,6 +74,8 @@ class MultiWorld():
     is_race: bool = False
     precollected_items: Dict[int, List[Item]]
     state: CollectionState
+    region_sweeper: Optional[RegionSweeper] = None
+    profiler: Optional[Profiler] = None
 
     plando_options: PlandoOptions
     early_items: Dict[int, Dict[str, int]]
@@ -546,7 +554,14 @@ class MultiWorld():
         else:
             return all((self.has_beaten_game(state, p) for p in range(1, self.players + 1)))
 
-    def can_beat_game(self, starting_state: Optional[CollectionState] = None) -> bool:
+    def can_beat_game(self, starting_state: Optional[CollectionState] = None,
+                      locations: Optional[Iterable[Location]] = None) -> bool:
+        """
+        Check if the game can be beaten from starting_state by sweeping for progression.
+
+        :param starting_state: state to start from, defaults to an empty state
+        :param locations: locations to sweep, defaults to all locations. Only pass a subset if the others can't matter.
+        """
         if starting_state:
             if self.has_beaten_game(starting_state):
                 return True
@@ -555,7 +570,9 @@ class MultiWorld():
             state = CollectionState(self)
             if self.has_beaten_game(state):
                 return True
-        prog_locations = {location for location in self.get_locations() if location.item
+        if locations is None:
+            locations = self.get_locations()
+        prog_locations = {location for location in locations if location.item
                           and location.item.advancement and location not in state.locations_checked}
 
         while prog_locations:
@@ -667,6 +684,205 @@ class MultiWorld():
 PathValue = Tuple[str, Optional["PathValue"]]
 
 
+class CopyOnWriteDict(dict):
+    """
+    Per player dict of a CollectionState snapshot, which starts out sharing its values with the state it was copied
+    from. A shared value is only copied when it is first looked up with `[]`, as the caller may mutate it,
+    so players that are never looked at are never copied. Other dict operations copy all remaining values first.
+    """
+    __slots__ = ("shared",)
+    shared: Dict[int, Any]
+
+    def __init__(self, shared: Dict[int, Any]) -> None:
+        super().__init__()
+        self.shared = shared
+
+    def __missing__(self, key: int) -> Any:
+        self[key] = value = self.shared.pop(key).copy()
+        return value
+
+    def snapshot(self) -> Dict[int, Any]:
+        """Returns all current values without copying them, for another CopyOnWriteDict to share."""
+        values = self.shared.copy()
+        values.update(dict.items(self))
+        return values
+
+    def _copy_all(self) -> None:
+        for key in tuple(self.shared):
+            self[key]  # noqa
+
+    def __contains__(self, key: object) -> bool:
+        return dict.__contains__(self, key) or key in self.shared
+
+    def __iter__(self) -> Iterator[int]:
+        self._copy_all()
+        return super().__iter__()
+
+    def __len__(self) -> int:
+        return dict.__len__(self) + len(self.shared)
+
+    def __eq__(self, other: object) -> bool:
+        self._copy_all()
+        if isinstance(other, CopyOnWriteDict):
+            other._copy_all()
+        return super().__eq__(other)
+
+    def __repr__(self) -> str:
+        self._copy_all()
+        return super().__repr__()
+
+    def get(self, key: int, default: Any = None) -> Any:
+        return self[key] if key in self else default
+
+    def keys(self):
+        self._copy_all()
+        return super().keys()
+
+    def values(self):
+        self._copy_all()
+        return super().values()
+
+    def items(self):
+        self._copy_all()
+        return super().items()
+
+    def pop(self, key: int, *default: Any) -> Any:
+        self._copy_all()
+        return super().pop(key, *default)
+
+    def setdefault(self, key: int, default: Any = None) -> Any:
+        self._copy_all()
+        return super().setdefault(key, default)
+
+    def copy(self) -> Dict[int, Any]:
+        self._copy_all()
+        return super().copy()
+
+
+class ItemCounter(Counter):
+    """
+    Counter of item names for CollectionState.prog_items that keeps the counts of names interned in index in a
+    compact array, so copying it is a single memory copy. Names missing from index, like events, are counted in the
+    dict as in any Counter. All Counter methods work with names.
+    """
+    __slots__ = ("index", "counts")
+    index: Mapping[str, int]
+    """item name to position in counts, in the order of counts"""
+    counts: array
+
+    def __init__(self, index: Mapping[str, int], counts: Optional[array] = None) -> None:
+        super().__init__()
+        self.index = index
+        self.counts = array("i", [0]) * len(index) if counts is None else counts
+
+    def __getitem__(self, key: str) -> int:
+        position = self.index.get(key, None)
+        if position is None:
+            return dict.get(self, key, 0)
+        return self.counts[position]
+
+    def __setitem__(self, key: str, value: int) -> None:
+        position = self.index.get(key, None)
+        if position is None:
+            dict.__setitem__(self, key, value)
+        else:
+            self.counts[position] = value
+
+    def __delitem__(self, key: str) -> None:
+        position = self.index.get(key, None)
+        if position is not None:
+            self.counts[position] = 0
+        elif dict.__contains__(self, key):
+            dict.__delitem__(self, key)
+
+    def __contains__(self, key: object) -> bool:
+        position = self.index.get(key, None)
+        if position is None:
+            return dict.__contains__(self, key)
+        return self.counts[position] != 0
+
+    def __iter__(self) -> Iterator[str]:
+        for name, count in zip(self.index, self.counts):
+            if count:
+                yield name
+        yield from dict.__iter__(self)
+
+    def __len__(self) -> int:
+        return len(self.counts) - self.counts.count(0) + dict.__len__(self)
+
+    def __bool__(self) -> bool:
+        return any(self.counts) or dict.__len__(self) > 0
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        return {name: count for name, count in self.items() if count} == \
+            {name: count for name, count in other.items() if count}
+
+    def __ne__(self, other: object) -> bool:
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = None  # type: ignore
+
+    def __reduce__(self):
+        # the index belongs to the world, a receiving process gets the counts by name
+        return Counter, (dict(self.items()),)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({dict(self.items())!r})"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        position = self.index.get(key, None)
+        if position is None:
+            return dict.get(self, key, default)
+        return self.counts[position] or default
+
+    def keys(self) -> KeysView[str]:
+        return KeysView(self)
+
+    def values(self) -> ValuesView[int]:
+        return ValuesView(self)
+
+    def items(self) -> ItemsView[str, int]:
+        return ItemsView(self)
+
+    def pop(self, key: str, *default: Any) -> Any:
+        if key in self:
+            count = self[key]
+            del self[key]
+            return count
+        if default:
+            return default[0]
+        raise KeyError(key)
+
+    def setdefault(self, key: str, default: int = 0) -> int:
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, iterable: Any = None, /, **kwargs: int) -> None:
+        if isinstance(iterable, Mapping):
+            for name, count in iterable.items():
+                self[name] += count
+        elif iterable is not None:
+            for name in iterable:
+                self[name] += 1
+        for name, count in kwargs.items():
+            self[name] += count
+
+    def clear(self) -> None:
+        self.counts = array("i", [0]) * len(self.index)
+        dict.clear(self)
+
+    def copy(self) -> ItemCounter:
+        ret = ItemCounter(self.index, self.counts[:])
+        dict.update(ret, dict.items(self))
+        return ret
+
+    __copy__ = copy
+
+
 class CollectionState():
     prog_items: Dict[int, Counter[str]]
     multiworld: MultiWorld
@@ -676,11 +892,17 @@ class CollectionState():
     path: Dict[Union[Region, Entrance], PathValue]
     locations_checked: Set[Location]
     stale: Dict[int, bool]
+    collection_log: Dict[int, List[str]]
+    """per player, names of the items that changed state, in order of collection"""
+    region_epochs: Dict[int, Dict[Region, int]]
+    """per player, length of collection_log at the time each reachable region was found"""
+    per_player_attributes: ClassVar[Tuple[str, ...]] = (
+        "prog_items", "reachable_regions", "blocked_connections", "collection_log", "region_epochs")
     additional_init_functions: List[Callable[[CollectionState, MultiWorld], None]] = []
     additional_copy_functions: List[Callable[[CollectionState, CollectionState], CollectionState]] = []
 
     def __init__(self, parent: MultiWorld):
-        self.prog_items = {player: Counter() for player in parent.get_all_ids()}
+        self.prog_items = {player: self._new_item_counter(parent, player) for player in parent.get_all_ids()}
         self.multiworld = parent
         self.reachable_regions = {player: set() for player in parent.get_all_ids()}
         self.blocked_connections = {player: set() for player in parent.get_all_ids()}
@@ -688,12 +910,21 @@ class CollectionState():
         self.path = {}
         self.locations_checked = set()
         self.stale = {player: True for player in parent.get_all_ids()}
+        self.collection_log = {player: [] for player in parent.get_all_ids()}
+        self.region_epochs = {player: {} for player in parent.get_all_ids()}
         for function in self.additional_init_functions:
             function(self, parent)
         for items in parent.precollected_items.values():
             for item in items:
                 self.collect(item, True)
 
+    @staticmethod
+    def _new_item_counter(multiworld: MultiWorld, player: int) -> Counter[str]:
+        world = multiworld.worlds.get(player, None)
+        if world and world.interned_item_counts:
+            return ItemCounter(world.item_name_to_index)
+        return Counter()
+
     def update_reachable_regions(self, player: int):
         self.stale[player] = False
         world: AutoWorld.World = self.multiworld.worlds[player]
@@ -704,6 +935,7 @@ class CollectionState():
         # init on first call - this can't be done on construction since the regions don't exist yet
         if start not in reachable_regions:
             reachable_regions.add(start)
+            self.region_epochs[player][start] = 0  # reachable without any items
             self.blocked_connections[player].update(start.exits)
             queue.extend(start.exits)
 
@@ -715,6 +947,8 @@ class CollectionState():
     def _update_reachable_regions_explicit_indirect_conditions(self, player: int, queue: deque):
         reachable_regions = self.reachable_regions[player]
         blocked_connections = self.blocked_connections[player]
+        region_epochs = self.region_epochs[player]
+        epoch = len(self.collection_log[player])
         # run BFS on all connections, and keep track of those blocked by missing items
         while queue:
             connection = queue.popleft()
@@ -724,6 +958,7 @@ class CollectionState():
             elif connection.can_reach(self):
                 assert new_region, f"tried to search through an Entrance \"{connection}\" with no connected Region"
                 reachable_regions.add(new_region)
+                region_epochs[new_region] = epoch
                 blocked_connections.remove(connection)
                 blocked_connections.update(new_region.exits)
                 queue.extend(new_region.exits)
@@ -737,6 +972,8 @@ class CollectionState():
     def _update_reachable_regions_auto_indirect_conditions(self, player: int, queue: deque):
         reachable_regions = self.reachable_regions[player]
         blocked_connections = self.blocked_connections[player]
+        region_epochs = self.region_epochs[player]
+        epoch = len(self.collection_log[player])
         new_connection: bool = True
         # run BFS on all connections, and keep track of those blocked by missing items
         while new_connection:
@@ -749,6 +986,7 @@ class CollectionState():
                 elif connection.can_reach(self):
                     assert new_region, f"tried to search through an Entrance \"{connection}\" with no Region"
                     reachable_regions.add(new_region)
+                    region_epochs[new_region] = epoch
                     blocked_connections.remove(connection)
                     blocked_connections.update(new_region.exits)
                     queue.extend(new_region.exits)
@@ -758,12 +996,21 @@ class CollectionState():
             queue.extend(blocked_connections)
 
     def copy(self) -> CollectionState:
-        ret = CollectionState(self.multiworld)
-        ret.prog_items = {player: counter.copy() for player, counter in self.prog_items.items()}
-        ret.reachable_regions = {player: region_set.copy() for player, region_set in
-                                 self.reachable_regions.items()}
-        ret.blocked_connections = {player: entrance_set.copy() for player, entrance_set in
-                                   self.blocked_connections.items()}
+        """
+        Creates a snapshot of this state. Per player structures are shared between both states and each side only
+        copies a player's structures once it looks them up, so the cost scales with the players that are touched.
+        """
+        ret = self.__class__.__new__(self.__class__)
+        ret.multiworld = self.multiworld
+        for function in self.additional_init_functions:
+            function(ret, self.multiworld)
+        for attribute in self.per_player_attributes:
+            structures = getattr(self, attribute)
+            shared = structures.snapshot() if isinstance(structures, CopyOnWriteDict) else structures.copy()
+            # both sides go through a CopyOnWriteDict, so direct edits of either never reach the other
+            setattr(self, attribute, CopyOnWriteDict(shared.copy()))
+            setattr(ret, attribute, CopyOnWriteDict(shared))
+        ret.stale = {player: True for player in self.stale}
         ret.advancements = self.advancements.copy()
         ret.path = self.path.copy()
         ret.locations_checked = self.locations_checked.copy()
@@ -809,6 +1056,8 @@ class CollectionState():
         locations = {location for location in locations if location.advancement and location not in self.advancements}
 
         while reachable_advancements:
+            if self.multiworld.region_sweeper:
+                self.multiworld.region_sweeper.update_reachable_regions(self)
             reachable_advancements = {location for location in locations if location.can_reach(self)}
             locations -= reachable_advancements
             for advancement in reachable_advancements:
@@ -916,6 +1165,8 @@ class CollectionState():
         changed = self.multiworld.worlds[item.player].collect(self, item)
 
         self.stale[item.player] = True
+        if changed:
+            self.collection_log[item.player].append(item.name)
 
         if changed and not prevent_sweep:
             self.sweep_for_advancements()
@@ -925,10 +1176,225 @@ class CollectionState():
     def remove(self, item: Item):
         changed = self.multiworld.worlds[item.player].remove(self, item)
         if changed:
+            self._invalidate_after_removal(item.player, item.name)
+
+    def _invalidate_after_removal(self, player: int, item_name: str) -> None:
+        """Drops only the reachable regions of player that were found after item_name was last collected.
+
+        Regions found before that were reached without the removed copy of the item, so they stay reachable,
+        assuming logic is monotonic in collected items. If the collection can't be traced, everything is dropped."""
+        log = self.collection_log[player]
+        for index in range(len(log) - 1, -1, -1):
+            if log[index] == item_name:
+                break
+        else:
             # invalidate caches, nothing can be trusted anymore now
-            self.reachable_regions[item.player] = set()
-            self.blocked_connections[item.player] = set()
-            self.stale[item.player] = True
+            log.clear()
+            self.reachable_regions[player] = set()
+            self.blocked_connections[player] = set()
+            self.region_epochs[player] = {}
+            self.stale[player] = True
+            return
+        del log[index]
+
+        region_epochs = self.region_epochs[player]
+        kept = {region for region in self.reachable_regions[player] if region_epochs.get(region, index + 1) <= index}
+        if len(kept) == len(self.reachable_regions[player]):
+            return
+        self.reachable_regions[player] = kept
+        self.region_epochs[player] = {region: region_epochs[region] for region in kept}
+        self.blocked_connections[player] = {exit_ for region in kept for exit_ in region.exits
+                                            if exit_.connected_region not in kept}
+        self.stale[player] = True
+
+
+class RegionGraph(NamedTuple):
+    """Copy of a player's regions and entrances that can be sent to another process."""
+    origin: str
+    exits: Dict[str, List[Tuple[str, str, Optional[Callable[[CollectionState], bool]]]]]
+    """per region name, the name, connected region name and access rule of each exit. None means always passable"""
+    item_name_groups: Dict[str, Set[str]]
+
+
+class _RegionGraphPickler(pickle.Pickler):
+    """Refuses to pickle anything that would drag the multiworld along with an access rule."""
+    def persistent_id(self, obj: Any) -> None:
+        from worlds.AutoWorld import World
+        if isinstance(obj, (MultiWorld, CollectionState, Region, Entrance, Location, Item, World)):
+            raise pickle.PicklingError(f"access rule references {type(obj).__name__}")
+        return None
+
+
+class _RegionSweepState(CollectionState):
+    """Stand-in for a CollectionState inside a sweep worker, only knows about the items of a single player."""
+    def __init__(self, player: int, prog_items: Counter[str], item_name_groups: Dict[str, Set[str]],
+                 reached: Set[str]) -> None:
+        self.player = player
+        self.prog_items = {player: prog_items}
+        self.multiworld = Namespace(worlds={player: Namespace(item_name_groups=item_name_groups)})
+        self.reached = reached
+
+    def can_reach(self,
+                  spot: Union[Location, Entrance, Region, str],
+                  resolution_hint: Optional[str] = None,
+                  player: Optional[int] = None) -> bool:
+        if isinstance(spot, str) and resolution_hint in (None, "Region") and player == self.player:
+            return spot in self.reached
+        raise NotImplementedError(f"can_reach({spot!r}, {resolution_hint!r}, {player}) can't be resolved in a sweep")
+
+    def can_reach_region(self, spot: str, player: int) -> bool:
+        return self.can_reach(spot, "Region", player)
+
+
+_region_graphs: Dict[int, RegionGraph] = {}
+
+
+def _init_region_sweep_worker(graphs: Dict[int, RegionGraph]) -> None:
+    _region_graphs.update(graphs)
+
+
+def _sweep_regions(player: int, prog_items: Counter[str], reached: List[str]) -> List[Tuple[str, Optional[str]]]:
+    """Returns the regions found from reached in the order they were found, along with the entrance they were
+    found through. The origin region comes with no entrance if reached is empty."""
+    graph = _region_graphs[player]
+    found: List[Tuple[str, Optional[str]]] = []
+    if not reached:
+        reached = [graph.origin]
+        found.append((graph.origin, None))
+    state = _RegionSweepState(player, prog_items, graph.item_name_groups, set(reached))
+    queue = deque(exit_ for region in reached for exit_ in graph.exits[region])
+    new_connection: bool = True
+    while new_connection:
+        new_connection = False
+        blocked = []
+        while queue:
+            exit_ = queue.popleft()
+            name, target, rule = exit_
+            if target in state.reached:
+                continue
+            if rule is None or rule(state):
+                state.reached.add(target)
+                found.append((target, name))
+                queue.extend(graph.exits[target])
+                new_connection = True
+            else:
+                blocked.append(exit_)
+        # same as for the auto indirect conditions of CollectionState, give rules looking at regions another go
+        queue.extend(blocked)
+    return found
+
+
+class RegionSweeper:
+    """
+    Updates the reachable regions of all stale players of a CollectionState at once, in a pool of worker processes.
+    Only players whose regions and access rules can be sent to another process, like declarative rules compiled by
+    worlds.generic.CompiledRules, are swept this way. Everyone else stays stale and gets updated serially on their next
+    can_reach, as does a player whose rule fails in a worker from then on.
+    """
+    multiworld: MultiWorld
+    players: Set[int]
+    """players that can be swept by the workers"""
+    pool: Optional[concurrent.futures.ProcessPoolExecutor]
+
+    def __init__(self, multiworld: MultiWorld, processes: int) -> None:
+        self.multiworld = multiworld
+        graphs: Dict[int, RegionGraph] = {}
+        for player in multiworld.get_all_ids():
+            graph = self.get_region_graph(player)
+            if graph:
+                graphs[player] = graph
+            else:
+                logging.debug(f"Regions of {multiworld.get_player_name(player)} can't be swept in parallel.")
+        self.players = set(graphs)
+        self.pool = None
+        if len(graphs) > 1:
+            self.pool = concurrent.futures.ProcessPoolExecutor(processes, initializer=_init_region_sweep_worker,
+                                                               initargs=(graphs,))
+
+    def get_region_graph(self, player: int) -> Optional[RegionGraph]:
+        """Returns the region graph of player, or None if any of their regions or rules can't be shipped."""
+        world: AutoWorld.World = self.multiworld.worlds[player]
+        regions = self.multiworld.regions.region_cache[player]
+        if world.origin_region_name not in regions:
+            return None
+        exits: Dict[str, List[Tuple[str, str, Optional[Callable[[CollectionState], bool]]]]] = {}
+        pickler = _RegionGraphPickler(io.BytesIO(), pickle.HIGHEST_PROTOCOL)
+        for region in regions.values():
+            if type(region).can_reach is not Region.can_reach:
+                return None
+            region_exits = exits[region.name] = []
+            for exit_ in region.exits:
+                if type(exit_).can_reach is not Entrance.can_reach or not exit_.connected_region:
+                    return None
+                rule = exit_.__dict__.get("access_rule", None)
+                if rule is not None:
+                    try:
+                        pickler.dump(rule)
+                    except Exception:
+                        return None
+                region_exits.append((exit_.name, exit_.connected_region.name, rule))
+        return RegionGraph(world.origin_region_name, exits, world.item_name_groups)
+
+    @contextlib.contextmanager
+    def installed(self) -> Iterator[None]:
+        """Sweeps the multiworld's states for the duration of the with block, the workers are shut down after it even
+        if it raises."""
+        self.multiworld.region_sweeper = self
+        try:
+            yield
+        finally:
+            self.multiworld.region_sweeper = None
+            self.shutdown()
+
+    def update_reachable_regions(self, state: CollectionState) -> None:
+        """Updates all stale players of state that can be swept by the workers."""
+        players = [player for player in self.players if state.stale[player]]
+        if not self.pool or len(players) < 2:
+            return
+        sweeps = {player: self.pool.submit(_sweep_regions, player, state.prog_items[player],
+                                           [region.name for region in state.reachable_regions[player]])
+                  for player in players}
+        for player, sweep in sweeps.items():
+            try:
+                found = sweep.result()
+            except Exception as e:
+                logging.debug(f"Sweeping regions of {self.multiworld.get_player_name(player)} in parallel failed "
+                              f"({e!r}), falling back to serial sweeps.")
+                self.players.discard(player)
+                continue
+            self.apply(state, player, found)
+
+    def apply(self, state: CollectionState, player: int, found: List[Tuple[str, Optional[str]]]) -> None:
+        state.stale[player] = False
+        regions = self.multiworld.regions.region_cache[player]
+        entrances = self.multiworld.regions.entrance_cache[player]
+        reachable_regions = state.reachable_regions[player]
+        region_epochs = state.region_epochs[player]
+        epoch = len(state.collection_log[player])
+        new_regions: List[Region] = []
+        for region_name, entrance_name in found:
+            region = regions[region_name]
+            reachable_regions.add(region)
+            new_regions.append(region)
+            if entrance_name is None:
+                region_epochs[region] = 0  # reachable without any items
+                continue
+            region_epochs[region] = epoch
+            entrance = entrances[entrance_name]
+            if not entrance.hide_path and entrance not in state.path:
+                parent_region = entrance.parent_region
+                state.path[entrance] = (entrance.name, state.path.get(parent_region, (parent_region.name, None)))
+            state.path[region] = (region.name, state.path.get(entrance, None))
+        if new_regions:
+            blocked_connections = state.blocked_connections[player]
+            blocked_connections.update(exit_ for region in new_regions for exit_ in region.exits)
+            state.blocked_connections[player] = {connection for connection in blocked_connections
+                                                 if connection.connected_region not in reachable_regions}
+
+    def shutdown(self) -> None:
+        if self.pool:
+            self.pool.shutdown()
+            self.pool = None
 
 
 class Entrance:
@@ -1157,16 +1623,29 @@ class Location:
         self.address = address
         self.parent_region = parent
 
-    def can_fill(self, state: CollectionState, item: Item, check_access: bool = True) -> bool:
+    def can_fill(self, state: CollectionState, item: Item, check_access: bool = True,
+                 access_cache: Optional[Dict[Location, bool]] = None) -> bool:
+        """
+        :param access_cache: if given, the result of the access check is looked up in and remembered here,
+            so it has to be cleared whenever state changes.
+        """
         return ((
             self.always_allow(state, item)
             and item.name not in state.multiworld.worlds[item.player].options.non_local_items
         ) or (
             (self.progress_type != LocationProgressType.EXCLUDED or not (item.advancement or item.useful))
             and self.item_rule(item)
-            and (not check_access or self.can_reach(state))
+            and (not check_access or self._can_reach_cached(state, access_cache))
         ))
 
+    def _can_reach_cached(self, state: CollectionState, access_cache: Optional[Dict[Location, bool]]) -> bool:
+        if access_cache is None:
+            return self.can_reach(state)
+        reachable = access_cache.get(self)
+        if reachable is None:
+            reachable = access_cache[self] = self.can_reach(state)
+        return reachable
+
     def can_reach(self, state: CollectionState) -> bool:
         # Region.can_reach is just a cache lookup, so placing it first for faster abort on average
         assert self.parent_region, f"called can_reach on a Location \"{self}\" with no parent_region"
@@ -1364,18 +1843,36 @@ class Spoiler:
         restore_later: Dict[Location, Item] = {}
         for num, sphere in reversed(tuple(enumerate(collection_spheres))):
             to_delete: Set[Location] = set()
-            for location in sphere:
-                # we remove the item at location and check if game is still beatable
-                logging.debug('Checking if %s (Player %d) is required to beat the game.', location.item.name,
-                              location.item.player)
-                old_item = location.item
-                location.item = None
-                if multiworld.can_beat_game(state_cache[num]):
-                    to_delete.add(location)
-                    restore_later[location] = old_item
-                else:
+            # earlier spheres don't depend on this one, so sweeping can start from the cached state before it and
+            # only needs to look at the progression locations of this and later spheres
+            later_locations = set(chain.from_iterable(collection_spheres[num:]))
+
+            def cull(candidates: List[Location], known_required: bool = False) -> None:
+                """Remove the items at candidates that aren't required to beat the game, trying them all at once first.
+                Culls the same items as checking them one by one in order would, with fewer checks."""
+                if not known_required:
+                    if len(candidates) == 1:
+                        logging.debug('Checking if %s (Player %d) is required to beat the game.',
+                                      candidates[0].item.name, candidates[0].item.player)
+                    old_items = {location: location.item for location in candidates}
+                    for location in candidates:
+                        location.item = None
+                    if multiworld.can_beat_game(state_cache[num], later_locations):
+                        to_delete.update(candidates)
+                        restore_later.update(old_items)
+                        return
                     # still required, got to keep it around
-                    location.item = old_item
+                    for location, old_item in old_items.items():
+                        location.item = old_item
+                if len(candidates) > 1:
+                    half = len(candidates) // 2
+                    deleted = len(to_delete)
+                    cull(candidates[:half])
+                    # if the whole first half could go, the second half alone is what failed the check above
+                    cull(candidates[half:], len(to_delete) - deleted == half)
+
+            if sphere:
+                cull(list(sphere))
 
             # cull entries in spheres for spoiler walkthrough at end
             sphere -= to_delete
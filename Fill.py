@@ -33,6 +33,17 @@ def sweep_from_pool(base_state: CollectionState, itempool: typing.Sequence[Item]
     return new_state
 
 
+def _can_fill_cached(location: Location, state: CollectionState, item: Item, check_access: bool,
+                     access_cache: typing.Dict[Location, bool]) -> bool:
+    """
+    `Location.can_fill` with access_cache, for locations whose can_fill override does not take it.
+    """
+    if type(location).can_fill is not Location.can_fill:
+        # can_fill is overridden and may change the access rule depending on the item
+        return location.can_fill(state, item, check_access)
+    return location.can_fill(state, item, check_access, access_cache)
+
+
 def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locations: typing.List[Location],
                      item_pool: typing.List[Item], single_player_placement: bool = False, lock: bool = False,
                      swap: bool = True, on_place: typing.Optional[typing.Callable[[Location], None]] = None,
@@ -74,6 +85,8 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
         maximum_exploration_state = sweep_from_pool(
             base_state, item_pool + unplaced_items, multiworld.get_filled_locations(item.player)
             if single_player_placement else None)
+        # access checks against maximum_exploration_state, shared by all items placed in this batch
+        access_cache: typing.Dict[Location, bool] = {}
 
         has_beaten_game = multiworld.has_beaten_game(maximum_exploration_state)
 
@@ -96,7 +109,8 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
 
             for i, location in enumerate(locations):
                 if (not single_player_placement or location.player == item_to_place.player) \
-                        and location.can_fill(maximum_exploration_state, item_to_place, perform_access_check):
+                        and _can_fill_cached(location, maximum_exploration_state, item_to_place,
+                                             perform_access_check, access_cache):
                     # popping by index is faster than removing by content,
                     spot_to_fill = locations.pop(i)
                     # skipping a scan for the element
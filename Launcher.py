@@ -25,6 +25,9 @@ from typing import Callable, Optional, Sequence, Tuple, Union
 import Utils
 import settings
 from worlds.LauncherComponents import Component, components, Type, SuffixIdentifier, icon_paths
+from worlds import load_all_worlds
+
+load_all_worlds()  # worlds add their components when they get imported
 
 if __name__ == "__main__":
     import ModuleUpdate
@@ -1,19 +1,19 @@
 import collections
 import concurrent.futures
+import contextlib
 import logging
 import os
-import pickle
 import tempfile
 import time
 import zipfile
-import zlib
-from typing import Dict, List, Optional, Set, Tuple, Union
+from typing import ContextManager, Dict, List, Optional, Set, Tuple, Union
 
 import worlds
-from BaseClasses import CollectionState, Item, Location, LocationProgressType, MultiWorld, Region
+from BaseClasses import CollectionState, Item, Location, LocationProgressType, MultiWorld, Region, RegionSweeper
 from Fill import FillError, balance_multiworld_progression, distribute_items_restrictive, distribute_planned, \
     flood_items
 from Options import StartInventoryPool
+from Profiler import Profiler
 from Utils import __version__, output_path, version_tuple, get_settings
 from settings import get_settings
 from worlds import AutoWorld
@@ -33,6 +33,28 @@ def main(args, seed=None, baked_server_options: Optional[Dict[str, object]] = No
     start = time.perf_counter()
     # initialize the multiworld
     multiworld = MultiWorld(args.multi)
+    if getattr(args, "profile", False):
+        multiworld.profiler = Profiler(multiworld)
+
+    def profile_phase(name: Optional[str]) -> None:
+        if multiworld.profiler:
+            multiworld.profiler.phase(name)
+
+    def profile_rules() -> ContextManager[None]:
+        return multiworld.profiler.installed() if multiworld.profiler else contextlib.nullcontext()
+
+    def sweep_regions() -> ContextManager[None]:
+        processes = get_settings().generator.region_sweep_processes
+        if processes and multiworld.players > 1:
+            return RegionSweeper(multiworld, processes).installed()
+        return contextlib.nullcontext()
+
+    def finish_profile() -> None:
+        if multiworld.profiler:
+            multiworld.profiler.phase(None)
+            multiworld.profiler.write(output_path(f"AP_{multiworld.seed_name}_Profile"))
+
+    profile_phase("setup")
 
     logger = logging.getLogger()
     multiworld.set_seed(seed, args.race, str(args.outputname) if args.outputname else None)
@@ -53,30 +75,34 @@ def main(args, seed=None, baked_server_options: Optional[Dict[str, object]] = No
     multiworld.state = CollectionState(multiworld)
     logger.info('Archipelago Version %s  -  Seed: %s\n', __version__, multiworld.seed)
 
-    logger.info(f"Found {len(AutoWorld.AutoWorldRegister.world_types)} World Types:")
-    longest_name = max(len(text) for text in AutoWorld.AutoWorldRegister.world_types)
+    # listed from the manifest, so worlds nobody plays don't get imported for this
+    logger.info(f"Found {len(worlds.world_manifest)} World Types:")
+    longest_name = max(len(text) for text in worlds.world_manifest)
 
     max_item = 0
     max_location = 0
-    for cls in AutoWorld.AutoWorldRegister.world_types.values():
-        if cls.item_id_to_name:
-            max_item = max(max_item, max(cls.item_id_to_name))
-            max_location = max(max_location, max(cls.location_id_to_name))
+    for info in worlds.world_manifest.values():
+        if info["item_ids"]:
+            max_item = max(max_item, info["item_ids"][1])
+        if info["location_ids"]:
+            max_location = max(max_location, info["location_ids"][1])
 
     item_digits = len(str(max_item))
     location_digits = len(str(max_location))
-    item_count = len(str(max(len(cls.item_names) for cls in AutoWorld.AutoWorldRegister.world_types.values())))
-    location_count = len(str(max(len(cls.location_names) for cls in AutoWorld.AutoWorldRegister.world_types.values())))
+    item_count = len(str(max(info["item_count"] for info in worlds.world_manifest.values())))
+    location_count = len(str(max(info["location_count"] for info in worlds.world_manifest.values())))
     del max_item, max_location
 
-    for name, cls in AutoWorld.AutoWorldRegister.world_types.items():
-        if not cls.hidden and len(cls.item_names) > 0:
-            logger.info(f" {name:{longest_name}}: {len(cls.item_names):{item_count}} "
-                        f"Items (IDs: {min(cls.item_id_to_name):{item_digits}} - "
-                        f"{max(cls.item_id_to_name):{item_digits}}) | "
-                        f"{len(cls.location_names):{location_count}} "
-                        f"Locations (IDs: {min(cls.location_id_to_name):{location_digits}} - "
-                        f"{max(cls.location_id_to_name):{location_digits}})")
+    for name, info in worlds.world_manifest.items():
+        if not info["hidden"] and info["item_count"] > 0:
+            item_ids = info["item_ids"]
+            location_ids = info["location_ids"] or (0, 0)
+            logger.info(f" {name:{longest_name}}: {info['item_count']:{item_count}} "
+                        f"Items (IDs: {item_ids[0]:{item_digits}} - "
+                        f"{item_ids[1]:{item_digits}}) | "
+                        f"{info['location_count']:{location_count}} "
+                        f"Locations (IDs: {location_ids[0]:{location_digits}} - "
+                        f"{location_ids[1]:{location_digits}})")
 
     del item_digits, location_digits, item_count, location_count
 
@@ -84,6 +110,7 @@ def main(args, seed=None, baked_server_options: Optional[Dict[str, object]] = No
     if not args.skip_output:
         AutoWorld.call_stage(multiworld, "assert_generate")
 
+    profile_phase("world stages")
     AutoWorld.call_all(multiworld, "generate_early")
 
     logger.info('')
@@ -193,6 +220,7 @@ def main(args, seed=None, baked_server_options: Optional[Dict[str, object]] = No
         assert len(multiworld.itempool) == len(new_items + old_items), "Item Pool amounts should not change."
         multiworld.itempool[:] = new_items + old_items
 
+    profile_phase("item links and plando")
     multiworld.link_items()
 
     if any(multiworld.item_links.values()):
@@ -203,35 +231,43 @@ def main(args, seed=None, baked_server_options: Optional[Dict[str, object]] = No
     distribute_planned(multiworld)
 
     logger.info('Running Pre Main Fill.')
+    profile_phase("pre_fill")
 
     AutoWorld.call_all(multiworld, "pre_fill")
 
     logger.info(f'Filling the multiworld with {len(multiworld.itempool)} items.')
+    profile_phase("fill")
 
-    if multiworld.algorithm == 'flood':
-        flood_items(multiworld)  # different algo, biased towards early game progress items
-    elif multiworld.algorithm == 'balanced':
-        distribute_items_restrictive(multiworld, get_settings().generator.panic_method)
+    # the sweep workers get the rules before the profiler wraps them, wrapped rules can't be sent to them
+    with sweep_regions(), profile_rules():
+        if multiworld.algorithm == 'flood':
+            flood_items(multiworld)  # different algo, biased towards early game progress items
+        elif multiworld.algorithm == 'balanced':
+            distribute_items_restrictive(multiworld, get_settings().generator.panic_method)
 
-    AutoWorld.call_all(multiworld, 'post_fill')
+        profile_phase("post_fill")
+        AutoWorld.call_all(multiworld, 'post_fill')
 
-    if multiworld.players > 1 and not args.skip_prog_balancing:
-        balance_multiworld_progression(multiworld)
-    else:
-        logger.info("Progression balancing skipped.")
+        if multiworld.players > 1 and not args.skip_prog_balancing:
+            profile_phase("progression balancing")
+            balance_multiworld_progression(multiworld)
+        else:
+            logger.info("Progression balancing skipped.")
 
     # we're about to output using multithreading, so we're removing the global random state to prevent accidental use
     multiworld.random.passthrough = False
 
     if args.skip_output:
+        finish_profile()
         logger.info('Done. Skipped output/spoiler generation. Total Time: %s', time.perf_counter() - start)
         return multiworld
 
     logger.info(f'Beginning output...')
+    profile_phase("output")
     outfilebase = 'AP_' + multiworld.seed_name
 
     output = tempfile.TemporaryDirectory()
-    with output as temp_dir:
+    with output as temp_dir, sweep_regions(), profile_rules():
         output_players = [player for player in multiworld.player_ids if AutoWorld.World.generate_output.__code__
                           is not multiworld.worlds[player].generate_output.__code__]
         with concurrent.futures.ThreadPoolExecutor(len(output_players) + 2) as pool:
@@ -342,10 +378,9 @@ def main(args, seed=None, baked_server_options: Optional[Dict[str, object]] = No
                 }
                 AutoWorld.call_all(multiworld, "modify_multidata", multidata)
 
-                multidata = zlib.compress(pickle.dumps(multidata), 9)
+                multidata = NetUtils.compress_multidata(multidata)
 
                 with open(os.path.join(temp_dir, f'{outfilebase}.archipelago'), 'wb') as f:
-                    f.write(bytes([3]))  # version of format
                     f.write(multidata)
 
             output_file_futures.append(pool.submit(write_multidata))
@@ -361,6 +396,7 @@ def main(args, seed=None, baked_server_options: Optional[Dict[str, object]] = No
                     logger.info(f'Generating output files ({i}/{len(output_file_futures)}).')
                 future.result()
 
+        profile_phase("spoiler")
         if args.spoiler > 1:
             logger.info('Calculating playthrough.')
             multiworld.spoiler.create_playthrough(create_paths=args.spoiler > 2)
@@ -368,6 +404,7 @@ def main(args, seed=None, baked_server_options: Optional[Dict[str, object]] = No
         if args.spoiler:
             multiworld.spoiler.to_file(os.path.join(temp_dir, '%s_Spoiler.txt' % outfilebase))
 
+        profile_phase("archive")
         zipfilename = output_path(f"AP_{multiworld.seed_name}.zip")
         logger.info(f"Creating final archive at {zipfilename}")
         with zipfile.ZipFile(zipfilename, mode="w", compression=zipfile.ZIP_DEFLATED,
@@ -375,5 +412,6 @@ def main(args, seed=None, baked_server_options: Optional[Dict[str, object]] = No
             for file in os.scandir(temp_dir):
                 zf.write(file.path, arcname=file.name)
 
+    finish_profile()
     logger.info('Done. Enjoy. Total Time: %s', time.perf_counter() - start)
     return multiworld
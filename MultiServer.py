@@ -13,9 +13,11 @@ import itertools
 import logging
 import math
 import operator
+import os
 import pickle
 import random
 import shlex
+import struct
 import threading
 import time
 import typing
@@ -116,6 +118,89 @@ def get_saving_second(seed_name: str, interval: int = 60) -> int:
     return int(hashlib.sha256(seed_name.encode()).hexdigest(), 16) % interval
 
 
+journal_record_header = struct.Struct("<II")  # length and crc32 of the compressed record
+paired_save_sections = frozenset({"client_activity_timers", "client_connection_timers", "video"})
+""" sections of a save that are stored as (key, value) pairs instead of a dict """
+
+
+def pack_journal_record(record: typing.Any) -> bytes:
+    data = zlib.compress(pickle.dumps(record))
+    return journal_record_header.pack(len(data), zlib.crc32(data)) + data
+
+
+def unpack_journal_records(data: bytes) -> typing.List[typing.Any]:
+    """Returns the records packed into data, up to the first one that was not written completely."""
+    records = []
+    position = 0
+    while position + journal_record_header.size <= len(data):
+        length, crc = journal_record_header.unpack_from(data, position)
+        position += journal_record_header.size
+        record = data[position:position + length]
+        if len(record) < length or zlib.crc32(record) != crc:
+            break
+        records.append(restricted_loads(zlib.decompress(record)))
+        position += length
+    return records
+
+
+def apply_save_journal(save: typing.Dict[str, typing.Any], records: typing.Iterable[typing.List[tuple]]) -> None:
+    """Replays the entries of a save journal onto a save as returned by Context.get_save, in order."""
+    sections = {section: dict(save.get(section, ())) for section in paired_save_sections}
+    for entries in records:
+        for entry in entries:
+            kind, section, key = entry[:3]
+            values = sections[section] if section in paired_save_sections else save.setdefault(section, {})
+            if kind == "set":
+                values[key] = entry[3]
+            elif kind == "del":
+                values.pop(key, None)
+            elif kind == "extend":
+                start, items = entry[3:]
+                received = values.setdefault(key, [])
+                del received[start:]
+                received.extend(items)
+            else:
+                raise ValueError(f"Unknown save journal entry {kind}.")
+    for section, values in sections.items():
+        if values or section in save:
+            save[section] = tuple(values.items())
+
+
+class DataPackageCache:
+    """
+    Encoded data packages of games by their checksum, to answer GetDataPackage without encoding them every time.
+    Data packages with the same checksum are the same, so all Contexts of a process share one.
+    Once the encoded data packages exceed max_size characters, the least recently used ones get dropped.
+    """
+    encoded: typing.OrderedDict[str, str]
+    size: int
+    max_size: int
+
+    def __init__(self, max_size: int = 2 ** 26) -> None:
+        self.encoded = collections.OrderedDict()
+        self.size = 0
+        self.max_size = max_size
+
+    def encode_package(self, package: typing.Dict[str, typing.Any]) -> str:
+        checksum = package.get("checksum", None)
+        if checksum is None:  # from before data packages had checksums
+            return encode(package)
+        encoded = self.encoded.get(checksum, None)
+        if encoded is None:
+            encoded = self.encoded[checksum] = encode(package)
+            self.size += len(encoded)
+            while self.size > self.max_size and len(self.encoded) > 1:
+                self.size -= len(self.encoded.popitem(last=False)[1])
+        else:
+            self.encoded.move_to_end(checksum)
+        return encoded
+
+    def encode_msgs(self, games: typing.Dict[str, typing.Dict[str, typing.Any]]) -> str:
+        """Returns the encoded DataPackage message for games."""
+        return '[{"cmd":"DataPackage","data":{"games":{' + ",".join(
+            encode(name) + ":" + self.encode_package(package) for name, package in games.items()) + "}}}]"
+
+
 class Client(Endpoint):
     version = Version(0, 0, 0)
     tags: typing.List[str] = []
@@ -196,6 +281,28 @@ class Context:
     non_hintable_names: typing.Dict[str, typing.AbstractSet[str]]
     spheres: typing.List[typing.Dict[int, typing.Set[int]]]
     """ each sphere is { player: { location_id, ... } } """
+    data_package_cache: DataPackageCache = DataPackageCache()
+    unfound_hints: typing.Dict[typing.Tuple[int, int, int], typing.List[typing.Tuple[int, NetUtils.Hint]]]
+    """ (team, finding player, location) -> (slot, hint) for each slot holding a hint for it that isn't found yet """
+    new_item_slots: typing.Set[team_slot]
+    """ slots that received items their clients weren't sent yet, they get sent with the next flush_outbox """
+    outbox: typing.Dict[Endpoint, typing.List[str]]
+    """ encoded messages each endpoint gets with the next flush_outbox """
+    outbox_handle: typing.Optional[asyncio.Handle]
+    outbox_write_limit: typing.ClassVar[int] = 2 ** 20
+    """ bytes a socket may still have waiting to be written before it gets no more messages until that drains """
+    outbox_retry_delay: typing.ClassVar[float] = 0.1
+    outbox_backlog_limit: typing.ClassVar[int] = 2 ** 24
+    """ characters of messages held back for an endpoint before it gets disconnected instead """
+    journal_keys: typing.Set[typing.Tuple[str, typing.Any]]
+    """ (section, key) of everything in the save that changed since it was last written """
+    journal_lock: threading.Lock
+    journal_generation: int
+    """ increases with every full save, a journal only applies to the full save of its own generation """
+    journal_received_counts: typing.Dict[typing.Tuple[int, int, bool], int]
+    """ length of each received_items list that is already saved """
+    journal_size: int
+    snapshot_size: int
     logger: logging.Logger
 
 
@@ -225,6 +332,9 @@ class Context:
         self.server = None
         self.countdown_timer = 0
         self.received_items = {}
+        self.new_item_slots = set()
+        self.outbox = {}
+        self.outbox_handle = None
         self.start_inventory = {}
         self.name_aliases: typing.Dict[team_slot, str] = {}
         self.location_checks = collections.defaultdict(set)
@@ -232,6 +342,7 @@ class Context:
         self.location_check_points = location_check_points
         self.hints_used = collections.defaultdict(int)
         self.hints: typing.Dict[team_slot, typing.Set[NetUtils.Hint]] = collections.defaultdict(set)
+        self.unfound_hints = {}
         self.release_mode: str = release_mode
         self.remaining_mode: str = remaining_mode
         self.collect_mode: str = collect_mode
@@ -242,7 +353,7 @@ class Context:
         self.client_connection_timers: typing.Dict[
             team_slot, datetime.datetime] = {}  # datetime of last connection
         self.client_game_state: typing.Dict[team_slot, int] = collections.defaultdict(int)
-        self.er_hint_data: typing.Dict[int, typing.Dict[int, str]] = {}
+        self.er_hint_data: typing.Mapping[int, typing.Dict[int, str]] = {}
         self.auto_shutdown = auto_shutdown
         self.commandprocessor = ServerCommandProcessor(self)
         self.embedded_blacklist = {"host", "port"}
@@ -250,6 +361,12 @@ class Context:
         self.auto_save_interval = 60  # in seconds
         self.auto_saver_thread: typing.Optional[threading.Thread] = None
         self.save_dirty = False
+        self.journal_keys = set()
+        self.journal_lock = threading.Lock()
+        self.journal_generation = 0
+        self.journal_received_counts = {}
+        self.journal_size = 0
+        self.snapshot_size = 0
         self.tags = ['AP']
         self.games: typing.Dict[int, str] = {}
         self.minimum_client_versions: typing.Dict[int, Version] = {}
@@ -276,19 +393,16 @@ class Context:
     # Data package retrieval
     def _load_game_data(self):
         import worlds
-        self.gamespackage = worlds.network_data_package["games"]
-
-        self.item_name_groups = {world_name: world.item_name_groups for world_name, world in
-                                 worlds.AutoWorldRegister.world_types.items()}
-        self.location_name_groups = {world_name: world.location_name_groups for world_name, world in
-                                     worlds.AutoWorldRegister.world_types.items()}
-        for world_name, world in worlds.AutoWorldRegister.world_types.items():
-            self.non_hintable_names[world_name] = world.hint_blacklist
-
-        for game_package in self.gamespackage.values():
+        # everything here comes from the data packages and the world manifest, so worlds don't need to be imported
+        for game_name, game_package in worlds.network_data_package["games"].items():
+            self.item_name_groups[game_name] = {name: set(group) for name, group in
+                                                game_package["item_name_groups"].items()}
+            self.location_name_groups[game_name] = {name: set(group) for name, group in
+                                                    game_package["location_name_groups"].items()}
+            self.non_hintable_names[game_name] = worlds.get_hint_blacklist(game_name)
             # remove groups from data sent to clients
-            del game_package["item_name_groups"]
-            del game_package["location_name_groups"]
+            self.gamespackage[game_name] = {key: value for key, value in game_package.items()
+                                            if key not in ("item_name_groups", "location_name_groups")}
 
     def _init_game_data(self):
         for game_name, game_package in self.gamespackage.items():
@@ -320,7 +434,7 @@ class Context:
     async def send_msgs(self, endpoint: Endpoint, msgs: typing.Iterable[dict]) -> bool:
         if not endpoint.socket or not endpoint.socket.open:
             return False
-        msg = self.dumper(msgs)
+        msg = self.take_outbox(endpoint, self.dumper(msgs))
         try:
             await endpoint.socket.send(msg)
         except websockets.ConnectionClosed:
@@ -335,6 +449,7 @@ class Context:
     async def send_encoded_msgs(self, endpoint: Endpoint, msg: str) -> bool:
         if not endpoint.socket or not endpoint.socket.open:
             return False
+        msg = self.take_outbox(endpoint, msg)
         try:
             await endpoint.socket.send(msg)
         except websockets.ConnectionClosed:
@@ -361,10 +476,81 @@ class Context:
                 self.logger.info(f"Outgoing broadcast: {msg}")
             return True
 
+    def queue_encoded_msgs(self, endpoints: typing.Iterable[Endpoint], msg: str):
+        """Queues an encoded list of messages for endpoints. Everything queued until the next event loop iteration
+        gets sent together, as one message per endpoint."""
+        for endpoint in endpoints:
+            self.outbox.setdefault(endpoint, []).append(msg)
+        self.schedule_outbox()
+
+    def take_outbox(self, endpoint: Endpoint, msg: str) -> str:
+        """Returns msg merged behind whatever the outbox still holds for endpoint, for sending it right away
+        without overtaking that."""
+        msgs = self.outbox.pop(endpoint, None)
+        if not msgs:
+            return msg
+        msgs.append(msg)
+        return self.merge_encoded_msgs(msgs)
+
+    @staticmethod
+    def merge_encoded_msgs(msgs: typing.List[str]) -> str:
+        """Merges encoded lists of messages into one encoded list."""
+        return msgs[0] if len(msgs) == 1 else "[" + ",".join(part[1:-1] for part in msgs if part != "[]") + "]"
+
+    def schedule_outbox(self, delay: float = 0):
+        if not self.outbox and not self.new_item_slots:
+            return
+        if self.outbox_handle:
+            # new messages don't wait for the retry of slow sockets
+            if delay or not isinstance(self.outbox_handle, asyncio.TimerHandle):
+                return
+            self.outbox_handle.cancel()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:  # nothing to wait for
+            self.flush_outbox()
+        else:
+            self.outbox_handle = loop.call_later(delay, self.flush_outbox) if delay else \
+                loop.call_soon(self.flush_outbox)
+
+    def flush_outbox(self):
+        self.outbox_handle = None
+        queue_new_items(self)
+        outbox, self.outbox = self.outbox, {}
+        # endpoints that got the same messages share one encoded message
+        batches: typing.Dict[typing.Tuple[int, ...], typing.Tuple[typing.List[str], typing.List[Endpoint]]] = {}
+        for endpoint, msgs in outbox.items():
+            socket = endpoint.socket
+            if not socket or not socket.open:
+                continue
+            transport = getattr(socket, "transport", None)
+            if transport and transport.get_write_buffer_size() > self.outbox_write_limit:
+                # hold back messages for slow sockets, they get merged with anything newer once the socket caught up
+                msg = self.merge_encoded_msgs(msgs)
+                if len(msg) > self.outbox_backlog_limit:
+                    # the client isn't keeping up at all, it gets everything again when it reconnects
+                    self.logger.info(f"Disconnecting a client that has {len(msg)} characters of messages "
+                                     f"waiting to be sent to it.")
+                    async_start(socket.close())
+                    continue
+                self.outbox[endpoint] = [msg]
+                continue
+            batches.setdefault(tuple(map(id, msgs)), (msgs, []))[1].append(endpoint)
+        for msgs, endpoints in batches.values():
+            msg = self.merge_encoded_msgs(msgs)
+            try:
+                websockets.broadcast([endpoint.socket for endpoint in endpoints], msg)
+            except RuntimeError:
+                self.logger.exception("Exception during flush_outbox")
+            else:
+                if self.log_network:
+                    self.logger.info(f"Outgoing broadcast: {msg}")
+        self.schedule_outbox(self.outbox_retry_delay)
+
     def broadcast_all(self, msgs: typing.List[dict]):
         msgs = self.dumper(msgs)
         endpoints = (endpoint for endpoint in self.endpoints if endpoint.auth)
-        async_start(self.broadcast_send_encoded_msgs(endpoints, msgs))
+        self.queue_encoded_msgs(endpoints, msgs)
 
     def broadcast_text_all(self, text: str, additional_arguments: dict = {}):
         self.logger.info("Notice (all): %s" % text)
@@ -373,11 +559,11 @@ class Context:
     def broadcast_team(self, team: int, msgs: typing.List[dict]):
         msgs = self.dumper(msgs)
         endpoints = (endpoint for endpoint in itertools.chain.from_iterable(self.clients[team].values()))
-        async_start(self.broadcast_send_encoded_msgs(endpoints, msgs))
+        self.queue_encoded_msgs(endpoints, msgs)
 
     def broadcast(self, endpoints: typing.Iterable[Client], msgs: typing.List[dict]):
         msgs = self.dumper(msgs)
-        async_start(self.broadcast_send_encoded_msgs(endpoints, msgs))
+        self.queue_encoded_msgs(endpoints, msgs)
 
     async def disconnect(self, endpoint: Client):
         if endpoint in self.endpoints:
@@ -419,10 +605,7 @@ class Context:
 
     @staticmethod
     def decompress(data: bytes) -> dict:
-        format_version = data[0]
-        if format_version > 3:
-            raise Utils.VersionException("Incompatible multidata.")
-        return restricted_loads(zlib.decompress(data[1:]))
+        return NetUtils.decompress_multidata(data)
 
     def _load(self, decoded_obj: dict, game_data_packages: typing.Dict[str, typing.Any],
               use_embedded_server_options: bool):
@@ -463,18 +646,23 @@ class Context:
         self.random.seed(self.seed_name)
         self.connect_names = decoded_obj['connect_names']
         self.locations = LocationStore(decoded_obj.pop("locations"))  # pre-emptively free memory
+        # may be a NetUtils.MultidataSection, unpickling the slot_data of a slot each time it gets looked up
         self.slot_data = decoded_obj['slot_data']
-        for slot, data in self.slot_data.items():
-            self.read_data[f"slot_data_{slot}"] = lambda data=data: data
-        self.er_hint_data = {int(player): {int(address): name for address, name in loc_data.items()}
-                             for player, loc_data in decoded_obj["er_hint_data"].items()}
+        for slot in self.slot_data:
+            self.read_data[f"slot_data_{slot}"] = lambda local_slot=slot: self.slot_data[local_slot]
+        if isinstance(decoded_obj["er_hint_data"], NetUtils.MultidataSection):
+            self.er_hint_data = decoded_obj["er_hint_data"]
+        else:
+            self.er_hint_data = {int(player): {int(address): name for address, name in loc_data.items()}
+                                 for player, loc_data in decoded_obj["er_hint_data"].items()}
 
         # load start inventory:
         for slot, item_codes in decoded_obj["precollected_items"].items():
             self.start_inventory[slot] = [NetworkItem(item_code, -2, 0) for item_code in item_codes]
 
         for slot, hints in decoded_obj["precollected_hints"].items():
-            self.hints[0, slot].update(hints)
+            for hint in hints:
+                self.add_hint(0, slot, hint)
 
         # declare slots that aren't players as done
         for slot, slot_info in self.slot_info.items():
@@ -519,29 +707,101 @@ class Context:
 
         return False
 
+    def journal(self, section: str, key: typing.Any) -> None:
+        """Marks key of a section of get_save as changed, so the next save writes it to the journal."""
+        if self.saving:
+            with self.journal_lock:
+                self.journal_keys.add((section, key))
+
+    def get_journal_entry(self, section: str, key: typing.Any) -> tuple:
+        if section == "game_options":
+            return "set", section, key, getattr(self, key)
+        if section == "received_items":
+            items = self.received_items.get(key, [])
+            start = min(self.journal_received_counts.get(key, 0), len(items))
+            self.journal_received_counts[key] = len(items)
+            return "extend", section, key, start, items[start:]
+        values = getattr(self, section)
+        if key not in values:
+            return "del", section, key
+        value = values[key]
+        if isinstance(value, datetime.datetime):
+            value = value.timestamp()
+        return "set", section, key, value
+
     def _save(self, exit_save: bool = False) -> bool:
+        """Writes a full save if the journal has grown as big as the last one, otherwise appends what changed since
+        the last save to the journal."""
+        with self.journal_lock:
+            keys, self.journal_keys = self.journal_keys, set()
         try:
-            encoded_save = pickle.dumps(self.get_save())
-            with open(self.save_filename, "wb") as f:
-                f.write(zlib.compress(encoded_save))
+            if exit_save or self.journal_size >= self.snapshot_size:
+                # taken before get_save, so items received while saving are journaled again rather than not at all
+                received_counts = {key: len(items) for key, items in self.received_items.items()}
+                save = self.get_save()
+                save["journal"] = self.journal_generation + 1
+                self.snapshot_size = self.write_save_snapshot(save)
+                self.journal_generation += 1
+                self.journal_received_counts = received_counts
+                self.journal_size = 0
+            elif keys:
+                self.journal_size += self.write_save_journal([self.get_journal_entry(*key) for key in keys])
         except Exception as e:
+            with self.journal_lock:
+                self.journal_keys |= keys
+            # the journal may end in a partial record now, which can't be appended to
+            self.journal_size = self.snapshot_size
             self.logger.exception(e)
             return False
         else:
             return True
 
+    @property
+    def journal_filename(self) -> str:
+        return self.save_filename + ".journal"
+
+    def write_save_snapshot(self, save: typing.Dict[str, typing.Any]) -> int:
+        """Replaces the save with save and starts a new journal for it. Returns the size of the save."""
+        data = zlib.compress(pickle.dumps(save))
+        temp_filename = self.save_filename + ".tmp"
+        with open(temp_filename, "wb") as f:
+            f.write(data)
+        os.replace(temp_filename, self.save_filename)
+        with open(self.journal_filename, "wb") as f:
+            f.write(pack_journal_record(save["journal"]))
+        return len(data)
+
+    def write_save_journal(self, entries: typing.List[tuple]) -> int:
+        """Appends entries to the journal of the save. Returns the size of what was written."""
+        data = pack_journal_record(entries)
+        with open(self.journal_filename, "ab") as f:
+            f.write(data)
+        return len(data)
+
+    def read_save_journal(self, generation: int) -> typing.List[typing.List[tuple]]:
+        """Returns the journaled entries of the save of generation."""
+        try:
+            with open(self.journal_filename, "rb") as f:
+                records = unpack_journal_records(f.read())
+        except FileNotFoundError:
+            return []
+        if not records or records[0] != generation:
+            return []
+        return records[1:]
+
     def init_save(self, enabled: bool = True):
         self.saving = enabled
         if self.saving:
             if not self.save_filename:
-                import os
                 name, ext = os.path.splitext(self.data_filename)
                 self.save_filename = name + '.apsave' if ext.lower() in ('.archipelago', '.zip') \
                     else self.data_filename + '_' + 'apsave'
             try:
                 with open(self.save_filename, 'rb') as f:
                     save_data = restricted_loads(zlib.decompress(f.read()))
-                    self.set_save(save_data)
+                self.journal_generation = save_data.get("journal", 0)
+                apply_save_journal(save_data, self.read_save_journal(self.journal_generation))
+                self.set_save(save_data)
             except FileNotFoundError:
                 self.logger.error('No save data found, starting a new game')
             except Exception as e:
@@ -580,7 +840,6 @@ class Context:
                 atexit.register(self._save, True)  # make sure we save on exit too
 
     def get_save(self) -> dict:
-        self.recheck_hints()
         d = {
             "version": self.save_version,
             "connect_names": self.connect_names,
@@ -625,6 +884,7 @@ class Context:
             {tuple(key): datetime.datetime.fromtimestamp(value, datetime.timezone.utc) for key, value
              in savedata["client_activity_timers"]})
         self.location_checks.update(savedata["location_checks"])
+        self.index_hints()
         self.random.setstate(savedata["random_state"])
 
         if "game_options" in savedata:
@@ -664,9 +924,38 @@ class Context:
                 }
 
     def get_rechecked_hints(self, team: int, slot: int):
-        self.recheck_hints(team, slot)
+        # hints are kept up to date by update_found_hints
         return self.hints[team, slot]
 
+    def add_hint(self, team: int, slot: int, hint: NetUtils.Hint):
+        """Adds hint to the hints of slot and keeps track of it until its location gets checked."""
+        self.hints[team, slot].add(hint)
+        if not hint.found:
+            self.unfound_hints.setdefault((team, hint.finding_player, hint.location), []).append((slot, hint))
+
+    def index_hints(self):
+        """Rechecks all hints and rebuilds unfound_hints from them, after hints got replaced as a whole."""
+        self.recheck_hints()
+        self.unfound_hints.clear()
+        for (team, slot), hints in self.hints.items():
+            for hint in hints:
+                if not hint.found:
+                    self.unfound_hints.setdefault((team, hint.finding_player, hint.location), []).append((slot, hint))
+
+    def update_found_hints(self, team: int, finding_player: int, locations: typing.Iterable[int]) -> typing.Set[int]:
+        """Marks the hints for newly checked locations of finding_player as found.
+        Returns the slots whose hints changed."""
+        changed: typing.Set[int] = set()
+        for location in locations:
+            for slot, hint in self.unfound_hints.pop((team, finding_player, location), ()):
+                hints = self.hints[team, slot]
+                hints.discard(hint)
+                hints.add(hint._replace(found=True))
+                changed.add(slot)
+        for slot in changed:
+            self.journal("hints", (team, slot))
+        return changed
+
     def get_sphere(self, player: int, location_id: int) -> int:
         """Get sphere of a location, -1 if spheres are not available."""
         if self.spheres:
@@ -730,11 +1019,13 @@ class Context:
                 # since hints are bidirectional, finding player and receiving player,
                 # we can check once if hint already exists
                 if hint not in self.hints[team, hint.finding_player]:
-                    self.hints[team, hint.finding_player].add(hint)
+                    self.add_hint(team, hint.finding_player, hint)
                     new_hint_events.add(hint.finding_player)
+                    self.journal("hints", (team, hint.finding_player))
                     for player in self.slot_set(hint.receiving_player):
-                        self.hints[team, player].add(hint)
+                        self.add_hint(team, player, hint)
                         new_hint_events.add(player)
+                        self.journal("hints", (team, player))
 
             self.logger.info("Notice (Team #%d): %s" % (team + 1, format_hint(self, team, hint)))
         for slot in new_hint_events:
@@ -781,12 +1072,8 @@ class Context:
 
 
 def update_aliases(ctx: Context, team: int):
-    cmd = ctx.dumper([{"cmd": "RoomUpdate",
-                       "players": ctx.get_players_package()}])
-
-    for clients in ctx.clients[team].values():
-        for client in clients:
-            async_start(ctx.send_encoded_msgs(client, cmd))
+    ctx.broadcast_team(team, [{"cmd": "RoomUpdate",
+                               "players": ctx.get_players_package()}])
 
 
 async def server(websocket, path: str = "/", ctx: Context = None):
@@ -881,12 +1168,14 @@ async def on_client_joined(ctx: Context, client: Client):
                               "you may have additional local commands you can list with /help.",
                       {"type": "Tutorial"})
     ctx.client_connection_timers[client.team, client.slot] = datetime.datetime.now(datetime.timezone.utc)
+    ctx.journal("client_connection_timers", (client.team, client.slot))
 
 
 async def on_client_left(ctx: Context, client: Client):
     if len(ctx.clients[client.team][client.slot]) < 1:
         update_client_status(ctx, client, ClientStatus.CLIENT_UNKNOWN)
         ctx.client_connection_timers[client.team, client.slot] = datetime.datetime.now(datetime.timezone.utc)
+        ctx.journal("client_connection_timers", (client.team, client.slot))
 
     version_str = '.'.join(str(x) for x in client.version)
 
@@ -961,20 +1250,27 @@ def get_start_inventory(ctx: Context, player: int, remote_start_inventory: bool)
 
 
 def send_new_items(ctx: Context):
-    for team, clients in ctx.clients.items():
-        for slot, clients in clients.items():
-            for client in clients:
-                if client.no_items:
-                    continue
-                start_inventory = get_start_inventory(ctx, slot, client.remote_start_inventory)
-                items = get_received_items(ctx, team, slot, client.remote_items)
-                if len(start_inventory) + len(items) > client.send_index:
-                    first_new_item = max(0, client.send_index - len(start_inventory))
-                    async_start(ctx.send_msgs(client, [{
-                        "cmd": "ReceivedItems",
-                        "index": client.send_index,
-                        "items": start_inventory[client.send_index:] + items[first_new_item:]}]))
-                    client.send_index = len(start_inventory) + len(items)
+    """Sends new items to the clients of slots in ctx.new_item_slots with the next flush_outbox,
+    so everything received until then goes out in one ReceivedItems per client."""
+    ctx.schedule_outbox()
+
+
+def queue_new_items(ctx: Context):
+    new_item_slots, ctx.new_item_slots = ctx.new_item_slots, set()
+    for team, slot in new_item_slots:
+        for client in ctx.clients[team].get(slot, ()):
+            if client.no_items:
+                continue
+            start_inventory = get_start_inventory(ctx, slot, client.remote_start_inventory)
+            items = get_received_items(ctx, team, slot, client.remote_items)
+            if len(start_inventory) + len(items) > client.send_index:
+                first_new_item = max(0, client.send_index - len(start_inventory))
+                # queued behind everything else for the client, the running flush_outbox sends it along
+                ctx.outbox.setdefault(client, []).append(ctx.dumper([{
+                    "cmd": "ReceivedItems",
+                    "index": client.send_index,
+                    "items": start_inventory[client.send_index:] + items[first_new_item:]}]))
+                client.send_index = len(start_inventory) + len(items)
 
 
 def update_checked_locations(ctx: Context, team: int, slot: int):
@@ -1008,6 +1304,7 @@ def collect_player(ctx: Context, team: int, slot: int, is_group: bool = False):
             if slot in group_players:
                 group_collected_players = ctx.group_collected.setdefault(group, set())
                 group_collected_players.add(slot)
+                ctx.journal("group_collected", group)
                 if set(group_players) == group_collected_players:
                     collect_player(ctx, team, group, True)
 
@@ -1017,11 +1314,15 @@ def get_remaining(ctx: Context, team: int, slot: int) -> typing.List[typing.Tupl
 
 
 def send_items_to(ctx: Context, team: int, target_slot: int, *items: NetworkItem):
+    """Adds items to what the targeted slots received. Clients get them with the next send_new_items."""
     for target in ctx.slot_set(target_slot):
         for item in items:
             if item.player != target_slot:
                 get_received_items(ctx, team, target, False).append(item)
             get_received_items(ctx, team, target, True).append(item)
+        ctx.new_item_slots.add((team, target))
+        ctx.journal("received_items", (team, target, False))
+        ctx.journal("received_items", (team, target, True))
 
 
 def register_location_checks(ctx: Context, team: int, slot: int, locations: typing.Iterable[int],
@@ -1031,6 +1332,8 @@ def register_location_checks(ctx: Context, team: int, slot: int, locations: typi
     if new_locations:
         if count_activity:
             ctx.client_activity_timers[team, slot] = datetime.datetime.now(datetime.timezone.utc)
+            ctx.journal("client_activity_timers", (team, slot))
+        info_texts: typing.List[dict] = []
         for location in new_locations:
             item_id, target_player, flags = ctx.locations[slot][location]
             new_item = NetworkItem(item_id, location, slot, flags)
@@ -1039,33 +1342,45 @@ def register_location_checks(ctx: Context, team: int, slot: int, locations: typi
             ctx.logger.info('(Team #%d) %s sent %s to %s (%s)' % (
                 team + 1, ctx.player_names[(team, slot)], ctx.item_names[ctx.slot_info[target_player].game][item_id],
                 ctx.player_names[(team, target_player)], ctx.location_names[ctx.slot_info[slot].game][location]))
-            info_text = json_format_send_event(new_item, target_player)
-            ctx.broadcast_team(team, [info_text])
+            info_texts.append(json_format_send_event(new_item, target_player))
 
+        ctx.broadcast_team(team, info_texts)
         ctx.location_checks[team, slot] |= new_locations
+        ctx.journal("location_checks", (team, slot))
         send_new_items(ctx)
         ctx.broadcast(ctx.clients[team][slot], [{
             "cmd": "RoomUpdate",
             "hint_points": get_slot_points(ctx, team, slot),
             "checked_locations": new_locations,  # send back new checks only
         }])
-        old_hints = ctx.hints[team, slot].copy()
-        ctx.recheck_hints(team, slot)
-        if old_hints != ctx.hints[team, slot]:
-            ctx.on_changed_hints(team, slot)
+        for hint_slot in ctx.update_found_hints(team, slot, new_locations):
+            ctx.on_changed_hints(team, hint_slot)
         ctx.save()
 
 
 def collect_hints(ctx: Context, team: int, slot: int, item: typing.Union[int, str]) -> typing.List[NetUtils.Hint]:
+    seeked_item_id = item if isinstance(item, int) else ctx.item_names_for_game(ctx.games[slot])[item]
+    return collect_item_hints(ctx, team, slot, (seeked_item_id,))
+
+
+def collect_item_group_hints(ctx: Context, team: int, slot: int, group: str) -> typing.List[NetUtils.Hint]:
+    item_name_to_id = ctx.item_names_for_game(ctx.games[slot])
+    # items without an ID are skipped
+    return collect_item_hints(ctx, team, slot, {item_name_to_id[item_name] for item_name in
+                                                ctx.item_name_groups[ctx.games[slot]][group]
+                                                if item_name in item_name_to_id})
+
+
+def collect_item_hints(ctx: Context, team: int, slot: int, item_ids: typing.Iterable[int]
+                       ) -> typing.List[NetUtils.Hint]:
     hints = []
     slots: typing.Set[int] = {slot}
     for group_id, group in ctx.groups.items():
         if slot in group:
             slots.add(group_id)
 
-    seeked_item_id = item if isinstance(item, int) else ctx.item_names_for_game(ctx.games[slot])[item]
     for finding_player, location_id, item_id, receiving_player, item_flags \
-            in ctx.locations.find_item(slots, seeked_item_id):
+            in ctx.locations.find_items(slots, item_ids):
         found = location_id in ctx.location_checks[team, finding_player]
         entrance = ctx.er_hint_data.get(finding_player, {}).get(location_id, "")
         hints.append(NetUtils.Hint(receiving_player, finding_player, location_id, item_id, found, entrance,
@@ -1461,12 +1776,14 @@ class ClientMessageProcessor(CommonCommandProcessor):
         if alias_name:
             alias_name = alias_name[:16].strip()
             self.ctx.name_aliases[self.client.team, self.client.slot] = alias_name
+            self.ctx.journal("name_aliases", (self.client.team, self.client.slot))
             self.output(f"Hello, {alias_name}")
             update_aliases(self.ctx, self.client.team)
             self.ctx.save()
             return True
         elif (self.client.team, self.client.slot) in self.ctx.name_aliases:
             del (self.ctx.name_aliases[self.client.team, self.client.slot])
+            self.ctx.journal("name_aliases", (self.client.team, self.client.slot))
             self.output("Removed Alias")
             update_aliases(self.ctx, self.client.team)
             self.ctx.save()
@@ -1486,6 +1803,9 @@ class ClientMessageProcessor(CommonCommandProcessor):
                 new_item = NetworkItem(names[item_name], -1, self.client.slot)
                 get_received_items(self.ctx, self.client.team, self.client.slot, False).append(new_item)
                 get_received_items(self.ctx, self.client.team, self.client.slot, True).append(new_item)
+                self.ctx.journal("received_items", (self.client.team, self.client.slot, False))
+                self.ctx.journal("received_items", (self.client.team, self.client.slot, True))
+                self.ctx.new_item_slots.add((self.client.team, self.client.slot))
                 self.ctx.broadcast_text_all(
                     'Cheat console: sending "' + item_name + '" to ' + self.ctx.get_aliased_name(self.client.team,
                                                                                                  self.client.slot),
@@ -1504,9 +1824,7 @@ class ClientMessageProcessor(CommonCommandProcessor):
         cost = self.ctx.get_hint_cost(self.client.slot)
 
         if not input_text:
-            hints = {hint.re_check(self.ctx, self.client.team) for hint in
-                     self.ctx.hints[self.client.team, self.client.slot]}
-            self.ctx.hints[self.client.team, self.client.slot] = hints
+            hints = self.ctx.hints[self.client.team, self.client.slot]
             self.ctx.notify_hints(self.client.team, list(hints), recipients=(self.client.slot,))
             self.output(f"A hint costs {self.ctx.get_hint_cost(self.client.slot)} points. "
                         f"You have {points_available} points.")
@@ -1547,10 +1865,7 @@ class ClientMessageProcessor(CommonCommandProcessor):
                     self.output(f"Sorry, \"{hint_name}\" is marked as non-hintable.")
                     hints = []
                 elif not for_location and hint_name in self.ctx.item_name_groups[game]:  # item group name
-                    hints = []
-                    for item_name in self.ctx.item_name_groups[game][hint_name]:
-                        if item_name in self.ctx.item_names_for_game(game):  # ensure item has an ID
-                            hints.extend(collect_hints(self.ctx, self.client.team, self.client.slot, item_name))
+                    hints = collect_item_group_hints(self.ctx, self.client.team, self.client.slot, hint_name)
                 elif not for_location and hint_name in self.ctx.item_names_for_game(game):  # item name
                     hints = collect_hints(self.ctx, self.client.team, self.client.slot, hint_name)
                 elif hint_name in self.ctx.location_name_groups[game]:  # location group name
@@ -1596,6 +1911,7 @@ class ClientMessageProcessor(CommonCommandProcessor):
                     hints.append(hint)
                     can_pay -= 1
                     self.ctx.hints_used[self.client.team, self.client.slot] += 1
+                    self.ctx.journal("hints_used", (self.client.team, self.client.slot))
 
                 self.ctx.notify_hints(self.client.team, hints)
                 if not_found_hints:
@@ -1752,21 +2068,14 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
         if "games" in args:
             games = {name: game_data for name, game_data in ctx.gamespackage.items()
                      if name in set(args.get("games", []))}
-            await ctx.send_msgs(client, [{"cmd": "DataPackage",
-                                          "data": {"games": games}}])
         # TODO: remove exclusions behaviour around 0.5.0
         elif exclusions:
             exclusions = set(exclusions)
             games = {name: game_data for name, game_data in ctx.gamespackage.items()
                      if name not in exclusions}
-
-            package = {"games": games}
-            await ctx.send_msgs(client, [{"cmd": "DataPackage",
-                                          "data": package}])
-
         else:
-            await ctx.send_msgs(client, [{"cmd": "DataPackage",
-                                          "data": {"games": ctx.gamespackage}}])
+            games = ctx.gamespackage
+        await ctx.send_encoded_msgs(client, ctx.data_package_cache.encode_msgs(games))
 
     elif client.auth:
         if cmd == "ConnectUpdate":
@@ -1889,6 +2198,7 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
                 func = modify_functions[operation["operation"]]
                 value = func(value, operation["value"])
             ctx.stored_data[args["key"]] = args["value"] = value
+            ctx.journal("stored_data", args["key"])
             targets = set(ctx.stored_data_notification_clients[args["key"]])
             if args.get("want_reply", True):
                 targets.add(client)
@@ -1917,6 +2227,7 @@ def update_client_status(ctx: Context, client: Client, new_status: ClientStatus)
                 ctx.broadcast_text_all(f"Team #{client.team + 1} has completed all of their games! Congratulations!")
 
         ctx.client_game_state[client.team, client.slot] = new_status
+        ctx.journal("client_game_state", (client.team, client.slot))
         ctx.on_client_status_change(client.team, client.slot)
         ctx.save()
 
@@ -1974,12 +2285,14 @@ class ServerCommandProcessor(CommonCommandProcessor):
                     if alias_name:
                         alias_name = alias_name.strip()[:15]
                         self.ctx.name_aliases[team, slot] = alias_name
+                        self.ctx.journal("name_aliases", (team, slot))
                         self.output(f"Named {player_name} as {alias_name}")
                         update_aliases(self.ctx, team)
                         self.ctx.save()
                         return True
                     else:
                         del (self.ctx.name_aliases[team, slot])
+                        self.ctx.journal("name_aliases", (team, slot))
                         self.output(f"Removed Alias for {player_name}")
                         update_aliases(self.ctx, team)
                         self.ctx.save()
@@ -2137,10 +2450,7 @@ class ServerCommandProcessor(CommonCommandProcessor):
 
             if usable:
                 if game in self.ctx.item_name_groups and item in self.ctx.item_name_groups[game]:
-                    hints = []
-                    for item_name_from_group in self.ctx.item_name_groups[game][item]:
-                        if item_name_from_group in self.ctx.item_names_for_game(game):  # ensure item has an ID
-                            hints.extend(collect_hints(self.ctx, team, slot, item_name_from_group))
+                    hints = collect_item_group_hints(self.ctx, team, slot, item)
                 else:  # item name or id
                     hints = collect_hints(self.ctx, team, slot, item)
 
@@ -2219,6 +2529,7 @@ class ServerCommandProcessor(CommonCommandProcessor):
                 return False
 
         setattr(self.ctx, option_name, value_type(option_value))
+        self.ctx.journal("game_options", option_name)
         self.output(f"Set option {option_name} to {getattr(self.ctx, option_name)}")
         if option_name in {"release_mode", "remaining_mode", "collect_mode"}:
             self.ctx.broadcast_all([{"cmd": "RoomUpdate", 'permissions': get_permissions(self.ctx)}])
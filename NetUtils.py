@@ -2,12 +2,15 @@ from __future__ import annotations
 
 import typing
 import enum
+import pickle
+import struct
 import warnings
+import zlib
 from json import JSONEncoder, JSONDecoder
 
 import websockets
 
-from Utils import ByValue, Version
+from Utils import ByValue, Version, VersionException, restricted_loads
 
 
 class JSONMessagePart(typing.TypedDict, total=False):
@@ -83,15 +86,53 @@ class NetworkItem(typing.NamedTuple):
     flags: int = 0
 
 
+_plain_types = frozenset((str, int, float, bool, type(None)))
+
+
+def _typed_tuple_as_dict(obj: typing.Any) -> typing.Dict[str, typing.Any]:
+    data = obj._asdict()
+    data["class"] = obj.__class__.__name__
+    return data
+
+
+def _network_item_as_dict(obj: NetworkItem) -> typing.Dict[str, typing.Any]:
+    item, location, player, flags = obj
+    return {"item": item, "location": location, "player": player, "flags": flags, "class": "NetworkItem"}
+
+
+def _network_player_as_dict(obj: NetworkPlayer) -> typing.Dict[str, typing.Any]:
+    team, slot, alias, name = obj
+    return {"team": team, "slot": slot, "alias": alias, "name": name, "class": "NetworkPlayer"}
+
+
+def _network_slot_as_dict(obj: NetworkSlot) -> typing.Dict[str, typing.Any]:
+    name, game, slot_type, group_members = obj
+    return {"name": name, "game": game, "type": slot_type, "group_members": group_members, "class": "NetworkSlot"}
+
+
+_typed_tuple_converters: typing.Dict[type, typing.Callable[[typing.Any], typing.Dict[str, typing.Any]]] = {
+    NetworkItem: _network_item_as_dict,
+    NetworkPlayer: _network_player_as_dict,
+    NetworkSlot: _network_slot_as_dict,
+}
+""" the NamedTuples sent most, turned into dicts without going through _asdict """
+
+
 def _scan_for_TypedTuples(obj: typing.Any) -> typing.Any:
-    if isinstance(obj, tuple) and hasattr(obj, "_fields"):  # NamedTuple is not actually a parent class
-        data = obj._asdict()
-        data["class"] = obj.__class__.__name__
-        return data
-    if isinstance(obj, (tuple, list, set, frozenset)):
-        return tuple(_scan_for_TypedTuples(o) for o in obj)
+    """Returns obj with NamedTuples turned into dicts and sets into lists, without copying anything that has none."""
+    obj_type = type(obj)
+    if obj_type in _plain_types:
+        return obj
+    converter = _typed_tuple_converters.get(obj_type, None)
+    if converter:
+        return converter(obj)
+    if obj_type is list or obj_type is tuple or isinstance(obj, (tuple, list, set, frozenset)):
+        if hasattr(obj_type, "_fields"):  # NamedTuple is not actually a parent class
+            return _typed_tuple_as_dict(obj)
+        return [o if type(o) in _plain_types else _scan_for_TypedTuples(o) for o in obj]
     if isinstance(obj, dict):
-        return {key: _scan_for_TypedTuples(value) for key, value in obj.items()}
+        return {key: value if type(value) in _plain_types else _scan_for_TypedTuples(value)
+                for key, value in obj.items()}
     return obj
 
 
@@ -102,10 +143,48 @@ _encode = JSONEncoder(
 ).encode
 
 
-def encode(obj: typing.Any) -> str:
+def _encode_typed_tuples(obj: typing.Any) -> str:
     return _encode(_scan_for_TypedTuples(obj))
 
 
+try:
+    import orjson
+except ImportError:
+    encode = _encode_typed_tuples
+else:
+    def _orjson_default(obj: typing.Any) -> typing.Any:
+        # orjson encodes exact builtins itself and asks about everything else, which gets turned into what
+        # _scan_for_TypedTuples and JSONEncoder would make of it
+        converter = _typed_tuple_converters.get(obj.__class__, None)
+        if converter:
+            return converter(obj)
+        if isinstance(obj, tuple):
+            return _typed_tuple_as_dict(obj) if hasattr(obj, "_fields") else list(obj)
+        if isinstance(obj, (set, frozenset, list)):
+            return list(obj)
+        if isinstance(obj, dict):
+            # subclasses like LazyDict only show all their contents through their own methods
+            return dict(obj.items())
+        if isinstance(obj, int):  # IntEnum and IntFlag, bool can't be subclassed
+            return int(obj)
+        if isinstance(obj, float):
+            return float(obj)
+        if isinstance(obj, str):
+            return str(obj)
+        raise TypeError(f"Object of type {obj.__class__.__name__} is not JSON serializable")
+
+    # orjson would encode datetimes, dataclasses and subclasses of builtins on its own, differently from JSONEncoder
+    _orjson_options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | \
+        orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_PASSTHROUGH_SUBCLASS
+
+    def encode(obj: typing.Any) -> str:
+        try:
+            return orjson.dumps(obj, default=_orjson_default, option=_orjson_options).decode()
+        except TypeError:
+            # what orjson can't do, like integers beyond 64 bit or lone surrogates, JSONEncoder still can
+            return _encode_typed_tuples(obj)
+
+
 def get_any_version(data: dict) -> Version:
     data = {key.lower(): value for key, value in data.items()}  # .NET version classes have capitalized keys
     return Version(int(data["major"]), int(data["minor"]), int(data["build"]))
@@ -350,8 +429,13 @@ class Hint(typing.NamedTuple):
 
 
 class _LocationStore(dict, typing.MutableMapping[int, typing.Dict[int, typing.Tuple[int, int, int]]]):
+    _receiver_index: typing.Optional[
+        typing.Dict[typing.Tuple[int, int], typing.List[typing.Tuple[int, int, int, int, int]]]]
+    """ locations by (receiving_player, item_id), built on first hint """
+
     def __init__(self, values: typing.MutableMapping[int, typing.Dict[int, typing.Tuple[int, int, int]]]):
         super().__init__(values)
+        self._receiver_index = None
 
         if not self:
             raise ValueError(f"Rejecting game with 0 players")
@@ -364,10 +448,23 @@ class _LocationStore(dict, typing.MutableMapping[int, typing.Dict[int, typing.Tu
 
     def find_item(self, slots: typing.Set[int], seeked_item_id: int
                   ) -> typing.Generator[typing.Tuple[int, int, int, int, int], None, None]:
-        for finding_player, check_data in self.items():
-            for location_id, (item_id, receiving_player, item_flags) in check_data.items():
-                if receiving_player in slots and item_id == seeked_item_id:
-                    yield finding_player, location_id, item_id, receiving_player, item_flags
+        return self.find_items(slots, (seeked_item_id,))
+
+    def find_items(self, slots: typing.Set[int], seeked_item_ids: typing.Iterable[int]
+                   ) -> typing.Generator[typing.Tuple[int, int, int, int, int], None, None]:
+        """Yields (finding_player, location_id, item_id, receiving_player, item_flags) of any of the items for any of
+        the slots, in order of finding player and location."""
+        if self._receiver_index is None:
+            self._receiver_index = {}
+            for finding_player, check_data in self.items():
+                for location_id, (item_id, receiving_player, item_flags) in check_data.items():
+                    self._receiver_index.setdefault((receiving_player, item_id), []).append(
+                        (finding_player, location_id, item_id, receiving_player, item_flags))
+        item_ids = set(seeked_item_ids)
+        found = [location for receiving_player in slots for item_id in item_ids
+                 for location in self._receiver_index.get((receiving_player, item_id), ())]
+        found.sort()
+        yield from found
 
     def get_for_player(self, slot: int) -> typing.Dict[int, typing.Set[int]]:
         import collections
@@ -407,6 +504,103 @@ class _LocationStore(dict, typing.MutableMapping[int, typing.Dict[int, typing.Tu
                         location_id not in checked])
 
 
+multidata_format_version = 4
+multidata_index_header = struct.Struct("<I")
+lazy_multidata_sections = ("slot_data", "er_hint_data")
+""" sections of multidata stored per slot, so they only get unpickled once they are looked up """
+
+
+class MultidataSection(typing.Mapping[int, typing.Any]):
+    """One lazily loaded section of a multidata, unpickling the value of a slot each time it is looked up."""
+    data: bytes
+    index: typing.Dict[int, typing.Tuple[int, int]]
+    """ slot -> offset and length of its compressed value in data """
+
+    def __init__(self, data: bytes, index: typing.Dict[int, typing.Tuple[int, int]]) -> None:
+        self.data = data
+        self.index = index
+
+    def __getitem__(self, slot: int) -> typing.Any:
+        offset, length = self.index[slot]
+        return restricted_loads(zlib.decompress(self.data[offset:offset + length]))
+
+    def __iter__(self) -> typing.Iterator[int]:
+        return iter(self.index)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def compressed(self, slot: int) -> bytes:
+        offset, length = self.index[slot]
+        return self.data[offset:offset + length]
+
+
+class CachedMultidataSection(MultidataSection):
+    """MultidataSection that keeps the values it unpickled, for sections that get looked up all the time."""
+    cache: typing.Dict[int, typing.Any]
+
+    def __init__(self, data: bytes, index: typing.Dict[int, typing.Tuple[int, int]]) -> None:
+        super().__init__(data, index)
+        self.cache = {}
+
+    def __getitem__(self, slot: int) -> typing.Any:
+        if slot not in self.cache:
+            self.cache[slot] = super().__getitem__(slot)
+        return self.cache[slot]
+
+
+def compress_multidata(multidata: typing.Dict[str, typing.Any]) -> bytes:
+    """Returns multidata as the contents of an .archipelago file, with the values of each slot in the
+    lazy_multidata_sections compressed on their own."""
+    sections: typing.List[bytes] = []
+    offset = 0
+
+    def add_section(section: bytes) -> typing.Tuple[int, int]:
+        nonlocal offset
+        sections.append(section)
+        offset += len(section)
+        return offset - len(section), len(section)
+
+    index: typing.Dict[str, typing.Any] = {}
+    main = dict(multidata)
+    for name in lazy_multidata_sections:
+        if name in main:
+            values = main.pop(name)
+            index[name] = {slot: add_section(values.compressed(slot) if isinstance(values, MultidataSection)
+                                             else zlib.compress(pickle.dumps(value), 9))
+                           for slot, value in (values.index.items() if isinstance(values, MultidataSection)
+                                               else values.items())}
+    index["main"] = add_section(zlib.compress(pickle.dumps(main), 9))
+    packed_index = zlib.compress(pickle.dumps(index), 9)
+    return b"".join((bytes([multidata_format_version]), multidata_index_header.pack(len(packed_index)),
+                     packed_index, *sections))
+
+
+def decompress_multidata(data: bytes) -> typing.Dict[str, typing.Any]:
+    """Loads the contents of an .archipelago file of any format version. The lazy_multidata_sections of format 4
+    are loaded on lookup, slot_data every time to not keep it around and er_hint_data only once."""
+    format_version = data[0]
+    if format_version > multidata_format_version:
+        raise VersionException("Incompatible multidata.")
+    if format_version < 4:
+        return restricted_loads(zlib.decompress(data[1:]))
+    index_start = 1 + multidata_index_header.size
+    index_length, = multidata_index_header.unpack_from(data, 1)
+    view = memoryview(data)
+    index = restricted_loads(zlib.decompress(view[index_start:index_start + index_length]))
+    sections_start = index_start + index_length
+    offset, length = index.pop("main")
+    multidata = restricted_loads(zlib.decompress(view[sections_start + offset:sections_start + offset + length]))
+    for name, section_index in index.items():
+        # each section only keeps a copy of its own values, so neither data nor the main section stay alive
+        start = min((offset for offset, _ in section_index.values()), default=0)
+        end = max((offset + length for offset, length in section_index.values()), default=0)
+        multidata[name] = (CachedMultidataSection if name == "er_hint_data" else MultidataSection)(
+            bytes(view[sections_start + start:sections_start + end]),
+            {slot: (offset - start, length) for slot, (offset, length) in section_index.items()})
+    return multidata
+
+
 if typing.TYPE_CHECKING:  # type-check with pure python implementation until we have a typing stub
     LocationStore = _LocationStore
 else:
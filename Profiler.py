@@ -0,0 +1,239 @@
+"""
+Collects where the time of a generation goes, for Generate.py --profile.
+Times are per world stage per player, per generation phase, for region sweeps and for each access rule.
+"""
+import contextlib
+import json
+import logging
+import sys
+import threading
+import time
+import typing
+from collections import Counter, defaultdict
+
+from BaseClasses import CollectionState, Entrance, Location, MultiWorld
+
+__all__ = ["Profiler", "TimedRule"]
+
+logger = logging.getLogger("performance")
+
+
+class TimedRule:
+    """Wraps an access rule to count its calls and the time spent in it, not counting rules it calls in turn."""
+    __slots__ = ("rule", "stats", "profiler")
+
+    def __init__(self, rule: typing.Callable[[CollectionState], bool], stats: typing.List[float],
+                 profiler: "Profiler") -> None:
+        self.rule = rule
+        self.stats = stats
+        self.profiler = profiler
+
+    def __call__(self, state: CollectionState) -> bool:
+        local = self.profiler.local
+        outer_time = getattr(local, "nested_time", 0.0)
+        local.nested_time = 0.0
+        start = time.perf_counter()
+        try:
+            return self.rule(state)
+        finally:
+            taken = time.perf_counter() - start
+            self.stats[0] += 1
+            self.stats[1] += taken - local.nested_time
+            local.nested_time = outer_time + taken
+
+
+class Profiler:
+    multiworld: MultiWorld
+    start: float
+    phases: typing.Dict[str, float]
+    """seconds spent in each phase of Main, in order"""
+    stages: typing.Dict[str, typing.Dict[int, float]]
+    """seconds spent in each world stage, per player"""
+    stage_calls: typing.Dict[str, float]
+    """seconds spent in each stage_ classmethod, by qualified name"""
+    sweeps: typing.Counter[int]
+    """update_reachable_regions calls per player"""
+    sweep_time: typing.Counter[int]
+    rules: typing.Dict[typing.Union[Location, Entrance], typing.List[float]]
+    """calls and seconds of each wrapped access rule"""
+    local: threading.local
+
+    slowest_rule_count: typing.ClassVar[int] = 25
+
+    def __init__(self, multiworld: MultiWorld) -> None:
+        self.multiworld = multiworld
+        self.start = time.perf_counter()
+        self.phases = {}
+        self.stages = defaultdict(lambda: defaultdict(float))
+        self.stage_calls = defaultdict(float)
+        self.sweeps = Counter()
+        self.sweep_time = Counter()
+        self.rules = {}
+        self.local = threading.local()
+        self._phase: typing.Optional[typing.Tuple[str, float]] = None
+        self._update_reachable_regions: typing.Optional[typing.Callable[[CollectionState, int], None]] = None
+        self._add_rule: typing.Optional[typing.Callable[..., None]] = None
+        self._add_rule_modules: typing.List[typing.Any] = []
+
+    def add_call(self, method: typing.Callable[..., typing.Any], player: typing.Optional[int], taken: float) -> None:
+        """Records a world stage call, as timed by AutoWorld."""
+        if player:
+            self.stages[method.__name__][player] += taken
+        else:
+            self.stage_calls[method.__qualname__] += taken
+
+    def phase(self, name: typing.Optional[str]) -> None:
+        """Ends the current phase and starts timing the phase name, if given."""
+        now = time.perf_counter()
+        if self._phase:
+            previous, started = self._phase
+            self.phases[previous] = self.phases.get(previous, 0.0) + now - started
+        self._phase = (name, now) if name else None
+
+    def install(self) -> None:
+        """Starts counting region sweeps and wraps all access rules of the multiworld."""
+        if self._update_reachable_regions:
+            return
+        self._update_reachable_regions = update_reachable_regions = CollectionState.update_reachable_regions
+        sweeps, sweep_time = self.sweeps, self.sweep_time
+
+        def timed_update_reachable_regions(state: CollectionState, player: int) -> None:
+            start = time.perf_counter()
+            try:
+                update_reachable_regions(state, player)
+            finally:
+                sweeps[player] += 1
+                sweep_time[player] += time.perf_counter() - start
+
+        CollectionState.update_reachable_regions = timed_update_reachable_regions
+        for spot in self._spots():
+            self._time_rule(spot)
+
+        # add_rule gets the rules it combines unwrapped, worlds import it by name so it is patched where it got imported
+        from worlds.generic import Rules
+        self._add_rule = add_rule = Rules.add_rule
+
+        def timed_add_rule(spot: typing.Union[Location, Entrance], rule: typing.Callable[[CollectionState], bool],
+                           combine: str = "and") -> None:
+            old_rule = spot.__dict__.get("access_rule", None)
+            if isinstance(old_rule, TimedRule):
+                spot.access_rule = old_rule.rule
+            add_rule(spot, rule.rule if isinstance(rule, TimedRule) else rule, combine)
+            self._time_rule(spot)
+
+        self._add_rule_modules = [module for module in list(sys.modules.values())
+                                  if getattr(module, "__dict__", {}).get("add_rule", None) is add_rule]
+        for module in self._add_rule_modules:
+            module.add_rule = timed_add_rule
+
+    @contextlib.contextmanager
+    def installed(self) -> typing.Iterator[None]:
+        """Installs for the duration of the with block, everything is restored even if it raises."""
+        self.install()
+        try:
+            yield
+        finally:
+            self.uninstall()
+
+    def uninstall(self) -> None:
+        """Restores everything install changed."""
+        if not self._update_reachable_regions:
+            return
+        CollectionState.update_reachable_regions = self._update_reachable_regions
+        self._update_reachable_regions = None
+        for module in self._add_rule_modules:
+            module.add_rule = self._add_rule
+        self._add_rule_modules = []
+        self._add_rule = None
+        for spot in self._spots():
+            rule = spot.__dict__.get("access_rule", None)
+            if isinstance(rule, TimedRule):
+                spot.access_rule = rule.rule
+
+    def _time_rule(self, spot: typing.Union[Location, Entrance]) -> None:
+        # rules that are not set per spot are the defaults, which always pass
+        rule = spot.__dict__.get("access_rule", None)
+        if rule is not None and not isinstance(rule, TimedRule):
+            spot.access_rule = TimedRule(rule, self.rules.setdefault(spot, [0, 0.0]), self)
+
+    def _spots(self) -> typing.Iterator[typing.Union[Location, Entrance]]:
+        yield from self.multiworld.get_locations()
+        yield from self.multiworld.get_entrances()
+
+    def report(self) -> typing.Dict[str, typing.Any]:
+        multiworld = self.multiworld
+        worlds: typing.Dict[int, typing.Dict[str, typing.Any]] = {}
+        rule_calls: typing.Counter[int] = Counter()
+        rule_time: typing.Counter[int] = Counter()
+        for spot, (calls, taken) in self.rules.items():
+            rule_calls[spot.player] += calls
+            rule_time[spot.player] += taken
+        for player in multiworld.get_all_ids():
+            stages = {stage: times[player] for stage, times in self.stages.items() if player in times}
+            worlds[player] = {
+                "name": multiworld.get_player_name(player),
+                "game": multiworld.game[player],
+                "stages": stages,
+                "stage_time": sum(stages.values()),
+                "update_reachable_regions": {"calls": self.sweeps[player], "time": self.sweep_time[player]},
+                "access_rules": {"calls": int(rule_calls[player]), "time": rule_time[player]},
+            }
+        slowest_rules = sorted(self.rules.items(), key=lambda rule: rule[1][1], reverse=True)
+        return {
+            "seed": multiworld.seed_name,
+            "total_time": time.perf_counter() - self.start,
+            "phases": self.phases,
+            "stage_calls": dict(self.stage_calls),
+            "worlds": worlds,
+            "slowest_rules": [{
+                "player": spot.player,
+                "player_name": multiworld.get_player_name(spot.player),
+                "game": multiworld.game[spot.player],
+                "type": type(spot).__name__,
+                "name": spot.name,
+                "calls": int(calls),
+                "time": taken,
+                "time_per_call": taken / calls if calls else 0.0,
+            } for spot, (calls, taken) in slowest_rules[:self.slowest_rule_count] if calls],
+        }
+
+    @staticmethod
+    def summarize(report: typing.Dict[str, typing.Any]) -> str:
+        """Returns a readable summary of a report."""
+        lines = [f"Generation profile of seed {report['seed']}, {report['total_time']:.2f} seconds total.", "",
+                 "Phases:"]
+        lines += [f"  {phase:<24} {taken:10.3f}s" for phase, taken in report["phases"].items()]
+        lines += ["", "Worlds, slowest first:",
+                  f"  {'Player':<32} {'Game':<32} {'Stages':>10} {'Sweeps':>8} {'Sweep time':>11} "
+                  f"{'Rule calls':>11} {'Rule time':>10}"]
+        worlds = sorted(report["worlds"].values(), reverse=True,
+                        key=lambda world: world["stage_time"] + world["update_reachable_regions"]["time"] +
+                        world["access_rules"]["time"])
+        for world in worlds:
+            sweeps, rules = world["update_reachable_regions"], world["access_rules"]
+            lines.append(f"  {world['name'][:32]:<32} {world['game'][:32]:<32} {world['stage_time']:9.3f}s "
+                         f"{sweeps['calls']:>8} {sweeps['time']:10.3f}s {rules['calls']:>11} {rules['time']:9.3f}s")
+        for world in worlds:
+            slow_stages = {stage: taken for stage, taken in world["stages"].items() if taken >= 0.01}
+            if slow_stages:
+                lines.append(f"  {world['name']} stages: " +
+                             ", ".join(f"{stage} {taken:.3f}s" for stage, taken in
+                                       sorted(slow_stages.items(), key=lambda stage: stage[1], reverse=True)))
+        if report["stage_calls"]:
+            lines += ["", "Stage calls:"]
+            lines += [f"  {name:<48} {taken:10.3f}s" for name, taken in report["stage_calls"].items()]
+        if report["slowest_rules"]:
+            lines += ["", "Slowest access rules:"]
+            lines += [f"  {rule['time']:9.3f}s {rule['calls']:>9} calls  {rule['game']} {rule['type']} "
+                      f"{rule['name']!r} of {rule['player_name']}" for rule in report["slowest_rules"]]
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> None:
+        """Writes the report as path.json and its summary as path.txt."""
+        report = self.report()
+        with open(f"{path}.json", "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        summary = self.summarize(report)
+        with open(f"{path}.txt", "w", encoding="utf-8") as f:
+            f.write(summary)
+        logger.info(f"Wrote generation profile to {path}.json and {path}.txt")
@@ -352,16 +352,23 @@ def load_data_package_for_checksum(game: str, checksum: typing.Optional[str]) ->
     return {}
 
 
-def store_data_package_for_checksum(game: str, data: typing.Dict[str, Any]) -> None:
+def store_data_package_for_checksum(game: str, data: typing.Dict[str, Any], replace: bool = False) -> None:
+    """Stores data under its checksum, keeping a data package stored there already unless replace is set.
+    Other processes may be reading it, so it gets written to a temporary file that then takes its place."""
     checksum = data.get("checksum")
     if checksum and game:
         if checksum != get_file_safe_name(checksum):
             raise ValueError(f"Bad symbols in checksum: {checksum}")
         game_folder = cache_path("datapackage", get_file_safe_name(game))
+        path = os.path.join(game_folder, f"{checksum}.json")
+        if not replace and os.path.exists(path):
+            return
         os.makedirs(game_folder, exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}"
         try:
-            with open(os.path.join(game_folder, f"{checksum}.json"), "w", encoding="utf-8-sig") as f:
+            with open(temp_path, "w", encoding="utf-8-sig") as f:
                 json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(temp_path, path)
         except Exception as e:
             logging.debug(f"Could not store data package: {e}")
 
@@ -472,6 +479,97 @@ class KeyedDefaultDict(collections.defaultdict):
         return value
 
 
+class LazyDict(dict):
+    """
+    dict that asks load_key to fill in a key it doesn't have yet, and load_all to fill in everything before being
+    looked at as a whole. The loaders don't return anything, they put what they loaded into the dict.
+    """
+    load_key: typing.Optional[typing.Callable[[typing.Any], None]]
+    load_all: typing.Optional[typing.Callable[[], None]]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.load_key = None
+        self.load_all = None
+
+    def _load_key(self, key) -> bool:
+        if dict.__contains__(self, key):
+            return True
+        if self.load_key:
+            self.load_key(key)
+            return dict.__contains__(self, key)
+        return False
+
+    def _load_all(self) -> None:
+        if self.load_all:
+            self.load_all()
+
+    def __missing__(self, key):
+        if self._load_key(key):
+            return dict.__getitem__(self, key)
+        raise KeyError(key)
+
+    def __contains__(self, key) -> bool:
+        return self._load_key(key)
+
+    def get(self, key, default=None):
+        return dict.__getitem__(self, key) if self._load_key(key) else default
+
+    def pop(self, key, *default):
+        self._load_key(key)
+        return super().pop(key, *default)
+
+    def setdefault(self, key, default=None):
+        self._load_key(key)
+        return super().setdefault(key, default)
+
+    def __iter__(self):
+        self._load_all()
+        return super().__iter__()
+
+    def __reversed__(self):
+        self._load_all()
+        return super().__reversed__()
+
+    def __len__(self) -> int:
+        self._load_all()
+        return super().__len__()
+
+    def keys(self):
+        self._load_all()
+        return super().keys()
+
+    def values(self):
+        self._load_all()
+        return super().values()
+
+    def items(self):
+        self._load_all()
+        return super().items()
+
+    def copy(self) -> typing.Dict:
+        self._load_all()
+        return dict(super().items())
+
+    def __eq__(self, other) -> bool:
+        self._load_all()
+        return super().__eq__(other)
+
+    def __ne__(self, other) -> bool:
+        self._load_all()
+        return super().__ne__(other)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        self._load_all()
+        return super().__repr__()
+
+    def __reduce__(self):
+        # the loaders belong to the process that made them, elsewhere this is just a full dict
+        return dict, (self.copy(),)
+
+
 def get_text_between(text: str, start: str, end: str) -> str:
     return text[text.index(start) + len(start): text.rindex(end)]
 
@@ -9,7 +9,7 @@ from pony.orm import commit
 from WebHostLib import app
 from WebHostLib.check import get_yaml_data, roll_options
 from WebHostLib.generate import get_meta
-from WebHostLib.models import Generation, STATE_QUEUED, Seed, STATE_ERROR
+from WebHostLib.models import Generation, STATE_QUEUED, Seed, STATE_ERROR, notify_generations
 from . import api_endpoints
 
 
@@ -60,6 +60,7 @@ def generate_api():
                 # convert to json compatible
                 meta=json.dumps(meta), state=STATE_QUEUED,
                 owner=session["_id"])
+            notify_generations()
             commit()
             return {"text": f"Generation of seed {gen.id} started successfully.",
                     "detail": gen.id,
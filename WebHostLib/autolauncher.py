@@ -1,11 +1,13 @@
 from __future__ import annotations
 
+import heapq
 import json
 import logging
 import multiprocessing
+import time
 import typing
 from datetime import timedelta, datetime
-from threading import Event, Thread
+from threading import Event, Lock, Thread
 from uuid import UUID
 
 from pony.orm import db_session, select, commit
@@ -14,6 +16,12 @@ from Utils import restricted_loads
 from .locker import Locker, AlreadyRunningException
 
 _stop_event = Event()
+scheduler_stats_interval = 10 * 60  # seconds between logging the stats of autohost and autogen
+# estimated share of a CPU core taken by a room and by a connected client, added to the load a server process reports,
+# so rooms placed in between reports spread out and idle processes get rooms before busy ones
+room_load = 0.005
+client_load = 0.01
+memory_load = 0.1  # per GiB, so memory decides between hosters that are about as busy
 
 
 def stop():
@@ -24,6 +32,45 @@ def stop():
     stop_event.set()
 
 
+class SchedulerStats:
+    """What a scheduler has waiting and how long it took to get things going, logged and reset periodically."""
+    name: str
+    queued: int
+    started: int
+    latency_total: float
+    latency_max: float
+
+    def __init__(self, name: str):
+        self.name = name
+        self.queued = 0
+        self.lock = Lock()
+        self.reset()
+
+    def reset(self):
+        self.started = 0
+        self.latency_total = 0.
+        self.latency_max = 0.
+
+    def record(self, latency: float):
+        with self.lock:
+            self.started += 1
+            self.latency_total += latency
+            self.latency_max = max(self.latency_max, latency)
+
+    def report(self):
+        with self.lock:
+            latency_average = self.latency_total / self.started if self.started else 0.
+            logging.info(f"{self.name}: {self.queued} queued, {self.started} started, "
+                         f"latency {latency_average:.2f}s average, {self.latency_max:.2f}s max")
+            self.reset()
+
+
+room_stats = SchedulerStats("Autohost")
+""" queued are the rooms that should be hosted, latency is from a room's activity to handing it to a hoster """
+generation_stats = SchedulerStats("Autogen")
+""" queued are the generations in the pool, latency is from handing one to the pool to it finishing """
+
+
 def handle_generation_success(seed_id):
     logging.info(f"Generation finished for seed {seed_id}")
 
@@ -36,6 +83,21 @@ def handle_generation_failure(result: BaseException):
 
 
 def launch_generator(pool: multiprocessing.pool.Pool, generation: Generation):
+    launched = time.monotonic()
+
+    def done():
+        with generation_stats.lock:
+            generation_stats.queued -= 1
+        generation_stats.record(time.monotonic() - launched)
+
+    def success(seed_id):
+        done()
+        handle_generation_success(seed_id)
+
+    def failure(result: BaseException):
+        done()
+        handle_generation_failure(result)
+
     try:
         meta = json.loads(generation.meta)
         options = restricted_loads(generation.options)
@@ -44,13 +106,15 @@ def launch_generator(pool: multiprocessing.pool.Pool, generation: Generation):
                          {"meta": meta,
                           "sid": generation.id,
                           "owner": generation.owner},
-                         handle_generation_success, handle_generation_failure)
+                         success, failure)
     except Exception as e:
         generation.state = STATE_ERROR
         commit()
         logging.exception(e)
     else:
         generation.state = STATE_STARTED
+        with generation_stats.lock:
+            generation_stats.queued += 1
 
 
 def init_db(pony_config: dict):
@@ -71,6 +135,69 @@ def cleanup():
         logging.info(f"{rooms} Rooms, {seeds} Seeds and {slots} Slots have been deleted.")
 
 
+class RoomSchedule:
+    """The rooms that should be hosted, ordered by when they time out. Everything that wants a room hosted updates its
+    last_activity, so refreshing only queries rooms with activity since the last refresh, using the index on it."""
+    late_commit_margin: typing.ClassVar[timedelta] = timedelta(seconds=10)
+    """ activity committed up to this long after it happened still gets picked up """
+    deadlines: typing.Dict[UUID, datetime]
+    timeouts: typing.List[typing.Tuple[datetime, UUID]]
+    """ heap of when rooms time out, a room's entry may be older than its deadline """
+
+    def __init__(self):
+        self.deadlines = {}
+        self.timeouts = []
+        self.refreshed = datetime.utcnow() - timedelta(days=3) + self.late_commit_margin
+
+    @db_session
+    def refresh(self) -> typing.List[typing.Tuple[UUID, datetime]]:
+        """Returns the rooms with new activity that should be hosted, along with when that activity was."""
+        now = datetime.utcnow()
+        since = self.refreshed - self.late_commit_margin
+        self.refreshed = now
+        rooms = []
+        for room_id, last_activity, timeout in select(
+                (room.id, room.last_activity, room.timeout) for room in Room if room.last_activity >= since):
+            if self._schedule(room_id, last_activity + timedelta(seconds=timeout + 5), now):
+                rooms.append((room_id, last_activity))
+        self.expire(now)
+        return rooms
+
+    @db_session
+    def check_shut_down(self, room_id: UUID) -> bool:
+        """Returns whether a room that shut down should be hosted again. Shutting down sets a room's activity back in
+        time, which refreshing doesn't pick up, so the room gets read again."""
+        room = Room.get(id=room_id)
+        if not room:
+            self.deadlines.pop(room_id, None)
+            return False
+        self._schedule(room_id, room.last_activity + timedelta(seconds=room.timeout + 5), datetime.utcnow())
+        return room_id in self.deadlines
+
+    def _schedule(self, room_id: UUID, deadline: datetime, now: datetime) -> bool:
+        """Returns whether the deadline of the room changed, with it still to come."""
+        if deadline < now:
+            self.deadlines.pop(room_id, None)
+            return False
+        if self.deadlines.get(room_id, None) == deadline:
+            return False
+        if room_id not in self.deadlines:
+            heapq.heappush(self.timeouts, (deadline, room_id))
+        self.deadlines[room_id] = deadline
+        return True
+
+    def expire(self, now: datetime):
+        while self.timeouts and self.timeouts[0][0] < now:
+            _, room_id = heapq.heappop(self.timeouts)
+            deadline = self.deadlines.get(room_id, None)
+            if not deadline:
+                continue
+            if deadline < now:
+                del self.deadlines[room_id]
+            else:
+                heapq.heappush(self.timeouts, (deadline, room_id))
+
+
 def autohost(config: dict):
     def keep_running():
         stop_event = _stop_event
@@ -83,15 +210,29 @@ def autohost(config: dict):
                     hosters.append(hoster)
                     hoster.start()
 
-                while not stop_event.wait(0.1):
-                    with db_session:
-                        rooms = select(
-                            room for room in Room if
-                            room.last_activity >= datetime.utcnow() - timedelta(days=3))
-                        for room in rooms:
-                            # we have to filter twice, as the per-room timeout can't currently be PonyORM transpiled.
-                            if room.last_activity >= datetime.utcnow() - timedelta(seconds=room.timeout + 5):
-                                hosters[room.id.int % len(hosters)].start_room(room.id)
+                schedule = RoomSchedule()
+                listener = DBListener(config["PONY"], ROOM_ACTIVITY_CHANNEL,
+                                      poll_interval=0.5, notified_poll_interval=5)
+                next_report = time.monotonic() + scheduler_stats_interval
+                while not stop_event.is_set():
+                    for hoster in hosters:
+                        hoster.update_stats()
+                    for room_id, last_activity in schedule.refresh():
+                        if place_room(hosters, room_id):
+                            room_stats.record((datetime.utcnow() - last_activity).total_seconds())
+                    for hoster in hosters:
+                        # rooms that shut down while getting new activity have to be started again
+                        for room_id in hoster.collect_shut_down_rooms():
+                            if schedule.check_shut_down(room_id):
+                                place_room(hosters, room_id)
+                    room_stats.queued = len(schedule.deadlines)
+                    if time.monotonic() > next_report:
+                        room_stats.report()
+                        for hoster in hosters:
+                            logging.info(f"{hoster.name}: load {hoster.get_load():.2f}, {len(hoster.room_ids)} rooms, "
+                                         f"{hoster.clients} clients, {hoster.memory} bytes")
+                        next_report += scheduler_stats_interval
+                    listener.wait(stop_event)
 
         except AlreadyRunningException:
             logging.info("Autohost reports as already running, not starting another.")
@@ -122,7 +263,10 @@ def autogen(config: dict):
                             commit()
                         select(generation for generation in Generation if generation.state == STATE_ERROR).delete()
 
-                    while not stop_event.wait(0.1):
+                    listener = DBListener(config["PONY"], GENERATION_CHANNEL,
+                                          poll_interval=0.5, notified_poll_interval=5)
+                    next_report = time.monotonic() + scheduler_stats_interval
+                    while not stop_event.is_set():
                         with db_session:
                             # for update locks the database row(s) during transaction, preventing writes from elsewhere
                             to_start = select(
@@ -130,12 +274,24 @@ def autogen(config: dict):
                                 if generation.state == STATE_QUEUED).for_update()
                             for generation in to_start:
                                 launch_generator(generator_pool, generation)
+                        if time.monotonic() > next_report:
+                            generation_stats.report()
+                            next_report += scheduler_stats_interval
+                        listener.wait(stop_event)
         except AlreadyRunningException:
             logging.info("Autogen reports as already running, not starting another.")
 
     Thread(target=keep_running, name="AP_Autogen").start()
 
 
+def place_room(hosters: typing.List[MultiworldInstance], room_id: UUID) -> bool:
+    """Starts the room on the least loaded hoster, returns False if it is already hosted. Rooms go wherever there is
+    room at the time, so one that shut down may start on a different hoster than before."""
+    if any(room_id in hoster.room_ids for hoster in hosters):
+        return False
+    return min(hosters, key=MultiworldInstance.get_load).start_room(room_id)
+
+
 multiworlds: typing.Dict[type(Room.id), MultiworldInstance] = {}
 
 
@@ -149,6 +305,14 @@ class MultiworldInstance():
         self.host = config["HOST_ADDRESS"]
         self.rooms_to_start = multiprocessing.Queue()
         self.rooms_shutting_down = multiprocessing.Queue()
+        self.process_stats = multiprocessing.Queue()
+        self.stats: typing.Dict[str, typing.Any] = {}
+        self.cpu_load = 0.
+        """ share of a CPU core the server process used between its last two reports """
+        self.memory = 0
+        self.clients = 0
+        self.rooms_placed = 0
+        """ rooms started since the last report, which the report doesn't show the cost of yet """
         self.name = f"MultiHoster{id}"
 
     def start(self):
@@ -158,19 +322,53 @@ class MultiworldInstance():
         process = multiprocessing.Process(group=None, target=run_server_process,
                                           args=(self.name, self.ponyconfig, get_static_server_data(),
                                                 self.cert, self.key, self.host,
-                                                self.rooms_to_start, self.rooms_shutting_down),
+                                                self.rooms_to_start, self.rooms_shutting_down, self.process_stats),
                                           name=self.name)
         process.start()
         self.process = process
-
-    def start_room(self, room_id):
-        while not self.rooms_shutting_down.empty():
-            self.room_ids.remove(self.rooms_shutting_down.get(block=True, timeout=None))
+        self.stats = {}
+        self.cpu_load = 0.
+        self.memory = 0
+        self.clients = 0
+        self.rooms_placed = 0
+
+    def start_room(self, room_id) -> bool:
+        """Returns whether the room was started, rather than already being hosted."""
         if room_id in self.room_ids:
-            pass  # should already be hosted currently.
-        else:
-            self.room_ids.add(room_id)
-            self.rooms_to_start.put(room_id)
+            return False  # should already be hosted currently.
+        self.room_ids.add(room_id)
+        self.rooms_placed += 1
+        self.rooms_to_start.put(room_id)
+        return True
+
+    def collect_shut_down_rooms(self) -> typing.List[UUID]:
+        rooms = []
+        while not self.rooms_shutting_down.empty():
+            room_id = self.rooms_shutting_down.get(block=True, timeout=None)
+            self.room_ids.remove(room_id)
+            rooms.append(room_id)
+        return rooms
+
+    def update_stats(self):
+        """Takes the latest report of memory, CPU time and clients per room from the server process."""
+        while not self.process_stats.empty():
+            self.record_stats(self.process_stats.get(block=True, timeout=None))
+
+    def record_stats(self, stats: typing.Dict[str, typing.Any]):
+        previous = self.stats
+        self.stats = stats
+        if previous and stats["time"] > previous["time"]:
+            self.cpu_load = max(0., (stats["cpu_time"] - previous["cpu_time"]) / (stats["time"] - previous["time"]))
+        # without psutil the process can't tell its memory, the estimates of its rooms have to do
+        self.memory = stats["memory"] or sum(room["memory"] for room in stats["rooms"].values())
+        self.clients = sum(room["clients"] for room in stats["rooms"].values())
+        self.rooms_placed = 0
+
+    def get_load(self) -> float:
+        """Estimated share of a CPU core the server process uses, counting rooms started since its last report, plus
+        how much memory it uses."""
+        return self.cpu_load + self.memory / 2 ** 30 * memory_load + self.rooms_placed * room_load \
+            + self.clients * client_load
 
     def stop(self):
         if self.process:
@@ -185,6 +383,7 @@ class MultiworldInstance():
         self.process = None
 
 
-from .models import Room, Generation, STATE_QUEUED, STATE_STARTED, STATE_ERROR, db, Seed, Slot
-from .customserver import run_server_process, get_static_server_data
+from .models import Room, Generation, STATE_QUEUED, STATE_STARTED, STATE_ERROR, db, Seed, Slot, \
+    GENERATION_CHANNEL, ROOM_ACTIVITY_CHANNEL
+from .customserver import DBListener, run_server_process, get_static_server_data
 from .generate import gen_game
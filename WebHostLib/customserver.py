@@ -8,6 +8,7 @@ import logging
 import multiprocessing
 import pickle
 import random
+import selectors
 import socket
 import threading
 import time
@@ -15,14 +16,15 @@ import typing
 import sys
 
 import websockets
-from pony.orm import commit, db_session, select
+from pony.orm import commit, db_session, rollback, select
 
 import Utils
 
-from MultiServer import Context, server, auto_shutdown, ServerCommandProcessor, ClientMessageProcessor, load_server_cert
+from MultiServer import Context, server, auto_shutdown, ServerCommandProcessor, ClientMessageProcessor, \
+    apply_save_journal, load_server_cert
 from Utils import restricted_loads, cache_argsless
 from .locker import Locker
-from .models import Command, GameDataPackage, Room, db
+from .models import ROOM_COMMAND_CHANNEL, Command, GameDataPackage, Room, RoomJournal, TrackerSnapshot, db
 
 
 class CustomClientMessageProcessor(ClientMessageProcessor):
@@ -34,11 +36,13 @@ class CustomClientMessageProcessor(ClientMessageProcessor):
         """
         if platform.lower().startswith("t"):  # twitch
             self.ctx.video[self.client.team, self.client.slot] = "Twitch", user
+            self.ctx.journal("video", (self.client.team, self.client.slot))
             self.ctx.save()
             self.output(f"Registered Twitch Stream https://www.twitch.tv/{user}")
             return True
         elif platform.lower().startswith("y"):  # youtube
             self.ctx.video[self.client.team, self.client.slot] = "Youtube", user
+            self.ctx.journal("video", (self.client.team, self.client.slot))
             self.ctx.save()
             self.output(f"Registered Youtube Stream for {user}")
             return True
@@ -57,13 +61,199 @@ class DBCommandProcessor(ServerCommandProcessor):
         self.ctx.logger.info(text)
 
 
+class DBListener:
+    """Waits for notifications on a channel of a postgres database. On other databases, or once listening fails, it
+    waits for poll_interval instead, so whatever it wakes up polls."""
+    poll_interval: float
+    notified_poll_interval: float
+    """ in case a notification gets lost """
+
+    def __init__(self, ponyconfig: dict, channel: str, poll_interval: float, notified_poll_interval: float):
+        self.channel = channel
+        self.poll_interval = poll_interval
+        self.notified_poll_interval = notified_poll_interval
+        self.connection = self._listen(ponyconfig)
+        self.selector: typing.Optional[selectors.BaseSelector] = None
+        if self.connection:
+            self.selector = selectors.DefaultSelector()
+            self.selector.register(self.connection, selectors.EVENT_READ)
+
+    def _listen(self, ponyconfig: dict) -> typing.Any:
+        if ponyconfig.get("provider", None) != "postgres":
+            return None
+        try:
+            import psycopg2
+            connection = psycopg2.connect(**{key: value for key, value in ponyconfig.items() if key != "provider"})
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {self.channel}")
+        except Exception as e:
+            logging.warning(f"Could not listen on {self.channel}, polling instead: {e}")
+            return None
+        return connection
+
+    def wait(self, stop_event: typing.Optional[threading.Event] = None) -> bool:
+        """Returns whether a notification came in, stop_event cuts polling short."""
+        if not self.connection:
+            if stop_event:
+                stop_event.wait(self.poll_interval)
+            else:
+                time.sleep(self.poll_interval)
+            return False
+        try:
+            if self.selector.select(self.notified_poll_interval):
+                self.connection.poll()
+                self.connection.notifies.clear()
+                return True
+        except Exception as e:
+            logging.warning(f"Lost connection listening on {self.channel}, polling instead: {e}")
+            self.selector.close()
+            self.connection = self.selector = None
+        return False
+
+
+class DBCommandDispatcher(threading.Thread):
+    """Hands the Commands of all rooms hosted by a server process to them, with one query for all rooms.
+    On postgres it waits for notifications of new commands, otherwise it polls."""
+    contexts: typing.Dict[typing.Any, WebHostContext]
+    """ rooms of the process by id, only ever changed from the event loop """
+
+    def __init__(self, ponyconfig: dict, contexts: typing.Dict[typing.Any, WebHostContext]):
+        super().__init__(name="DBCommandDispatcher", daemon=True)
+        self.contexts = contexts
+        self.listener = DBListener(ponyconfig, ROOM_COMMAND_CHANNEL, poll_interval=0.5, notified_poll_interval=5)
+
+    @db_session
+    def dispatch(self):
+        contexts = dict(self.contexts)
+        if not contexts:
+            return
+        room_ids = list(contexts)
+        commands = select(command for command in Command if command.room.id in room_ids).order_by(Command.id)
+        for command in commands:
+            ctx = contexts[command.room.id]
+            ctx.main_loop.call_soon_threadsafe(ctx.db_command_processor, command.commandtext)
+            command.delete()
+
+    def run(self):
+        while 1:
+            self.listener.wait()
+            try:
+                self.dispatch()
+            except Exception as e:
+                logging.exception(e)
+
+
+class SharedGameData(typing.NamedTuple):
+    """A data package and the name lookups built from it, shared by all rooms of a process using it.
+    Nothing in here may be modified."""
+    game: str
+    checksum: typing.Optional[str]
+    package: typing.Dict[str, typing.Any]
+    """ data package without name groups, as sent to clients """
+    item_name_groups: typing.Dict[str, typing.Set[str]]
+    location_name_groups: typing.Dict[str, typing.Set[str]]
+    item_names: typing.Dict[int, str]
+    location_names: typing.Dict[int, str]
+    all_item_and_group_names: typing.FrozenSet[str]
+    all_location_and_group_names: typing.FrozenSet[str]
+    size: int
+    """ bytes of the pickled data package, 0 for the static data packages every room has anyway """
+
+
+class GameDataStore:
+    """Hands out SharedGameData to the rooms of a process, counting how many rooms use each.
+    Static data packages are built on first use and kept, custom ones are dropped once no room uses them anymore."""
+    static_server_data: typing.Dict[str, typing.Any]
+    games: typing.Dict[typing.Tuple[str, str], SharedGameData]
+    static_games: typing.Dict[str, SharedGameData]
+    refcounts: typing.Counter[typing.Tuple[str, str]]
+
+    def __init__(self, static_server_data: typing.Dict[str, typing.Any]):
+        self.static_server_data = static_server_data
+        self.games = {}
+        self.static_games = {}
+        self.refcounts = collections.Counter()
+
+    def static_game_names(self) -> typing.Iterable[str]:
+        return self.static_server_data.get("gamespackage", {}).keys()
+
+    def static_game(self, game: str) -> typing.Optional[SharedGameData]:
+        game_data = self.static_games.get(game, None)
+        if game_data is None and game in self.static_game_names():
+            game_data = self.static_games[game] = self._build(
+                game, self.static_server_data["gamespackage"][game],
+                self.static_server_data["item_name_groups"].get(game, {}),
+                self.static_server_data["location_name_groups"].get(game, {}), 0)
+        return game_data
+
+    def acquire(self, game: str, checksum: typing.Optional[str],
+                load: typing.Callable[[], bytes]) -> SharedGameData:
+        """Returns the data package of game with checksum, calling load for the pickled data package if no room of
+        this process uses it yet. Every acquire has to be followed by a release once the room is done with it."""
+        key = (game, checksum)
+        game_data = self.games.get(key, None) if checksum else None
+        if game_data is None:
+            data = load()
+            package = dict(restricted_loads(data))
+            game_data = self._build(game, package, package.pop("item_name_groups", {}),
+                                    package.pop("location_name_groups", {}), len(data))
+            if not checksum:
+                return game_data  # can't tell whether another room has the same data package, so don't share it
+            self.games[key] = game_data
+        self.refcounts[key] += 1
+        return game_data
+
+    def release(self, game_data: SharedGameData) -> None:
+        key = (game_data.game, game_data.checksum)
+        if self.games.get(key, None) is not game_data:
+            return
+        self.refcounts[key] -= 1
+        if self.refcounts[key] <= 0:
+            del self.refcounts[key], self.games[key]
+
+    def _build(self, game: str, package: typing.Dict[str, typing.Any],
+               item_name_groups: typing.Dict[str, typing.Set[str]],
+               location_name_groups: typing.Dict[str, typing.Set[str]], size: int) -> SharedGameData:
+        item_names = Utils.KeyedDefaultDict(lambda code: f"Unknown item (ID:{code})",
+                                            {item_id: name for name, item_id in package["item_name_to_id"].items()})
+        location_names = Utils.KeyedDefaultDict(lambda code: f"Unknown location (ID:{code})",
+                                                {location_id: name for name, location_id
+                                                 in package["location_name_to_id"].items()})
+        archipelago = self.static_game("Archipelago") if game != "Archipelago" else None
+        if archipelago:
+            # Add Archipelago items and locations to each data package.
+            item_names.update(archipelago.item_names)
+            location_names.update(archipelago.location_names)
+        return SharedGameData(game, package.get("checksum", None), package, item_name_groups, location_name_groups,
+                              item_names, location_names,
+                              frozenset(package["item_name_to_id"]) | frozenset(item_name_groups),
+                              frozenset(package["location_name_to_id"]) | frozenset(location_name_groups), size)
+
+    def get_stats(self) -> typing.Dict[str, int]:
+        return {
+            "static_games": len(self.static_games),
+            "custom_games": len(self.games),
+            "custom_games_size": sum(game_data.size for game_data in self.games.values()),
+        }
+
+
 class WebHostContext(Context):
     room_id: int
-
-    def __init__(self, static_server_data: dict, logger: logging.Logger):
+    game_data_store: GameDataStore
+    game_data: typing.Dict[str, SharedGameData]
+    """ data packages of this room, by game """
+    multidata_size: int
+    db_command_processor: DBCommandProcessor
+    tracker_snapshot_stale: bool
+    """ whether the published tracker snapshot is missing or of an older generation than the save """
+
+    def __init__(self, static_server_data: dict, logger: logging.Logger,
+                 game_data_store: typing.Optional[GameDataStore] = None):
         # static server data is used during _load_game_data to load required data,
         # without needing to import worlds system, which takes quite a bit of memory
         self.static_server_data = static_server_data
+        self.game_data_store = game_data_store or GameDataStore(static_server_data)
         super(WebHostContext, self).__init__("", 0, "", "", 1,
                                              40, True, "enabled", "enabled",
                                              "enabled", 0, 2, logger=logger)
@@ -71,6 +261,8 @@ class WebHostContext(Context):
         self.main_loop = asyncio.get_running_loop()
         self.video = {}
         self.tags = ["AP", "WebHost"]
+        self.multidata_size = 0
+        self.tracker_snapshot_stale = True
 
     def __del__(self):
         try:
@@ -81,23 +273,44 @@ class WebHostContext(Context):
             self.logger.debug("Context destroyed")
 
     def _load_game_data(self):
-        for key, value in self.static_server_data.items():
-            # NOTE: attributes are mutable and shared, so they will have to be copied before being modified
-            setattr(self, key, value)
-        self.non_hintable_names = collections.defaultdict(frozenset, self.non_hintable_names)
-
-    def listen_to_db_commands(self):
-        cmdprocessor = DBCommandProcessor(self)
-
-        while not self.exit_event.is_set():
-            with db_session:
-                commands = select(command for command in Command if command.room.id == self.room_id)
-                if commands:
-                    for command in commands:
-                        self.main_loop.call_soon_threadsafe(cmdprocessor, command.commandtext)
-                        command.delete()
-                    commit()
-            time.sleep(5)
+        # NOTE: the data packages and name lookups are shared with the other rooms of this process,
+        # so they will have to be copied before being modified
+        self.non_hintable_names = collections.defaultdict(frozenset, self.static_server_data["non_hintable_names"])
+        self.item_names = collections.defaultdict(
+            lambda: Utils.KeyedDefaultDict(lambda code: f"Unknown item (ID:{code})"))
+        self.location_names = collections.defaultdict(
+            lambda: Utils.KeyedDefaultDict(lambda code: f"Unknown location (ID:{code})"))
+        self.game_data = {}
+        for game in self.game_data_store.static_game_names():
+            self.game_data[game] = self.game_data_store.static_game(game)
+
+    def _init_game_data(self):
+        for game, game_data in self.game_data.items():
+            self.gamespackage[game] = game_data.package
+            if game_data.checksum:
+                self.checksums[game] = game_data.checksum
+            self.item_name_groups[game] = game_data.item_name_groups
+            self.location_name_groups[game] = game_data.location_name_groups
+            self.item_names[game] = game_data.item_names
+            self.location_names[game] = game_data.location_names
+            self.all_item_and_group_names[game] = game_data.all_item_and_group_names
+            self.all_location_and_group_names[game] = game_data.all_location_and_group_names
+
+    def release_game_data(self):
+        """Gives the custom data packages of this room back to the game data store."""
+        for game_data in self.game_data.values():
+            self.game_data_store.release(game_data)
+        self.game_data.clear()
+
+    def get_stats(self) -> typing.Dict[str, typing.Any]:
+        """Returns what this room costs its process, splitting custom data packages between the rooms using them."""
+        store = self.game_data_store
+        shared_size = sum(game_data.size / max(1, store.refcounts[game_data.game, game_data.checksum])
+                          for game_data in self.game_data.values())
+        return {
+            "clients": sum(1 for endpoint in self.endpoints if endpoint.auth),
+            "memory": self.multidata_size + self.snapshot_size + int(shared_size),
+        }
 
     @db_session
     def load(self, room_id: int):
@@ -109,65 +322,147 @@ class WebHostContext(Context):
             self.port = get_random_port()
 
         multidata = self.decompress(room.seed.multidata)
-        game_data_packages = {}
-
-        static_gamespackage = self.gamespackage  # this is shared across all rooms
-        static_item_name_groups = self.item_name_groups
-        static_location_name_groups = self.location_name_groups
-        self.gamespackage = {"Archipelago": static_gamespackage.get("Archipelago", {})}  # this may be modified by _load
-        self.item_name_groups = {"Archipelago": static_item_name_groups.get("Archipelago", {})}
-        self.location_name_groups = {"Archipelago": static_location_name_groups.get("Archipelago", {})}
-
-        for game in list(multidata.get("datapackage", {})):
-            game_data = multidata["datapackage"][game]
-            if "checksum" in game_data:
-                if static_gamespackage.get(game, {}).get("checksum") == game_data["checksum"]:
-                    # non-custom. remove from multidata and use static data
-                    # games package could be dropped from static data once all rooms embed data package
-                    del multidata["datapackage"][game]
-                else:
+        self.multidata_size = len(room.seed.multidata)
+
+        # data packages are taken from the game data store instead, so they are shared with other rooms
+        for game, game_data in multidata.pop("datapackage", {}).items():
+            checksum = game_data.get("checksum", None)
+            static = self.game_data_store.static_game(game)
+            if checksum and static and static.checksum == checksum:
+                continue  # non-custom, already using the static data package
+
+            def load_data_package(game: str = game, game_data: typing.Dict[str, typing.Any] = game_data) -> bytes:
+                if "checksum" in game_data:
                     row = GameDataPackage.get(checksum=game_data["checksum"])
                     if row:  # None if rolled on >= 0.3.9 but uploaded to <= 0.3.8. multidata should be complete
-                        game_data_packages[game] = Utils.restricted_loads(row.data)
-                        continue
-                    else:
-                        self.logger.warning(f"Did not find game_data_package for {game}: {game_data['checksum']}")
-            self.gamespackage[game] = static_gamespackage.get(game, {})
-            self.item_name_groups[game] = static_item_name_groups.get(game, {})
-            self.location_name_groups[game] = static_location_name_groups.get(game, {})
-
-        if not game_data_packages:
-            # all static -> use the static dicts directly
-            self.gamespackage = static_gamespackage
-            self.item_name_groups = static_item_name_groups
-            self.location_name_groups = static_location_name_groups
-        return self._load(multidata, game_data_packages, True)
+                        return row.data
+                    self.logger.warning(f"Did not find game_data_package for {game}: {game_data['checksum']}")
+                return pickle.dumps(game_data)
+
+            self.game_data[game] = self.game_data_store.acquire(game, checksum, load_data_package)
+        return self._load(multidata, {}, True)
 
     @db_session
     def init_save(self, enabled: bool = True):
         self.saving = enabled
         if self.saving:
-            savegame_data = Room.get(id=self.room_id).multisave
+            savegame_data = load_room_save(Room.get(id=self.room_id))
             if savegame_data:
-                self.set_save(restricted_loads(Room.get(id=self.room_id).multisave))
+                self.journal_generation = savegame_data.get("journal", 0)
+                self.set_save(savegame_data)
             self._start_async_saving(atexit_save=False)
-        threading.Thread(target=self.listen_to_db_commands, daemon=True).start()
+        self.db_command_processor = DBCommandProcessor(self)
 
     @db_session
     def _save(self, exit_save: bool = False) -> bool:
+        if not super(WebHostContext, self)._save(exit_save):
+            # whatever of the failed save made it into the session must not get committed along with later changes
+            rollback()
+            return False
         room = Room.get(id=self.room_id)
-        room.multisave = pickle.dumps(self.get_save())
         # saving only occurs on activity, so we can "abuse" this information to mark this as last_activity
         if not exit_save:  # we don't want to count a shutdown as activity, which would restart the server again
             room.last_activity = datetime.datetime.utcnow()
         return True
 
+    def get_tracker_snapshot(self) -> typing.Dict[str, typing.Any]:
+        """Returns the parts of get_save the trackers show, in the same shape."""
+        return {
+            "format": tracker_snapshot_format,
+            "received_items": {key: items for key, items in self.received_items.items() if key[2]},
+            "hints": dict(self.hints),
+            "location_checks": dict(self.location_checks),
+            "name_aliases": self.name_aliases,
+            "client_game_state": dict(self.client_game_state),
+            "client_activity_timers": tuple(
+                (key, value.timestamp()) for key, value in self.client_activity_timers.items()),
+            "video": [(tuple(playerslot), videodata) for playerslot, videodata in self.video.items()],
+        }
+
+    def publish_tracker_snapshot(self, room: Room, generation: int):
+        """Publishes a full tracker snapshot for the save of generation. If that fails, trackers read the save instead
+        until the next save manages to publish one."""
+        try:
+            data = pickle.dumps(self.get_tracker_snapshot())
+        except Exception as e:
+            self.logger.exception(e)
+            if room.tracker_snapshot:
+                room.tracker_snapshot.delete()
+            self.tracker_snapshot_stale = True
+            return
+        if room.tracker_snapshot:
+            room.tracker_snapshot.set(data=data, generation=generation, version=room.tracker_snapshot.version + 1)
+        else:
+            TrackerSnapshot(room=room, data=data, generation=generation)
+        self.tracker_snapshot_stale = False
+
+    def write_save_snapshot(self, save: typing.Dict[str, typing.Any]) -> int:
+        room = Room.get(id=self.room_id)
+        room.multisave = pickle.dumps(save)
+        RoomJournal.select(lambda entry: entry.room == room).delete(bulk=True)
+        self.publish_tracker_snapshot(room, save["journal"])
+        # committed here, so a failure counts as a failed save instead of surfacing after it
+        commit()
+        return len(room.multisave)
+
+    def write_save_journal(self, entries: typing.List[tuple]) -> int:
+        data = pickle.dumps(entries)
+        room = Room.get(id=self.room_id)
+        RoomJournal(room=room, generation=self.journal_generation, data=data)
+        if self.tracker_snapshot_stale:
+            self.publish_tracker_snapshot(room, self.journal_generation)
+        else:
+            # trackers apply the journal to the snapshot themselves, they only need to know there is more of it
+            room.tracker_snapshot.version += 1
+        commit()
+        return len(data)
+
     def get_save(self) -> dict:
         d = super(WebHostContext, self).get_save()
         d["video"] = [(tuple(playerslot), videodata) for playerslot, videodata in self.video.items()]
         return d
 
 
+def load_room_save(room: Room) -> typing.Dict[str, typing.Any]:
+    """Returns the multisave of room with its journal applied, or an empty dict if it has none yet."""
+    if not room.multisave:
+        return {}
+    save = restricted_loads(room.multisave)
+    generation = save.get("journal", 0)
+    apply_save_journal(save, (restricted_loads(entry.data) for entry in
+                              room.multisave_journal.select(lambda entry: entry.generation == generation)
+                              .order_by(RoomJournal.id)))
+    return save
+
+
+process_stats_interval = 10  # seconds between reports of a server process to the autolauncher
+
+
+tracker_snapshot_format = 1
+
+
+def get_tracker_journal_entries(entries: typing.List[tuple],
+                                sections: typing.AbstractSet[str]) -> typing.List[tuple]:
+    """Returns the entries of a save journal record that change sections of a tracker snapshot."""
+    return [entry for entry in entries if entry[1] in sections and (entry[1] != "received_items" or entry[2][2])]
+
+
+def load_tracker_snapshot(room: Room) -> typing.Dict[str, typing.Any]:
+    """Returns what trackers show of room, as last published by the server hosting it with the changes journaled
+    since applied. Falls back to the room's save if there is no current tracker snapshot."""
+    snapshot = room.tracker_snapshot
+    if snapshot:
+        data = restricted_loads(snapshot.data)
+        if data.get("format", 0) == tracker_snapshot_format:
+            sections = data.keys() - {"format"}
+            apply_save_journal(data, (get_tracker_journal_entries(restricted_loads(entry.data), sections)
+                                      for entry in room.multisave_journal.select(
+                                          lambda entry: entry.generation == snapshot.generation)
+                                      .order_by(RoomJournal.id)))
+            return data
+    return load_room_save(room)
+
+
 def get_random_port():
     return random.randint(49152, 65535)
 
@@ -175,10 +470,12 @@ def get_random_port():
 @cache_argsless
 def get_static_server_data() -> dict:
     import worlds
+    # built from the data packages and the world manifest, so worlds don't need to be imported
+    games = worlds.network_data_package["games"]
     data = {
         "non_hintable_names": {
-            world_name: world.hint_blacklist
-            for world_name, world in worlds.AutoWorldRegister.world_types.items()
+            world_name: worlds.get_hint_blacklist(world_name)
+            for world_name in games
         },
         "gamespackage": {
             world_name: {
@@ -186,15 +483,15 @@ def get_static_server_data() -> dict:
                 for key, value in game_package.items()
                 if key not in ("item_name_groups", "location_name_groups")
             }
-            for world_name, game_package in worlds.network_data_package["games"].items()
+            for world_name, game_package in games.items()
         },
         "item_name_groups": {
-            world_name: world.item_name_groups
-            for world_name, world in worlds.AutoWorldRegister.world_types.items()
+            world_name: {name: set(group) for name, group in game_package["item_name_groups"].items()}
+            for world_name, game_package in games.items()
         },
         "location_name_groups": {
-            world_name: world.location_name_groups
-            for world_name, world in worlds.AutoWorldRegister.world_types.items()
+            world_name: {name: set(group) for name, group in game_package["location_name_groups"].items()}
+            for world_name, game_package in games.items()
         },
     }
 
@@ -221,9 +518,18 @@ def set_up_logging(room_id) -> logging.Logger:
     return logger
 
 
+def get_process_memory() -> int:
+    try:
+        import psutil
+    except ImportError:
+        return 0
+    return psutil.Process().memory_info().rss
+
+
 def run_server_process(name: str, ponyconfig: dict, static_server_data: dict,
                        cert_file: typing.Optional[str], cert_key_file: typing.Optional[str],
-                       host: str, rooms_to_run: multiprocessing.Queue, rooms_shutting_down: multiprocessing.Queue):
+                       host: str, rooms_to_run: multiprocessing.Queue, rooms_shutting_down: multiprocessing.Queue,
+                       process_stats: typing.Optional[multiprocessing.Queue] = None):
     Utils.init_logging(name)
     try:
         import resource
@@ -239,6 +545,8 @@ def run_server_process(name: str, ponyconfig: dict, static_server_data: dict,
     # establish DB connection for multidata and multisave
     db.bind(**ponyconfig)
     db.generate_mapping(check_tables=False)
+    contexts: typing.Dict[typing.Any, WebHostContext] = {}
+    DBCommandDispatcher(ponyconfig, contexts).start()
 
     if "worlds" in sys.modules:
         raise Exception("Worlds system should not be loaded in the custom server.")
@@ -249,14 +557,28 @@ def run_server_process(name: str, ponyconfig: dict, static_server_data: dict,
     gc.collect()  # free intermediate objects used during setup
 
     loop = asyncio.get_event_loop()
+    game_data_store = GameDataStore(static_server_data)
+
+    async def report_stats():
+        # the autolauncher only keeps the latest report of each process
+        while 1:
+            process_stats.put({
+                "time": time.monotonic(),
+                "cpu_time": time.process_time(),
+                "memory": get_process_memory(),
+                "game_data": game_data_store.get_stats(),
+                "rooms": {room_id: ctx.get_stats() for room_id, ctx in contexts.items()},
+            })
+            await asyncio.sleep(process_stats_interval)
 
     async def start_room(room_id):
         with Locker(f"RoomLocker {room_id}"):
             try:
                 logger = set_up_logging(room_id)
-                ctx = WebHostContext(static_server_data, logger)
+                ctx = WebHostContext(static_server_data, logger, game_data_store)
                 ctx.load(room_id)
                 ctx.init_save()
+                contexts[room_id] = ctx
                 assert ctx.server is None
                 try:
                     ctx.server = websockets.serve(
@@ -308,6 +630,8 @@ def run_server_process(name: str, ponyconfig: dict, static_server_data: dict,
                     setattr(asyncio.current_task(), "save", None)
             finally:
                 try:
+                    contexts.pop(room_id, None)
+                    ctx.release_game_data()
                     ctx.save_dirty = False  # make sure the saving thread does not write to DB after final wakeup
                     ctx.exit_event.set()  # make sure the saving thread stops at some point
                     # NOTE: async saving should probably be an async task and could be merged with shutdown_task
@@ -345,6 +669,8 @@ def run_server_process(name: str, ponyconfig: dict, static_server_data: dict,
     starter = Starter()
     starter.daemon = True
     starter.start()
+    if process_stats:
+        loop.create_task(report_stats())
     try:
         loop.run_forever()
     finally:
@@ -0,0 +1,172 @@
+"""
+Decoded multidata and data packages, kept per web worker process so views don't decompress and unpickle them for every
+request. Everything handed out is shared between requests and must not be modified.
+"""
+from __future__ import annotations
+
+import collections
+import itertools
+import logging
+import sys
+import threading
+import time
+import typing
+
+from MultiServer import Context
+from NetUtils import MultidataSection
+from Utils import restricted_loads
+from .models import GameDataPackage, Seed
+
+# sizes are estimates of the memory used by the decoded data, see estimate_size
+MULTIDATA_CACHE_SIZE = 128 * 1024 * 1024
+DATA_PACKAGE_CACHE_SIZE = 64 * 1024 * 1024
+# each cache logs its stats at most this often, when it gets used
+CACHE_STATS_INTERVAL_IN_SECONDS = 10 * 60
+ESTIMATE_SAMPLE_SIZE = 32
+
+_T = typing.TypeVar("_T")
+
+
+def estimate_size(obj: typing.Any, seen: typing.Optional[typing.Set[int]] = None) -> int:
+    """Returns roughly how many bytes obj and everything it holds take up, counting objects held more than once only
+    once. Only looks into containers, which is where decoded multidata and data packages keep everything, and only
+    into the first few entries of each, assuming the rest are alike."""
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, MultidataSection):
+        return size + estimate_size(obj.data, seen) + estimate_size(obj.index, seen)
+    if isinstance(obj, dict):
+        # not through the methods of subclasses, which may load or create entries
+        sample = list(itertools.islice(dict.items(obj), ESTIMATE_SAMPLE_SIZE))
+        sampled_size = sum(estimate_size(key, seen) + estimate_size(value, seen) for key, value in sample)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        sample = list(itertools.islice(obj, ESTIMATE_SAMPLE_SIZE))
+        sampled_size = sum(estimate_size(entry, seen) for entry in sample)
+    else:
+        return size
+    if sample:
+        size += sampled_size * len(obj) // len(sample)
+    return size
+
+
+class UnknownNames(dict):
+    """id to name lookup that names unknown ids without adding them, as it is shared between requests."""
+    __slots__ = ("unknown",)
+    unknown: str
+
+    def __init__(self, unknown: str, names: typing.Dict[int, str]) -> None:
+        super().__init__(names)
+        self.unknown = unknown
+
+    def __missing__(self, key: int) -> str:
+        return self.unknown.format(key)
+
+
+class DecodedCache(typing.Generic[_T]):
+    """LRU cache that evicts the least recently used entries once their sizes add up to more than max_size."""
+    name: str
+    max_size: int
+    size: int
+    hits: int
+    misses: int
+    evictions: int
+
+    def __init__(self, name: str, max_size: int) -> None:
+        self.name = name
+        self.max_size = max_size
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: typing.OrderedDict[typing.Hashable, typing.Tuple[_T, int]] = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._stats_logged = time.monotonic()
+
+    def get(self, key: typing.Hashable, load: typing.Callable[[], typing.Tuple[_T, int]]) -> _T:
+        """Returns the value of key, calling load for it and its size if it isn't cached."""
+        with self._lock:
+            entry = self._entries.get(key, None)
+            self._log_stats()
+            if entry:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+        # decoded outside the lock, two requests missing the same key at once both decode it
+        value, size = load()
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = value, size
+                self.size += size
+            while self.size > self.max_size and len(self._entries) > 1:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.size -= evicted_size
+                self.evictions += 1
+                logging.debug(f"Evicted an entry of {evicted_size} bytes from the {self.name} cache.")
+        return value
+
+    def get_stats(self) -> typing.Dict[str, int]:
+        with self._lock:
+            return self._get_stats()
+
+    def _get_stats(self) -> typing.Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "size": self.size,
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def _log_stats(self) -> None:
+        now = time.monotonic()
+        if now - self._stats_logged >= CACHE_STATS_INTERVAL_IN_SECONDS:
+            self._stats_logged = now
+            logging.info(f"{self.name.capitalize()} cache: " +
+                         ", ".join(f"{key} {value}" for key, value in self._get_stats().items()))
+
+
+class DecodedDataPackage(typing.NamedTuple):
+    package: typing.Dict[str, typing.Any]
+    item_id_to_name: typing.Dict[int, str]
+    location_id_to_name: typing.Dict[int, str]
+
+
+multidata_cache: DecodedCache[typing.Dict[str, typing.Any]] = DecodedCache("multidata", MULTIDATA_CACHE_SIZE)
+data_package_cache: DecodedCache[DecodedDataPackage] = DecodedCache("data package", DATA_PACKAGE_CACHE_SIZE)
+
+
+def get_multidata(seed: Seed) -> typing.Dict[str, typing.Any]:
+    """Returns the decompressed multidata of seed."""
+    def load() -> typing.Tuple[typing.Dict[str, typing.Any], int]:
+        multidata = Context.decompress(seed.multidata)
+        return multidata, estimate_size(multidata)
+
+    return multidata_cache.get(seed.id, load)
+
+
+def get_data_package(checksum: str) -> typing.Optional[DecodedDataPackage]:
+    """Returns the data package with checksum along with its id to name lookups, None if there is none."""
+    def load() -> typing.Tuple[DecodedDataPackage, int]:
+        row = GameDataPackage.get(checksum=checksum)
+        if not row:
+            raise KeyError(checksum)  # not cached, as it may still get uploaded
+        package = restricted_loads(row.data)
+        data_package = DecodedDataPackage(
+            package,
+            UnknownNames("Unknown Item (ID: {})",
+                         {item_id: name for name, item_id in package["item_name_to_id"].items()}),
+            UnknownNames("Unknown Location (ID: {})",
+                         {location_id: name for name, location_id in package["location_name_to_id"].items()}),
+        )
+        return data_package, estimate_size(data_package)
+
+    try:
+        return data_package_cache.get(checksum, load)
+    except KeyError:
+        return None
@@ -19,7 +19,7 @@ from WebHostLib import app
 from settings import ServerOptions, GeneratorOptions
 from worlds.alttp.EntranceRandomizer import parse_arguments
 from .check import get_yaml_data, roll_options
-from .models import Generation, STATE_ERROR, STATE_QUEUED, Seed, UUID
+from .models import Generation, STATE_ERROR, STATE_QUEUED, Seed, UUID, notify_generations
 from .upload import upload_zip_to_db
 
 
@@ -89,6 +89,7 @@ def start_generation(options: Dict[str, Union[dict, str]], meta: Dict[str, Any])
             meta=json.dumps(meta),
             state=STATE_QUEUED,
             owner=session["_id"])
+        notify_generations()
         commit()
 
         return redirect(url_for("wait_seed", seed=gen.id))
@@ -8,7 +8,7 @@ from pony.orm import count, commit, db_session
 
 from worlds.AutoWorld import AutoWorldRegister
 from . import app, cache
-from .models import Seed, Room, Command, UUID, uuid4
+from .models import Seed, Room, Command, UUID, notify_room_activity, notify_room_commands, uuid4
 
 
 def get_world_theme(game_name: str):
@@ -142,6 +142,7 @@ def host_room_command(room: UUID):
         cmd = request.form["cmd"]
         if cmd:
             Command(room=room, commandtext=cmd)
+            notify_room_commands()
             commit()
     return redirect(url_for("host_room", room=room.id))
 
@@ -158,6 +159,7 @@ def host_room(room: UUID):
                       or room.last_activity < now - datetime.timedelta(seconds=room.timeout))
     with db_session:
         room.last_activity = now  # will trigger a spinup, if it's not already running
+        notify_room_activity()
 
     browser_tokens = "Mozilla", "Chrome", "Safari"
     automated = ("update" in request.args
@@ -8,6 +8,10 @@ STATE_QUEUED = 0
 STATE_STARTED = 1
 STATE_ERROR = -1
 
+ROOM_COMMAND_CHANNEL = "ap_room_commands"
+ROOM_ACTIVITY_CHANNEL = "ap_room_activity"
+GENERATION_CHANNEL = "ap_generations"
+
 
 class Slot(db.Entity):
     id = PrimaryKey(int, auto=True)
@@ -26,6 +30,8 @@ class Room(db.Entity):
     commands = Set('Command')
     seed = Required('Seed', index=True)
     multisave = Optional(buffer, lazy=True)
+    multisave_journal = Set('RoomJournal')
+    tracker_snapshot = Optional('TrackerSnapshot', cascade_delete=True)
     show_spoiler = Required(int, default=0)  # 0 -> never, 1 -> after completion, -> 2 always
     timeout = Required(int, default=lambda: 2 * 60 * 60)  # seconds since last activity to shutdown
     tracker = Optional(UUID, index=True)
@@ -33,6 +39,24 @@ class Room(db.Entity):
     last_port = Optional(int, default=lambda: 0)
 
 
+class RoomJournal(db.Entity):
+    """Changes to a Room's multisave since it was last written, applied in order of id."""
+    id = PrimaryKey(int, auto=True)
+    room = Required(Room, index=True)
+    generation = Required(int)  # the journal generation of the multisave this applies to
+    data = Required(buffer, lazy=True)
+
+
+class TrackerSnapshot(db.Entity):
+    """What trackers show of a Room, published by the server hosting it whenever it writes a full save. Changes after
+    that are read from the RoomJournal rows of the same generation."""
+    id = PrimaryKey(int, auto=True)
+    room = Required(Room, unique=True)
+    version = Required(int, default=1)  # increases with every update
+    generation = Required(int, default=0)  # journal generation of the multisave data was taken with
+    data = Required(buffer, lazy=True)
+
+
 class Seed(db.Entity):
     id = PrimaryKey(UUID, default=uuid4)
     rooms = Set(Room)
@@ -61,3 +85,21 @@ class Generation(db.Entity):
 class GameDataPackage(db.Entity):
     checksum = PrimaryKey(str)
     data = Required(bytes)
+
+
+def notify_room_commands() -> None:
+    """Wakes up the command dispatchers of the server processes on commit, if the database can notify them."""
+    if db.provider_name == "postgres":
+        db.execute(f"NOTIFY {ROOM_COMMAND_CHANNEL}")
+
+
+def notify_room_activity() -> None:
+    """Wakes up autohost on commit to start rooms with new activity, if the database can notify it."""
+    if db.provider_name == "postgres":
+        db.execute(f"NOTIFY {ROOM_ACTIVITY_CHANNEL}")
+
+
+def notify_generations() -> None:
+    """Wakes up autogen on commit to start queued generations, if the database can notify it."""
+    if db.provider_name == "postgres":
+        db.execute(f"NOTIFY {GENERATION_CHANNEL}")
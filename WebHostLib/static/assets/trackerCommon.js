@@ -123,7 +123,8 @@ window.addEventListener('load', () => {
             event.preventDefault();
         }
     });
-    const target_second = parseInt(document.getElementById('tracker-wrapper').getAttribute('data-second')) + 3;
+    const trackerWrapper = document.getElementById('tracker-wrapper');
+    const target_second = parseInt(trackerWrapper.getAttribute('data-second')) + 3;
     console.log("Target second of refresh: " + target_second);
 
     function getSleepTimeSeconds() {
@@ -141,7 +142,12 @@ window.addEventListener('load', () => {
             update_on_view = false;
             const target = $("<div></div>");
             console.log("Updating Tracker...");
-            target.load(location.href, function (response, status) {
+            const url = new URL(location.href);
+            if (following) {
+                // makes sure the page is at least as new as what the feed sent
+                url.searchParams.set('version', version);
+            }
+            target.load(url.href, function (response, status) {
                 if (status === "success") {
                     target.find(".table").each(function (i, new_table) {
                         const new_trs = $(new_table).find("tbody>tr");
@@ -165,9 +171,138 @@ window.addEventListener('load', () => {
                 }
             })
         }
-        updater = setTimeout(update, getSleepTimeSeconds() * 1000);
+        scheduleUpdate();
+    }
+    let updater = null;
+    const scheduleUpdate = () => {
+        clearTimeout(updater);
+        if (!following) {
+            updater = setTimeout(update, getSleepTimeSeconds() * 1000);
+        }
+    };
+
+    // Multiworld trackers ask for what changed every few seconds, and patch their tables with it.
+    // Without the feed, or if asking for it fails, they reload periodically instead.
+    const statusNames = {0: "Disconnected", 5: "Connected", 10: "Ready", 20: "Playing", 30: "Goal Completed"};
+    const currentTracker = trackerWrapper.getAttribute('data-current-tracker');
+    const customColumns = trackerWrapper.hasAttribute('data-custom-columns');
+    let version = parseInt(trackerWrapper.getAttribute('data-version'));
+    // the server caches the current version for as long, see TRACKER_FEED_INTERVAL_IN_SECONDS
+    const feedIntervalSeconds = 15;
+    let following = false;
+
+    const updateTotals = (table) => {
+        const tfoot = table.table().footer();
+        if (!tfoot) {
+            return;
+        }
+        let players = 0, completed = 0, checked = 0, total = 0;
+        table.rows().every(function () {
+            const row = this.node();
+            const [rowChecked, rowTotal] = table.cell(row.querySelector('td.checks')).data().split('/');
+            players++;
+            completed += table.cell(row.querySelector('td.status')).data().trim() === "Goal Completed";
+            checked += parseInt(rowChecked);
+            total += parseInt(rowTotal);
+        });
+        tfoot.querySelector('td.completed').innerText = `${completed}/${players} Complete`;
+        tfoot.querySelector('td.checks').innerText = `${checked}/${total}`;
+        tfoot.querySelector('td.percent').innerText = total ? (checked / total * 100).toFixed(2) : "100";
+    };
+
+    const applyDelta = (delta) => {
+        const changedTables = new Set();
+        for (const [teamPlayer, changes] of Object.entries(delta.players)) {
+            const row = document.querySelector(`tr[data-player="${teamPlayer}"]`);
+            if (!row) {
+                continue;
+            }
+            const table = $(row).closest('table').DataTable();
+            changedTables.add(table);
+            if ('status' in changes) {
+                table.cell(row.querySelector('td.status')).data(statusNames[changes.status] ?? "Unknown State");
+            }
+            if ('checked' in changes) {
+                const checksCell = table.cell(row.querySelector('td.checks'));
+                const total = parseInt(checksCell.data().split('/')[1]);
+                checksCell.data(`${changes.checked}/${total}`);
+                table.cell(row.querySelector('td.percent')).data(
+                    total ? (changes.checked / total * 100).toFixed(2) : "100.00");
+            }
+            if ('activity' in changes) {
+                table.cell(row.querySelector('td.activity')).data(changes.activity);
+            }
+        }
+        changedTables.forEach(updateTotals);
+
+        for (const [key, hint] of Object.entries(delta.hints)) {
+            if (currentTracker !== "Generic" && hint.game !== currentTracker && hint.receiver_game !== currentTracker) {
+                continue;
+            }
+            const hintsTable = $(`#hints-table[data-team="${key.split('-', 1)[0]}"]`);
+            if (!hintsTable.length) {
+                continue;
+            }
+            const row = document.createElement('tr');
+            row.setAttribute('data-hint', key);
+            for (const text of [hint.finder, hint.receiver, hint.item, hint.location, hint.game, hint.entrance,
+                                hint.found ? "✔" : ""]) {
+                const cell = document.createElement('td');
+                cell.innerText = text;
+                row.appendChild(cell);
+            }
+            row.lastChild.classList.add('center-column');
+            hintsTable.DataTable().rows(`[data-hint="${key}"]`).remove();
+            hintsTable.DataTable().row.add(row);
+        }
+        tables.draw(false);
+    };
+
+    const followFeed = () => {
+        if (!following) {
+            return;
+        }
+        if (document.hidden) {
+            setTimeout(followFeed, feedIntervalSeconds * 1000);
+            return;
+        }
+        const url = new URL(trackerWrapper.getAttribute('data-feed'), location.href);
+        url.searchParams.set('version', version);
+        fetch(url.href, {cache: 'no-store'}).then((response) => {
+            if (!response.ok) {
+                throw new Error(response.statusText);
+            }
+            // nothing changed since the version this page is at
+            if (response.status === 204) {
+                return;
+            }
+            return response.json().then((feedUpdate) => {
+                version = feedUpdate.version;
+                // without a delta, or with received items, which change the columns of game-specific trackers
+                // only the server can render, the page has to be loaded in full
+                if (!('previous' in feedUpdate) ||
+                    (customColumns && Object.values(feedUpdate.players).some((changes) => 'items' in changes))) {
+                    update();
+                } else {
+                    applyDelta(feedUpdate);
+                }
+            });
+        }).then(() => {
+            setTimeout(followFeed, feedIntervalSeconds * 1000);
+        }).catch((error) => {
+            console.log("Tracker feed failed, updating periodically instead.");
+            console.log(error);
+            following = false;
+            scheduleUpdate();
+        });
+    };
+
+    if (trackerWrapper.hasAttribute('data-feed') && window.fetch) {
+        console.log("Following Tracker feed.");
+        following = true;
+        followFeed();
     }
-    let updater = setTimeout(update, getSleepTimeSeconds() * 1000);
+    scheduleUpdate();
 
     window.addEventListener('resize', () => {
         adjustTableHeight();
@@ -8,16 +8,17 @@ from email.utils import parsedate_to_datetime
 from flask import render_template, make_response, Response, request
 from werkzeug.exceptions import abort
 
-from MultiServer import Context, get_saving_second
+from MultiServer import get_saving_second
 from NetUtils import ClientStatus, Hint, NetworkItem, NetworkSlot, SlotType
-from Utils import restricted_loads, KeyedDefaultDict
+from Utils import KeyedDefaultDict
 from . import app, cache
-from .models import GameDataPackage, Room
+from .customserver import load_tracker_snapshot
+from .datacache import get_data_package, get_multidata
+from .models import Room
 
 # Multisave is currently updated, at most, every minute.
 TRACKER_CACHE_TIMEOUT_IN_SECONDS = 60
 
-_multidata_cache = {}
 _multiworld_trackers: Dict[str, Callable] = {}
 _player_trackers: Dict[str, Callable] = {}
 
@@ -56,8 +57,10 @@ class TrackerData:
     def __init__(self, room: Room):
         """Initialize a new RoomMultidata object for the current room."""
         self.room = room
-        self._multidata = Context.decompress(room.seed.multidata)
-        self._multisave = restricted_loads(room.multisave) if room.multisave else {}
+        self._multidata = get_multidata(room.seed)
+        # read ahead of the snapshot, so it is never newer than what gets shown
+        self._tracker_version = room.tracker_snapshot.version if room.tracker_snapshot else 0
+        self._multisave = load_tracker_snapshot(room)
         self._tracker_cache = {}
 
         self.item_name_to_id: Dict[str, Dict[str, int]] = {}
@@ -70,16 +73,15 @@ class TrackerData:
         self.location_id_to_name: Dict[str, Dict[int, str]] = KeyedDefaultDict(lambda game_name: {
             game_name: KeyedDefaultDict(lambda code: f"Unknown Game {game_name} - Location (ID: {code})")
         })
+        # the data packages and their inverse lookup tables are shared with other requests, see datacache
         for game, game_package in self._multidata["datapackage"].items():
-            game_package = restricted_loads(GameDataPackage.get(checksum=game_package["checksum"]).data)
-            self.item_id_to_name[game] = KeyedDefaultDict(lambda code: f"Unknown Item (ID: {code})", {
-                id: name for name, id in game_package["item_name_to_id"].items()})
-            self.location_id_to_name[game] = KeyedDefaultDict(lambda code: f"Unknown Location (ID: {code})", {
-                id: name for name, id in game_package["location_name_to_id"].items()})
+            data_package = get_data_package(game_package["checksum"])
+            self.item_id_to_name[game] = data_package.item_id_to_name
+            self.location_id_to_name[game] = data_package.location_id_to_name
 
             # Normal lookup tables as well.
-            self.item_name_to_id[game] = game_package["item_name_to_id"]
-            self.location_name_to_id[game] = game_package["location_name_to_id"]
+            self.item_name_to_id[game] = data_package.package["item_name_to_id"]
+            self.location_name_to_id[game] = data_package.package["location_name_to_id"]
 
     def get_seed_name(self) -> str:
         """Retrieves the seed name."""
@@ -214,6 +216,13 @@ class TrackerData:
             ]
         }
 
+    def get_room_tracker_version(self) -> int:
+        """Retrieves the version of the tracker snapshot this data is from, 0 if there is none.
+
+        Tracker feeds send their updates from one version to the next, see trackerfeed.
+        """
+        return self._tracker_version
+
     @_cache_results
     def get_room_saving_second(self) -> int:
         """Retrieves the saving second value for this seed.
@@ -355,12 +364,19 @@ def get_generic_game_tracker(tracker: UUID, tracked_team: int, tracked_player: i
 @app.route("/tracker/<suuid:tracker>/<game>")
 def get_multiworld_tracker(tracker: UUID, game: str) -> Response:
     key = f"{tracker}_{game}"
+    # trackers following the feed ask for the version they got to, see trackerfeed
+    wanted_version = request.args.get("version", 0, type=int)
     response: Optional[Response] = cache.get(key)
-    if response:
+    cached_version = int(response.headers.get("X-Tracker-Version", 0)) if response else 0
+    if response and cached_version >= wanted_version:
         return response
 
     # Room must exist.
     room = Room.get(tracker=tracker)
+    # renders once per version, no matter what version was asked for
+    current_version = room.tracker_snapshot.version if room and room.tracker_snapshot else 0
+    if response and cached_version >= current_version:
+        return response
 
     response = _process_if_request_valid(request, room)
     if response:
@@ -369,6 +385,7 @@ def get_multiworld_tracker(tracker: UUID, game: str) -> Response:
     timeout, last_modified, tracker_page = get_timeout_and_multiworld_tracker(room, game)
     response = make_response(tracker_page)
     response.last_modified = last_modified
+    response.headers["X-Tracker-Version"] = str(current_version)
     cache.set(key, response, timeout)
     return response
 
@@ -454,6 +471,7 @@ def render_generic_multiworld_tracker(tracker_data: TrackerData, enabled_tracker
         item_id_to_name=tracker_data.item_id_to_name,
         location_id_to_name=tracker_data.location_id_to_name,
         saving_second=tracker_data.get_room_saving_second(),
+        tracker_version=tracker_data.get_room_tracker_version(),
     )
 
 
@@ -514,6 +532,7 @@ if "Factorio" in network_data_package["games"]:
             item_id_to_name=tracker_data.item_id_to_name,
             location_id_to_name=tracker_data.location_id_to_name,
             inventories=inventories,
+            tracker_version=tracker_data.get_room_tracker_version(),
         )
 
     _multiworld_trackers["Factorio"] = render_Factorio_multiworld_tracker
@@ -647,6 +666,7 @@ if "A Link to the Past" in network_data_package["games"]:
             location_id_to_name=tracker_data.location_id_to_name,
             inventories=inventories,
             regions=regions,
+            tracker_version=tracker_data.get_room_tracker_version(),
             known_regions=known_regions,
         )
 
@@ -0,0 +1,168 @@
+"""
+Sends what changes on the multiworld trackers, so open trackers patch their tables instead of reloading them every
+minute. Trackers ask every few seconds with the version they are at and get an answer right away: nothing if that is
+still the current one, else the delta to the current version. The current version of each room comes from the cache,
+so asking costs no database query until it changes. Each web worker process keeps the latest snapshot of the rooms it
+gets asked about to compute those deltas, and the deltas themselves for everyone else at the same version.
+"""
+from __future__ import annotations
+
+import collections
+import threading
+import typing
+from uuid import UUID
+
+from flask import Response, jsonify, request
+from werkzeug.exceptions import abort
+
+from NetUtils import ClientStatus, Hint
+from . import app, cache
+from .models import Room
+from .tracker import TrackerData
+
+# trackers ask this often, the current version of a room is cached for as long, see trackerCommon.js
+TRACKER_FEED_INTERVAL_IN_SECONDS = 15
+# past this many rooms the least recently asked about get forgotten, their trackers reload once when asking again
+TRACKER_FEED_ROOMS = 256
+
+
+def get_hint_key(team: int, hint: Hint) -> str:
+    return f"{team}-{hint.finding_player}-{hint.location}"
+
+
+def get_tracker_delta(tracker_data: TrackerData, previous: typing.Dict[str, typing.Any]) \
+        -> typing.Dict[str, typing.Any]:
+    """Returns what changed on the multiworld trackers of tracker_data's room since previous, an earlier snapshot.
+    Players are keyed by "team-player" and only carry what changed of them, hints are those that are new or changed."""
+    previous_checks = previous.get("location_checks", {})
+    previous_items = previous.get("received_items", {})
+    previous_states = previous.get("client_game_state", {})
+    previous_activity = dict(previous.get("client_activity_timers", ()))
+    previous_hints = previous.get("hints", {})
+    current_activity = dict(tracker_data._multisave.get("client_activity_timers", ()))
+    last_activity = tracker_data.get_room_last_activity()
+    names = tracker_data.get_room_long_player_names()
+    games = tracker_data.get_room_games()
+
+    players: typing.Dict[str, typing.Dict[str, typing.Any]] = {}
+    hints: typing.Dict[str, typing.Dict[str, typing.Any]] = {}
+    for team, slots in tracker_data.get_all_slots().items():
+        for player in slots:
+            changes: typing.Dict[str, typing.Any] = {}
+            game = games[team, player]
+            checked = tracker_data.get_player_checked_locations(team, player)
+            new_checks = checked - previous_checks.get((team, player), set())
+            if new_checks:
+                location_names = tracker_data.location_id_to_name[game]
+                changes["checks"] = sorted(location_names[location] for location in new_checks)
+                changes["checked"] = len(checked)
+            received = tracker_data.get_player_received_items(team, player)
+            received_before = len(previous_items.get((team, player, True), ()))
+            if len(received) > received_before:
+                item_names = tracker_data.item_id_to_name[game]
+                changes["items"] = [{"item": item_names[item.item], "sender": names[team, item.player]}
+                                    for item in received[received_before:]]
+            status = tracker_data.get_player_client_status(team, player)
+            if status != previous_states.get((team, player), ClientStatus.CLIENT_UNKNOWN):
+                changes["status"] = int(status)
+            if (team, player) in last_activity and \
+                    current_activity[team, player] != previous_activity.get((team, player), None):
+                changes["activity"] = last_activity[team, player].total_seconds()
+            if changes:
+                players[f"{team}-{player}"] = changes
+
+            for hint in tracker_data.get_player_hints(team, player) - previous_hints.get((team, player), set()):
+                hints[get_hint_key(team, hint)] = {
+                    "finder": names[team, hint.finding_player],
+                    "receiver": names[team, hint.receiving_player],
+                    "item": tracker_data.item_id_to_name[games[team, hint.receiving_player]][hint.item],
+                    "location": tracker_data.location_id_to_name[games[team, hint.finding_player]][hint.location],
+                    "game": games[team, hint.finding_player],
+                    "receiver_game": games[team, hint.receiving_player],
+                    "entrance": hint.entrance or "Vanilla",
+                    "found": hint.found,
+                }
+
+    return {"players": players, "hints": hints}
+
+
+class RoomFeed(typing.NamedTuple):
+    version: int
+    snapshot: typing.Dict[str, typing.Any]
+    deltas: typing.Dict[int, typing.Dict[str, typing.Any]]
+    """ previous version -> delta from it to version """
+
+
+class TrackerFeed:
+    """Latest tracker snapshots of the rooms trackers asked about, by tracker, with the deltas to them, least recently
+    asked about rooms dropping out."""
+    rooms: typing.OrderedDict[UUID, RoomFeed]
+
+    def __init__(self, max_rooms: int) -> None:
+        self.max_rooms = max_rooms
+        self.rooms = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+    def get_update(self, tracker: UUID, version: int, current_version: int) \
+            -> typing.Optional[typing.Dict[str, typing.Any]]:
+        """Returns None if version is current_version or newer, else the current version with the delta to it from
+        version if that is known. Only loads the room if this process has yet to see current_version."""
+        with self.lock:
+            feed = self.rooms.get(tracker, None)
+            # current_version may be cached from before the latest version this process has seen
+            if feed and feed.version >= current_version:
+                self.rooms.move_to_end(tracker)
+                if version >= feed.version:
+                    return None
+                return feed.deltas.get(version, {"version": feed.version})
+        if version >= current_version:
+            return None
+
+        room = Room.get(tracker=tracker)
+        if not room:
+            return {"version": current_version}
+        tracker_data = TrackerData(room)
+        current_version = tracker_data.get_room_tracker_version()
+        update: typing.Dict[str, typing.Any] = {"version": current_version}
+        if feed and feed.version == version:
+            update.update(get_tracker_delta(tracker_data, feed.snapshot), previous=version)
+        with self.lock:
+            feed = self.rooms.get(tracker, None)
+            if not feed or feed.version < current_version:
+                self.rooms[tracker] = feed = RoomFeed(current_version, tracker_data._multisave, {})
+                self.rooms.move_to_end(tracker)
+                while len(self.rooms) > self.max_rooms:
+                    self.rooms.popitem(last=False)
+            if feed.version == current_version and "previous" in update:
+                feed.deltas[version] = update
+        return update
+
+
+tracker_feed = TrackerFeed(TRACKER_FEED_ROOMS)
+
+
+def get_tracker_version(tracker: UUID) -> typing.Optional[int]:
+    """Returns the current version of the tracker snapshot of tracker's room, 0 if there is none, None if there is no
+    such room. Cached, so trackers asking for updates only query it once per interval."""
+    key = f"tracker_feed_version_{tracker}"
+    version: typing.Optional[int] = cache.get(key)
+    if version is None:
+        room = Room.get(tracker=tracker)
+        if not room:
+            return None
+        # the snapshot data is loaded lazily, only when there is a new version
+        version = room.tracker_snapshot.version if room.tracker_snapshot else 0
+        cache.set(key, version, TRACKER_FEED_INTERVAL_IN_SECONDS)
+    return version
+
+
+@app.route("/tracker/<suuid:tracker>/feed")
+def get_multiworld_tracker_feed(tracker: UUID) -> Response:
+    current_version = get_tracker_version(tracker)
+    if current_version is None:
+        abort(404)
+
+    update = tracker_feed.get_update(tracker, request.args.get("version", 0, type=int), current_version)
+    response = jsonify(update) if update else Response(status=204)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
@@ -1,6 +1,5 @@
 #cython: language_level=3
 #distutils: language = c
-#distutils: depends = intset.h
 
 """
 Provides faster implementation of some core parts.
@@ -13,7 +12,8 @@ import warnings
 from cpython cimport PyObject
 from typing import Any, Dict, Iterable, Iterator, Generator, Sequence, Tuple, TypeVar, Union, Set, List, TYPE_CHECKING
 from cymem.cymem cimport Pool
-from libc.stdint cimport int64_t, uint32_t
+from libc.stdint cimport int64_t, uint32_t, UINT32_MAX
+from libc.stdlib cimport qsort
 from collections import defaultdict
 
 cdef extern from *:
@@ -31,28 +31,6 @@ ctypedef int64_t ap_id_t
 cdef ap_player_t MAX_PLAYER_ID = 1000000  # limit the size of indexing array
 cdef size_t INVALID_SIZE = <size_t>(-1)  # this is all 0xff... adding 1 results in 0, but it's not negative
 
-# configure INTSET for player
-cdef extern from *:
-    """
-    #define INTSET_NAME ap_player_set
-    #define INTSET_TYPE uint32_t  // has to match ap_player_t
-    """
-
-# create INTSET for player
-cdef extern from "intset.h":
-    """
-    #undef INTSET_NAME
-    #undef INTSET_TYPE
-    """
-    ctypedef struct ap_player_set:
-        pass
-
-    ap_player_set* ap_player_set_new(size_t bucket_count) nogil
-    void ap_player_set_free(ap_player_set* set) nogil
-    bint ap_player_set_add(ap_player_set* set, ap_player_t val) nogil
-    bint ap_player_set_contains(ap_player_set* set, ap_player_t val) nogil
-
-
 cdef struct LocationEntry:
     # layout is so that
     # 64bit player: location+sender and item+receiver 128bit comparisons, if supported
@@ -69,6 +47,22 @@ cdef struct IndexEntry:
     size_t count
 
 
+cdef LocationEntry* _sorted_entries = NULL  # entries _compare_by_receiver looks up, only set while sorting
+
+
+cdef int _compare_by_receiver(const void* a, const void* b) noexcept nogil:
+    # orders entry numbers by receiver and item, keeping the order of entries for the same receiver and item
+    cdef uint32_t i = (<const uint32_t*>a)[0]
+    cdef uint32_t j = (<const uint32_t*>b)[0]
+    cdef LocationEntry* x = _sorted_entries + i
+    cdef LocationEntry* y = _sorted_entries + j
+    if x.receiver != y.receiver:
+        return -1 if x.receiver < y.receiver else 1
+    if x.item != y.item:
+        return -1 if x.item < y.item else 1
+    return -1 if i < j else i > j
+
+
 @cython.auto_pickle(False)
 cdef class LocationStore:
     """Compact store for locations and their items in a MultiServer"""
@@ -88,6 +82,7 @@ cdef class LocationStore:
     cdef list _items  # ~64KB/1000 players, speed up items (56 per tuple + 8 per list entry)
     cdef list _proxies  # ~92KB/1000 players, speed up self[player] (56 per struct + 28 per len + 8 per list entry)
     cdef PyObject** _raw_proxies  # 8K/1000 players, faster access to _proxies, but does not keep a ref
+    cdef uint32_t* receiver_index  # 400KB/100k items, entry numbers ordered by receiver and item, built on first hint
 
     def get_size(self):
         from sys import getsizeof
@@ -98,6 +93,8 @@ cdef class LocationStore:
         size += sum(sizeof(item) for item in self._items)
         size += sum(sizeof(proxy) for proxy in self._proxies)
         size += sizeof(self._raw_proxies[0]) * self.sender_index_size
+        if self.receiver_index:
+            size += sizeof(self.receiver_index[0]) * self.entry_count
         return size
 
     def __init__(self, locations_dict: Dict[int, Dict[int, Sequence[int]]]) -> None:
@@ -136,6 +133,9 @@ cdef class LocationStore:
         if not count:
             warnings.warn("Game has no locations")
 
+        if count > UINT32_MAX:
+            raise ValueError("Too many locations")
+
         # allocate the arrays and invalidate index (0xff...)
         self.entries = <LocationEntry*>self._mem.alloc(count, sizeof(LocationEntry))
         self.sender_index = <IndexEntry*>self._mem.alloc(max_sender + 1, sizeof(IndexEntry))
@@ -203,35 +203,67 @@ cdef class LocationStore:
         return self._items
 
     # specialized accessors
+    cdef void _build_receiver_index(self):
+        global _sorted_entries
+        cdef uint32_t* index = <uint32_t*>self._mem.alloc(self.entry_count, sizeof(uint32_t))
+        cdef uint32_t i
+        for i in range(self.entry_count):
+            index[i] = i
+        # the GIL is held, so nothing else can be sorting at the same time
+        _sorted_entries = self.entries
+        qsort(index, self.entry_count, sizeof(uint32_t), _compare_by_receiver)
+        _sorted_entries = NULL
+        self.receiver_index = index
+
+    cdef size_t _find_first(self, ap_player_t receiver, ap_id_t item) nogil:
+        # binary search for the first entry of receiver and item in receiver_index
+        cdef size_t l = 0
+        cdef size_t r = self.entry_count
+        cdef size_t m
+        cdef LocationEntry* entry
+        while l < r:
+            m = (l + r) // 2
+            entry = self.entries + self.receiver_index[m]
+            if entry.receiver < receiver or (entry.receiver == receiver and entry.item < item):
+                l = m + 1
+            else:
+                r = m
+        return l
+
     def find_item(self, slots: Set[int], seeked_item_id: int) -> Generator[Tuple[int, int, int, int, int], None, None]:
-        cdef ap_id_t item = seeked_item_id
+        return self.find_items(slots, (seeked_item_id,))
+
+    def find_items(self, slots: Set[int], seeked_item_ids: Iterable[int]
+                   ) -> Generator[Tuple[int, int, int, int, int], None, None]:
+        """Yields (sender, location, item, receiver, flags) of any of the items for any of the slots,
+        in order of sender and location."""
+        cdef ap_id_t item
         cdef ap_player_t receiver
-        cdef ap_player_set* receivers
-        cdef size_t slot_count = len(slots)
-        if slot_count == 1:
-            # specialized implementation for single slot
-            receiver = list(slots)[0]
-            with nogil:
-                for entry in self.entries[:self.entry_count]:
-                    if entry.item == item and entry.receiver == receiver:
-                        with gil:
-                            yield entry.sender, entry.location, entry.item, entry.receiver, entry.flags
-        elif slot_count:
-            # generic implementation with lookup in set
-            receivers = ap_player_set_new(min(1023, slot_count))  # limit top level struct to 16KB
-            if not receivers:
-                raise MemoryError()
-            try:
-                for receiver in slots:
-                    if not ap_player_set_add(receivers, receiver):
-                        raise MemoryError()
-                with nogil:
-                    for entry in self.entries[:self.entry_count]:
-                        if entry.item == item and ap_player_set_contains(receivers, entry.receiver):
-                            with gil:
-                                yield entry.sender, entry.location, entry.item, entry.receiver, entry.flags
-            finally:
-                ap_player_set_free(receivers)
+        cdef size_t i
+        cdef LocationEntry* entry
+        cdef list found = []
+        if not self.entry_count:
+            return
+        if not self.receiver_index:
+            self._build_receiver_index()
+        items = set(seeked_item_ids)
+        for slot in slots:
+            if slot < 1 or slot > MAX_PLAYER_ID:
+                continue
+            receiver = slot
+            for seeked_item_id in items:
+                item = seeked_item_id
+                i = self._find_first(receiver, item)
+                while i < self.entry_count:
+                    entry = self.entries + self.receiver_index[i]
+                    if entry.receiver != receiver or entry.item != item:
+                        break
+                    found.append(self.receiver_index[i])
+                    i += 1
+        found.sort()
+        for i in found:
+            entry = self.entries + i
+            yield entry.sender, entry.location, entry.item, entry.receiver, entry.flags
 
     def get_for_player(self, slot: int) -> Dict[int, Set[int]]:
         cdef ap_player_t receiver = slot
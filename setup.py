@@ -56,9 +56,12 @@ if __name__ == "__main__":
     ModuleUpdate.update(yes="--yes" in sys.argv or "-y" in sys.argv)
 
 from worlds.LauncherComponents import components, icon_paths
+from worlds import load_all_worlds
 from Utils import version_tuple, is_windows, is_linux
 from Cython.Build import cythonize
 
+load_all_worlds()  # worlds add their components when they get imported
+
 
 # On  Python < 3.10 LogicMixin is not currently supported.
 non_apworlds: set = {
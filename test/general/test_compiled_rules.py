@@ -0,0 +1,123 @@
+import pickle
+import unittest
+from collections import Counter
+
+from BaseClasses import CollectionState, ItemCounter, Location, MultiWorld, Region
+from Profiler import Profiler, TimedRule
+from test.general import generate_items, generate_test_multiworld
+from worlds.generic.CompiledRules import (And, CanReach, CompiledRule, Constant, Has, HasAll, HasAny, HasFromList,
+                                          HasGroup, Or, compile_rule, resolve)
+from worlds.generic import Rules
+from worlds.generic.Rules import add_rule, set_rule
+
+
+class TestCompiledRules(unittest.TestCase):
+    multiworld: MultiWorld
+    player: int = 1
+
+    def setUp(self) -> None:
+        self.multiworld = generate_test_multiworld()
+        self.world = self.multiworld.worlds[self.player]
+        self.items = generate_items(3, self.player, True)
+        self.names = [item.name for item in self.items]
+        self.world.item_name_groups = {"Pair": set(self.names[:2])}
+        self.menu = self.multiworld.get_region("Menu", self.player)
+        self.gated = Region("Gated", self.player, self.multiworld)
+        self.multiworld.regions.append(self.gated)
+        self.menu.connect(self.gated, rule=lambda state: state.has(self.names[2], self.player))
+
+    def states(self):
+        """Yields states for every combination of up to two of each item"""
+        for first in range(3):
+            for second in range(3):
+                for third in range(3):
+                    state = CollectionState(self.multiworld)
+                    for item, amount in zip(self.items, (first, second, third)):
+                        for _ in range(amount):
+                            state.collect(item, True)
+                    yield state
+
+    def test_resolve_flattens(self) -> None:
+        """Tests nested rules get merged and constants get folded"""
+        a, b, c = self.names
+        self.assertEqual(And((HasAll((a, b)), Has(c, 2))), resolve(Has(a) & (Has(b) & Has(c, 2)) & Constant(True)))
+        self.assertEqual(HasAny((a, b)), resolve(Or((Has(a), HasAny((b, a)), Constant(False)))))
+        self.assertEqual(Constant(False), resolve(Has(a) & Constant(False)))
+        self.assertEqual(HasFromList(tuple(sorted((a, b))), 3), resolve(HasGroup("Pair", 3), self.world))
+        self.assertRaises(ValueError, resolve, HasGroup("Pair"))
+
+    def test_matches_state_methods(self) -> None:
+        """Tests compiled rules agree with the CollectionState methods they stand in for"""
+        a, b, c = self.names
+        player = self.player
+        rules = [
+            (Has(a, 2), lambda state: state.has(a, player, 2)),
+            (HasAll((a, b)), lambda state: state.has_all((a, b), player)),
+            (HasAny((a, c)), lambda state: state.has_any((a, c), player)),
+            (HasGroup("Pair", 3), lambda state: state.has_group("Pair", player, 3)),
+            (HasFromList((a, b, c), 4), lambda state: state.has_from_list((a, b, c), player, 4)),
+            (CanReach("Gated") | Has(b, 2), lambda state: state.can_reach("Gated", "Region", player) or
+             state.has(b, player, 2)),
+        ]
+        compiled = [compile_rule(rule, self.world) for rule, _ in rules]
+        for state in self.states():
+            expected = [function(state) for _, function in rules]
+            self.assertEqual(expected, [rule(state) for rule in compiled])
+
+    def test_pickle(self) -> None:
+        """Tests compiled rules survive being sent to another process"""
+        rule = compile_rule(Has(self.names[0]) & CanReach("Gated"), self.world)
+        copied = pickle.loads(pickle.dumps(rule))
+        self.assertIsInstance(copied, CompiledRule)
+        self.assertEqual(rule.rule, copied.rule)
+        for state in self.states():
+            self.assertEqual(rule(state), copied(state))
+
+    def test_rules_helpers(self) -> None:
+        """Tests set_rule and add_rule compile declarative rules and merge them instead of nesting them"""
+        a, b, c = self.names
+        location = Location(self.player, "Spot", None, self.menu)
+        self.menu.locations.append(location)
+        set_rule(location, Has(a))
+        add_rule(location, Has(b))
+        add_rule(location, HasGroup("Pair", 2) & Has(c), "or")
+        self.assertIsInstance(location.access_rule, CompiledRule)
+        self.assertEqual(Or((HasAll((a, b)), And((Has(c), HasFromList(tuple(sorted((a, b))), 2))))),
+                         location.access_rule.rule)
+
+        add_rule(location, lambda state: state.has(c, self.player))
+        for state in self.states():
+            self.assertEqual((state.has_all((a, b), self.player) or
+                              state.count_group("Pair", self.player) >= 2 and state.has(c, self.player))
+                             and state.has(c, self.player), location.can_reach(state))
+
+    def test_rules_helpers_profiled(self) -> None:
+        """Tests add_rule merges declarative rules wrapped by the profiler and keeps timing the merged rule, for as long
+        as the profiler is installed"""
+        a, b, _ = self.names
+        location = Location(self.player, "Spot", None, self.menu)
+        self.menu.locations.append(location)
+        set_rule(location, Has(a))
+        update_reachable_regions = CollectionState.update_reachable_regions
+        with Profiler(self.multiworld).installed():
+            add_rule(location, Has(b))
+            self.assertIsInstance(location.access_rule, TimedRule)
+            self.assertEqual(HasAll((a, b)), location.access_rule.rule.rule)
+        self.assertIsInstance(location.access_rule, CompiledRule)
+        self.assertIs(CollectionState.update_reachable_regions, update_reachable_regions)
+        self.assertIs(Rules.add_rule, add_rule)
+        self.assertEqual(Rules.__name__, Rules.add_rule.__module__)
+
+    def test_interned_counts(self) -> None:
+        """Tests compiled rules read the counts of an interned world by position and still work without them"""
+        a, b, c = self.names
+        self.world.interned_item_counts = True
+        self.world.item_name_to_index = {c: 0, a: 1}
+        rules = [compile_rule(rule, self.world) for rule in (Has(a, 2), HasAll((a, b)), HasGroup("Pair", 3))]
+        for state in self.states():
+            self.assertIsInstance(state.prog_items[self.player], ItemCounter)
+            expected = [state.has(a, self.player, 2), state.has_all((a, b), self.player),
+                        state.has_group("Pair", self.player, 3)]
+            self.assertEqual(expected, [rule(state) for rule in rules])
+            state.prog_items[self.player] = Counter(state.prog_items[self.player])
+            self.assertEqual(expected, [rule(state) for rule in rules])
@@ -343,6 +343,27 @@ class TestFillRestrictive(unittest.TestCase):
         self.assertEqual(player2.locations[0].item, player1.prog_items[0])
         self.assertEqual(player2.locations[1].item, player1.prog_items[1])
 
+    def test_access_checked_once_per_batch(self):
+        """Test that the access rule of a location is only checked once for all items placed against the same state"""
+        multiworld = generate_test_multiworld(2)
+        player1 = generate_player_data(multiworld, 1, 3, 1)
+        player2 = generate_player_data(multiworld, 2, 0, 1)
+        checks: List[bool] = []
+
+        def blocked_rule(state) -> bool:
+            checks.append(True)
+            return False
+
+        set_rule(player1.locations[0], blocked_rule)
+        locations = player1.locations.copy()
+        fill_restrictive(multiworld, multiworld.state, locations, player1.prog_items + player2.prog_items,
+                         swap=False)
+
+        self.assertEqual([player1.locations[0]], locations)
+        self.assertIsNotNone(player1.locations[1].item)
+        self.assertIsNotNone(player1.locations[2].item)
+        self.assertEqual(1, len(checks))
+
     def test_restrictive_progress(self):
         """Test that various spheres with different requirements can be filled"""
         multiworld = generate_test_multiworld()
@@ -3,7 +3,7 @@ import unittest
 from Fill import distribute_items_restrictive
 from NetUtils import encode
 from worlds.AutoWorld import AutoWorldRegister, call_all
-from worlds import failed_world_loads
+from worlds import failed_world_loads, load_all_worlds
 from . import setup_solo_multiworld
 
 
@@ -50,5 +50,6 @@ class TestImplemented(unittest.TestCase):
                     self.assertIsInstance(encode(data), str, f"object {type(data).__name__} not serializable.")
 
     def test_no_failed_world_loads(self):
+        load_all_worlds()
         if failed_world_loads:
             self.fail(f"The following worlds failed to load: {failed_world_loads}")
@@ -0,0 +1,47 @@
+import unittest
+
+from BaseClasses import Spoiler
+from worlds.generic.Rules import set_rule
+from test.general import generate_items, generate_locations, generate_test_multiworld
+
+
+class TestSpoilerPlaythrough(unittest.TestCase):
+    def test_playthrough_culls_unrequired_items(self) -> None:
+        """Tests the playthrough only keeps the items required to beat the game and restores the others afterwards"""
+        multiworld = generate_test_multiworld()
+        menu = multiworld.get_region("Menu", 1)
+        locations = generate_locations(8, 1, menu)
+        items = generate_items(8, 1, True)
+        for location, item in zip(locations, items):
+            multiworld.push_item(location, item, False)
+        # items[0] opens locations[1], which has the other required item, items[1]
+        set_rule(locations[1], lambda state: state.has(items[0].name, 1))
+        # everything else is progression, but only on paths the goal doesn't need
+        for location in locations[2:]:
+            set_rule(location, lambda state: state.has(items[1].name, 1))
+        multiworld.completion_condition[1] = lambda state: state.has_all((items[0].name, items[1].name), 1)
+
+        spoiler = Spoiler(multiworld)
+        spoiler.create_playthrough(create_paths=False)
+
+        self.assertEqual({"0": [],
+                          "1": {locations[0].name: items[0].name},
+                          "2": {locations[1].name: items[1].name}}, spoiler.playthrough)
+        for location, item in zip(locations, items):
+            self.assertIs(item, location.item)
+
+    def test_playthrough_keeps_alternatives_once(self) -> None:
+        """Tests that of several items which each beat the game, exactly one is kept"""
+        multiworld = generate_test_multiworld()
+        menu = multiworld.get_region("Menu", 1)
+        locations = generate_locations(5, 1, menu)
+        items = generate_items(5, 1, True)
+        for location, item in zip(locations, items):
+            multiworld.push_item(location, item, False)
+        multiworld.completion_condition[1] = lambda state: state.has_any([item.name for item in items], 1)
+
+        spoiler = Spoiler(multiworld)
+        spoiler.create_playthrough(create_paths=False)
+
+        self.assertEqual(1, len(spoiler.playthrough["1"]))
+        self.assertEqual(2, len(spoiler.playthrough))
@@ -0,0 +1,270 @@
+import pickle
+import unittest
+from collections import Counter
+
+from BaseClasses import CollectionState, ItemCounter, MultiWorld, Region, RegionSweeper
+from test.general import generate_items, generate_test_multiworld
+from worlds.generic.CompiledRules import Has, compile_rule
+
+
+class TestCollectionStateRemoval(unittest.TestCase):
+    multiworld: MultiWorld
+    player: int = 1
+
+    def setUp(self) -> None:
+        self.multiworld = generate_test_multiworld()
+        self.items = generate_items(2, self.player, True)
+        menu = self.multiworld.get_region("Menu", self.player)
+        first = Region("First", self.player, self.multiworld)
+        second = Region("Second", self.player, self.multiworld)
+        either = Region("Either", self.player, self.multiworld)
+        self.multiworld.regions += [first, second, either]
+        first_name, second_name = (item.name for item in self.items)
+        menu.connect(first, rule=lambda state: state.has(first_name, self.player))
+        first.connect(second, rule=lambda state: state.has(second_name, self.player))
+        menu.connect(either, rule=lambda state: state.has_any((first_name, second_name), self.player))
+        self.regions = (menu, first, second, either)
+
+    def reached(self, state: CollectionState) -> set:
+        return {region for region in self.regions if region.can_reach(state)}
+
+    def test_remove_last_collected(self) -> None:
+        """Tests removing the most recent item only drops regions found after it was collected"""
+        menu, first, second, either = self.regions
+        state = CollectionState(self.multiworld)
+        state.collect(self.items[0], True)
+        self.assertEqual({menu, first, either}, self.reached(state))
+        state.collect(self.items[1], True)
+        self.assertEqual({menu, first, second, either}, self.reached(state))
+
+        state.remove(self.items[1])
+        self.assertEqual({menu, first, either}, state.reachable_regions[self.player])
+        self.assertTrue(state.stale[self.player])
+        self.assertEqual({menu, first, either}, self.reached(state))
+
+    def test_remove_earlier_collected(self) -> None:
+        """Tests removing an item collected before others rechecks everything found after it"""
+        menu, first, second, either = self.regions
+        state = CollectionState(self.multiworld)
+        state.collect(self.items[0], True)
+        self.reached(state)
+        state.collect(self.items[1], True)
+        self.reached(state)
+
+        state.remove(self.items[0])
+        self.assertEqual({menu}, state.reachable_regions[self.player])
+        self.assertEqual({menu, either}, self.reached(state))
+
+    def test_remove_matches_fresh_state(self) -> None:
+        """Tests reachability after removal is the same as a state that never collected the item"""
+        state = CollectionState(self.multiworld)
+        for item in self.items:
+            state.collect(item, True)
+            self.reached(state)
+        copied = state.copy()
+        copied.remove(self.items[0])
+
+        fresh = CollectionState(self.multiworld)
+        fresh.collect(self.items[1], True)
+        self.assertEqual(self.reached(fresh), self.reached(copied))
+        self.assertEqual(len(self.regions), len(self.reached(state)))
+
+    def test_remove_untracked(self) -> None:
+        """Tests removing an item that was counted outside of collect invalidates the player's regions"""
+        menu, first, second, either = self.regions
+        state = CollectionState(self.multiworld)
+        state.prog_items[self.player][self.items[0].name] += 1
+        self.assertEqual({menu, first, either}, self.reached(state))
+
+        state.remove(self.items[0])
+        self.assertEqual(set(), state.reachable_regions[self.player])
+        self.assertEqual({menu}, self.reached(state))
+
+
+class TestCollectionStateCopy(unittest.TestCase):
+    multiworld: MultiWorld
+
+    def setUp(self) -> None:
+        self.multiworld = generate_test_multiworld(2)
+        self.items = {player: generate_items(2, player, True) for player in self.multiworld.player_ids}
+        for player in self.multiworld.player_ids:
+            menu = self.multiworld.get_region("Menu", player)
+            gated = Region(f"Gated{player}", player, self.multiworld)
+            self.multiworld.regions.append(gated)
+            item_name = self.items[player][0].name
+            menu.connect(gated, rule=lambda state, item_name=item_name, player=player: state.has(item_name, player))
+
+    def test_copy_is_independent(self) -> None:
+        """Tests changes to a copy and to its original don't leak into each other"""
+        state = CollectionState(self.multiworld)
+        state.collect(self.items[1][1], True)
+        copied = state.copy()
+
+        copied.collect(self.items[1][0], True)
+        self.assertTrue(copied.can_reach("Gated1", "Region", 1))
+        self.assertFalse(state.can_reach("Gated1", "Region", 1))
+        self.assertEqual(1, state.count_from_list([item.name for item in self.items[1]], 1))
+
+        state.collect(self.items[2][0], True)
+        self.assertTrue(state.can_reach("Gated2", "Region", 2))
+        self.assertFalse(copied.can_reach("Gated2", "Region", 2))
+        self.assertFalse(copied.has(self.items[2][0].name, 2))
+
+    def test_direct_edit_of_copy(self) -> None:
+        """Tests editing prog_items of a copy directly leaves the original alone"""
+        state = CollectionState(self.multiworld)
+        copied = state.copy()
+        copied.prog_items[1][self.items[1][0].name] += 1
+        self.assertTrue(copied.has(self.items[1][0].name, 1))
+        self.assertFalse(state.has(self.items[1][0].name, 1))
+
+    def test_direct_edit_of_original(self) -> None:
+        """Tests editing the per player structures of the original directly leaves its copies alone"""
+        state = CollectionState(self.multiworld)
+        copied = state.copy()
+        item_name = self.items[1][0].name
+        state.prog_items[1][item_name] += 1
+        state.reachable_regions[1].add(self.multiworld.get_region("Gated1", 1))
+        self.assertEqual(0, copied.prog_items[1][item_name])
+        self.assertNotIn(self.multiworld.get_region("Gated1", 1), copied.reachable_regions[1])
+        second = state.copy()
+        state.prog_items[1][item_name] += 1
+        self.assertEqual(1, second.prog_items[1][item_name])
+
+    def test_copy_only_touched_players(self) -> None:
+        """Tests a copy only copies the structures of the players it looks at"""
+        state = CollectionState(self.multiworld)
+        copied = state.copy()
+        copied.collect(self.items[1][0], True)
+        self.assertTrue(copied.can_reach("Gated1", "Region", 1))
+        for attribute in CollectionState.per_player_attributes:
+            structures = getattr(copied, attribute)
+            self.assertTrue(dict.__contains__(structures, 1))
+            self.assertFalse(dict.__contains__(structures, 2))
+            self.assertIs(getattr(state, attribute).shared[2], structures.shared[2])
+
+    def test_copy_of_copy(self) -> None:
+        """Tests copies of copies keep the state they were taken from"""
+        state = CollectionState(self.multiworld)
+        first = state.copy()
+        first.collect(self.items[1][0], True)
+        second = first.copy()
+        first.remove(self.items[1][0])
+        self.assertFalse(first.can_reach("Gated1", "Region", 1))
+        self.assertTrue(second.can_reach("Gated1", "Region", 1))
+        self.assertFalse(state.can_reach("Gated1", "Region", 1))
+        self.assertEqual(state.prog_items[2], second.prog_items[2])
+
+
+class TestRegionSweeper(unittest.TestCase):
+    multiworld: MultiWorld
+
+    def setUp(self) -> None:
+        self.multiworld = generate_test_multiworld(3)
+        self.items = {player: generate_items(2, player, True) for player in self.multiworld.player_ids}
+        for player in self.multiworld.player_ids:
+            world = self.multiworld.worlds[player]
+            menu = self.multiworld.get_region("Menu", player)
+            first = Region(f"First{player}", player, self.multiworld)
+            second = Region(f"Second{player}", player, self.multiworld)
+            self.multiworld.regions += [first, second]
+            first_name, second_name = (item.name for item in self.items[player])
+            menu.connect(first, rule=compile_rule(Has(first_name), world))
+            if player == 3:
+                first.connect(second, rule=lambda state: state.has(second_name, 3))
+            else:
+                first.connect(second, rule=compile_rule(Has(second_name), world))
+        self.sweeper = RegionSweeper(self.multiworld, 1)
+        self.addCleanup(self.sweeper.shutdown)
+
+    def test_only_shippable_players(self) -> None:
+        """Tests players with rules that can't be sent to a worker are left to be swept serially"""
+        self.assertEqual({1, 2}, self.sweeper.players)
+
+    def test_matches_serial_sweep(self) -> None:
+        """Tests sweeping in parallel finds the same regions and paths as sweeping serially"""
+        serial = CollectionState(self.multiworld)
+        parallel = CollectionState(self.multiworld)
+        for items in self.items.values():
+            for state in (serial, parallel):
+                state.collect(items[0], True)
+        for state in (serial, parallel):
+            state.collect(self.items[1][1], True)
+
+        self.sweeper.update_reachable_regions(parallel)
+        self.assertFalse(parallel.stale[1])
+        self.assertFalse(parallel.stale[2])
+        self.assertTrue(parallel.stale[3])
+        for player in self.multiworld.player_ids:
+            serial.update_reachable_regions(player)
+            parallel.update_reachable_regions(player)
+            self.assertEqual(serial.reachable_regions[player], parallel.reachable_regions[player])
+            self.assertEqual(serial.blocked_connections[player], parallel.blocked_connections[player])
+            self.assertEqual(serial.region_epochs[player], parallel.region_epochs[player])
+        self.assertEqual(serial.path, parallel.path)
+
+    def test_installed(self) -> None:
+        """Tests the workers are shut down after the with block, even if it raises"""
+        with self.assertRaises(RuntimeError):
+            with self.sweeper.installed():
+                self.assertIs(self.sweeper, self.multiworld.region_sweeper)
+                raise RuntimeError
+        self.assertIsNone(self.multiworld.region_sweeper)
+        self.assertIsNone(self.sweeper.pool)
+
+
+class TestItemCounter(unittest.TestCase):
+    index = {"Sword": 0, "Shield": 1, "Bow": 2}
+
+    def test_acts_like_counter(self) -> None:
+        """Tests interned and other names behave the same as in a Counter"""
+        counter = ItemCounter(self.index)
+        expected = Counter()
+        for items in (counter, expected):
+            items["Sword"] += 2
+            items["Event"] += 1
+            items["Shield"] += 1
+            items["Shield"] -= 1
+            del items["Shield"]
+            items.update(["Bow", "Bow", "Event"])
+        self.assertEqual(expected, counter)
+        self.assertEqual(counter, expected)
+        self.assertEqual(dict(expected), dict(counter))
+        self.assertEqual(len(expected), len(counter))
+        self.assertEqual(set(expected), set(counter))
+        self.assertEqual(sum(expected.values()), sum(counter.values()))
+        for name in ("Sword", "Shield", "Bow", "Event", "Missing"):
+            self.assertEqual(expected[name], counter[name])
+            self.assertEqual(name in expected, name in counter)
+            self.assertEqual(expected.get(name, 0), counter.get(name, 0))
+        self.assertTrue(counter)
+        self.assertFalse(ItemCounter(self.index))
+
+    def test_copy(self) -> None:
+        """Tests copies don't share counts and pickles arrive as plain Counters"""
+        counter = ItemCounter(self.index)
+        counter["Sword"] = 1
+        counter["Event"] = 1
+        copied = counter.copy()
+        copied["Sword"] += 1
+        copied["Event"] += 1
+        self.assertEqual(Counter({"Sword": 1, "Event": 1}), counter)
+        self.assertEqual(Counter({"Sword": 2, "Event": 2}), copied)
+        self.assertEqual(Counter({"Sword": 1, "Event": 1}), pickle.loads(pickle.dumps(counter)))
+
+    def test_interned_world(self) -> None:
+        """Tests states of a world that opts in count its items in an ItemCounter"""
+        multiworld = generate_test_multiworld()
+        items = generate_items(2, 1, True)
+        world = multiworld.worlds[1]
+        world.interned_item_counts = True
+        world.item_name_to_index = {items[0].name: 0}
+        state = CollectionState(multiworld)
+        self.assertIsInstance(state.prog_items[1], ItemCounter)
+        for item in items:
+            state.collect(item, True)
+        copied = state.copy()
+        copied.remove(items[0])
+        self.assertTrue(state.has_all([item.name for item in items], 1))
+        self.assertFalse(copied.has(items[0].name, 1))
+        self.assertTrue(copied.has(items[1].name, 1))
@@ -0,0 +1,65 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import worlds
+from Utils import cache_path, get_file_safe_name, load_data_package_for_checksum, store_data_package_for_checksum
+from worlds import WorldSource, world_manifest
+from worlds.AutoWorld import AutoWorldRegister
+
+
+class TestWorldManifest(unittest.TestCase):
+    def test_manifest_matches_worlds(self) -> None:
+        """Tests the manifest describes each game the same as its imported world"""
+        for game, info in world_manifest.items():
+            with self.subTest(game):
+                described = worlds._describe_game(game)
+                # a few worlds order their data package differently in each process, which changes the checksum
+                del described["checksum"]
+                self.assertEqual(described, {key: value for key, value in info.items() if key != "checksum"})
+
+    def test_manifest_complete(self) -> None:
+        """Tests every world imported from a world source can be found through the manifest"""
+        for game, world_type in AutoWorldRegister.world_types.items():
+            if world_type.__module__.startswith("worlds."):
+                with self.subTest(game):
+                    self.assertIn(game, world_manifest)
+                    self.assertEqual(world_type.__module__.split(".")[1], worlds._game_sources[game].module_name)
+
+    def test_data_package_cache(self) -> None:
+        """Tests the data package of each game in the manifest is cached with the manifest's checksum"""
+        for game, info in world_manifest.items():
+            with self.subTest(game):
+                data_package = load_data_package_for_checksum(game, info["checksum"])
+                self.assertEqual(info["checksum"], data_package.get("checksum", None))
+                self.assertTrue(worlds._is_complete(data_package))
+                self.assertEqual(set(data_package["item_name_to_id"].values()),
+                                 set(AutoWorldRegister.world_types[game].item_id_to_name))
+
+    def test_store_data_package(self) -> None:
+        """Tests a stored data package is kept unless it is meant to be replaced"""
+        game = "Test Store Data Package"
+        self.addCleanup(shutil.rmtree, cache_path("datapackage", get_file_safe_name(game)), True)
+        stripped = {"item_name_to_id": {"Sword": 1}, "location_name_to_id": {}, "checksum": "test"}
+        complete = {**stripped, "item_name_groups": {}, "location_name_groups": {}}
+        store_data_package_for_checksum(game, stripped)
+        store_data_package_for_checksum(game, complete)
+        self.assertEqual(stripped, load_data_package_for_checksum(game, "test"))
+        store_data_package_for_checksum(game, complete, replace=True)
+        self.assertEqual(complete, load_data_package_for_checksum(game, "test"))
+
+    def test_fingerprint(self) -> None:
+        """Tests a folder's fingerprint changes with its files, but not with its compiled files"""
+        with tempfile.TemporaryDirectory() as folder:
+            source = WorldSource(folder, relative=False)
+            with open(os.path.join(folder, "__init__.py"), "w") as f:
+                f.write("game = 'Test'\n")
+            fingerprint = source.fingerprint()
+            os.makedirs(os.path.join(folder, "__pycache__"))
+            with open(os.path.join(folder, "__pycache__", "__init__.pyc"), "wb") as f:
+                f.write(b"compiled")
+            self.assertEqual(fingerprint, source.fingerprint())
+            with open(os.path.join(folder, "data.json"), "w") as f:
+                f.write("{}")
+            self.assertNotEqual(fingerprint, source.fingerprint())
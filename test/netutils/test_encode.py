@@ -0,0 +1,129 @@
+# Tests for NetUtils.encode, run this file directly to benchmark it against the encoder it replaced
+import json
+import typing
+import unittest
+
+import NetUtils
+from NetUtils import ClientStatus, NetworkItem, NetworkPlayer, NetworkSlot, SlotType, decode, encode
+
+
+def previous_scan_for_TypedTuples(obj: typing.Any) -> typing.Any:
+    if isinstance(obj, tuple) and hasattr(obj, "_fields"):
+        data = obj._asdict()
+        data["class"] = obj.__class__.__name__
+        return data
+    if isinstance(obj, (tuple, list, set, frozenset)):
+        return tuple(previous_scan_for_TypedTuples(o) for o in obj)
+    if isinstance(obj, dict):
+        return {key: previous_scan_for_TypedTuples(value) for key, value in obj.items()}
+    return obj
+
+
+def previous_encode(obj: typing.Any) -> str:
+    return NetUtils._encode(previous_scan_for_TypedTuples(obj))
+
+
+def sample_messages(items: int = 100) -> typing.Dict[str, typing.List[dict]]:
+    return {
+        "ReceivedItems": [{"cmd": "ReceivedItems", "index": 0,
+                           "items": [NetworkItem(item, item + 1, item % 7, item % 3) for item in range(items)]}],
+        "Connected": [{
+            "cmd": "Connected", "team": 0, "slot": 1, "hint_points": 5,
+            "players": [NetworkPlayer(0, slot, f"Alias {slot}", f"Player {slot}") for slot in range(1, 10)],
+            "missing_locations": list(range(items)), "checked_locations": set(range(items, 2 * items)),
+            "slot_info": {slot: NetworkSlot(f"Player {slot}", "Game", SlotType.player) for slot in range(1, 10)},
+            "slot_data": {"options": {"goal": 1, "names": ["ä", "☃"]}, "nested": [[1, 2], (3, 4)],
+                          "ratio": 0.5, "missing": None, "enabled": True, "entrances": {5: "x", 6: "y"}},
+        }],
+        "DataPackage": [{"cmd": "DataPackage", "data": {"games": {"Game": {
+            "item_name_to_id": {f"Item {item}": item for item in range(items)},
+            "location_name_to_id": {f"Location {item}": item for item in range(items)},
+            "checksum": "0" * 40,
+        }}}}],
+        "PrintJSON": [{"cmd": "PrintJSON", "type": "ItemSend", "receiving": 2, "item": NetworkItem(1, 2, 3, 1),
+                       "data": [{"text": "text", "type": "player_id", "player": 2}]},
+                      {"cmd": "RoomUpdate", "client_status": ClientStatus.CLIENT_GOAL}],
+    }
+
+
+class TestEncode(unittest.TestCase):
+    def test_matches_previous_encoder(self) -> None:
+        """Tests the encoders send the same data as the encoder they replaced"""
+        for name, msgs in sample_messages().items():
+            expected = json.loads(previous_encode(msgs))
+            for encoder in (encode, NetUtils._encode_typed_tuples):
+                with self.subTest(name, encoder=encoder.__name__):
+                    encoded = encoder(msgs)
+                    self.assertEqual(expected, json.loads(encoded))
+                    self.assertEqual(decode(previous_encode(msgs)), decode(encoded))
+
+    def test_matches_fallback(self) -> None:
+        """Tests orjson encodes subclasses of builtins through their own methods and refuses the same values as
+        JSONEncoder. orjson encodes UUIDs, plain Enums and non-finite floats natively and has no option to hand them
+        over, so those are left out."""
+        import dataclasses
+        import datetime
+        from BaseClasses import CopyOnWriteDict
+        from Utils import LazyDict
+
+        class Name(str):
+            pass
+
+        class Ratio(float):
+            pass
+
+        class Items(list):
+            def __iter__(self) -> typing.Iterator[typing.Any]:
+                return iter(sorted(super().__iter__()))
+
+        @dataclasses.dataclass
+        class Data:
+            value: int
+
+        lazy = LazyDict({1: "loaded"})
+        lazy.load_all = lambda: lazy.update({2: "lazy"})
+        copy_on_write = CopyOnWriteDict({1: [NetworkItem(1, 2, 3, 0)]})
+        copy_on_write[2] = ["own"]
+        values = [Name("name"), Ratio(0.25), Items([3, 1, 2]), {Name("key"): Name("value")}, lazy, copy_on_write,
+                  {ClientStatus.CLIENT_GOAL: ClientStatus.CLIENT_READY}, SlotType.group | SlotType.player,
+                  [datetime.datetime(2000, 1, 1)], [datetime.date(2000, 1, 1)], [Data(1)], {(1, 2): 3}]
+        for value in values:
+            with self.subTest(value=value):
+                try:
+                    expected = NetUtils._encode_typed_tuples([value])
+                except TypeError:
+                    self.assertRaises(TypeError, encode, [value])
+                else:
+                    self.assertEqual(expected, encode([value]))
+
+    def test_named_tuples(self) -> None:
+        """Tests NamedTuples arrive as themselves"""
+        slot = NetworkSlot("Group", "Archipelago", SlotType.group, [1, 2])
+        for encoder in (encode, NetUtils._encode_typed_tuples):
+            with self.subTest(encoder=encoder.__name__):
+                self.assertEqual([NetworkItem(1, 2, 3, 4), slot], decode(encoder([NetworkItem(1, 2, 3, 4), slot])))
+
+    def test_unsupported_by_backend(self) -> None:
+        """Tests values only JSONEncoder can encode still get encoded"""
+        self.assertEqual([2 ** 70, NetworkItem(1, 2, 3, 0)], decode(encode([2 ** 70, NetworkItem(1, 2, 3)])))
+        self.assertEqual("\ud800", decode(encode("\ud800")))
+        self.assertRaises(TypeError, encode, [object()])
+
+
+def run_encode_benchmark(rounds: int = 20) -> None:
+    import time
+
+    for items in (100, 10_000):
+        for name, msgs in sample_messages(items).items():
+            times = {}
+            for encoder in (previous_encode, NetUtils._encode_typed_tuples, encode):
+                start = time.perf_counter()
+                for _ in range(rounds):
+                    encoder(msgs)
+                times[encoder.__name__] = (time.perf_counter() - start) / rounds
+            print(f"{name} ({items} items): " + ", ".join(f"{encoder} {taken * 1000:.3f}ms"
+                                                         for encoder, taken in times.items()))
+
+
+if __name__ == "__main__":
+    run_encode_benchmark()
@@ -112,6 +112,21 @@ class Base:
             self.assertEqual(sorted(self.store.find_item(set(range(2048)), 13)),
                              [(1, 13, 13, 1, 0)])
 
+        def test_find_items(self) -> None:
+            self.assertEqual(list(self.store.find_items({1, 2}, [])), [])
+            self.assertEqual(list(self.store.find_items(set(), [12, 13])), [])
+            self.assertEqual(list(self.store.find_items({0, 6, -1}, [12, 13])), [])
+            # ordered by finding player and location
+            self.assertEqual(list(self.store.find_items({1, 2}, [12, 13, 21, 1])),
+                             [(1, 11, 21, 2, 7), (1, 13, 13, 1, 0), (2, 22, 12, 1, 0)])
+            self.assertEqual(list(self.store.find_items({3, 4, 5}, {99})),
+                             [(3, 9, 99, 4, 0), (4, 9, 99, 3, 0), (5, 9, 99, 5, 0)])
+            # same as find_item for each item
+            for slots in ({1}, {1, 2}, {2, 3, 4}):
+                for items in ([12], [12, 13], [99, 21, 22, 23]):
+                    self.assertEqual(sorted(self.store.find_items(slots, items)),
+                                     sorted(found for item in items for found in self.store.find_item(slots, item)))
+
         def test_get_for_player(self) -> None:
             self.assertEqual(self.store.get_for_player(3), {4: {9}})
             self.assertEqual(self.store.get_for_player(1), {1: {13}, 2: {22, 23}})
@@ -0,0 +1,55 @@
+# Tests for NetUtils.compress_multidata and NetUtils.decompress_multidata
+import pickle
+import unittest
+import zlib
+
+from NetUtils import CachedMultidataSection, Hint, MultidataSection, compress_multidata, decompress_multidata
+from Utils import VersionException
+
+sample_multidata = {
+    "seed_name": "12345",
+    "slot_data": {1: {"goal": 1, "big": list(range(1000))}, 2: {}},
+    "er_hint_data": {1: {10: "Entrance"}},
+    "precollected_hints": {1: {Hint(1, 2, 3, 4, False)}},
+}
+
+
+class TestMultidata(unittest.TestCase):
+    def test_round_trip(self) -> None:
+        """Tests multidata comes back the same, with slot_data and er_hint_data loaded per slot"""
+        multidata = decompress_multidata(compress_multidata(sample_multidata))
+        self.assertIsInstance(multidata["slot_data"], MultidataSection)
+        self.assertIsInstance(multidata["er_hint_data"], CachedMultidataSection)
+        self.assertEqual(sample_multidata, {key: dict(value) if isinstance(value, MultidataSection) else value
+                                            for key, value in multidata.items()})
+
+    def test_lazy_sections(self) -> None:
+        """Tests slot_data is unpickled every time it is looked up and er_hint_data only once"""
+        multidata = decompress_multidata(compress_multidata(sample_multidata))
+        self.assertEqual([1, 2], list(multidata["slot_data"]))
+        self.assertIsNot(multidata["slot_data"][1], multidata["slot_data"][1])
+        self.assertIs(multidata["er_hint_data"][1], multidata["er_hint_data"][1])
+        self.assertEqual({}, multidata["er_hint_data"].get(2, {}))
+
+    def test_sections_own_data(self) -> None:
+        """Tests each lazy section only keeps the compressed values of its own slots"""
+        multidata = decompress_multidata(compress_multidata(sample_multidata))
+        for name in ("slot_data", "er_hint_data"):
+            section = multidata[name]
+            self.assertEqual(sum(length for _, length in section.index.values()), len(section.data))
+            self.assertIs(bytes, type(section.data))
+
+    def test_recompress(self) -> None:
+        """Tests loaded multidata can be written again without looking at its lazy sections"""
+        data = compress_multidata(sample_multidata)
+        multidata = decompress_multidata(data)
+        multidata["seed_name"] = "54321"
+        multidata = decompress_multidata(compress_multidata(multidata))
+        self.assertEqual("54321", multidata["seed_name"])
+        self.assertEqual(sample_multidata["slot_data"][1], multidata["slot_data"][1])
+
+    def test_old_format(self) -> None:
+        """Tests files written as one compressed pickle still load and newer formats don't"""
+        self.assertEqual(sample_multidata,
+                         decompress_multidata(bytes([3]) + zlib.compress(pickle.dumps(sample_multidata))))
+        self.assertRaises(VersionException, decompress_multidata, bytes([5]) + zlib.compress(pickle.dumps({})))
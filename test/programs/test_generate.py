@@ -1,5 +1,6 @@
 # Tests for Generate.py (ArchipelagoGenerate.exe)
 
+import json
 import unittest
 import os
 import os.path
@@ -92,3 +93,24 @@ class TestGenerateMain(unittest.TestCase):
             user_path.cached_path = user_path_backup
 
         self.assertOutput(self.output_tempdir.name)
+
+    def test_generate_profile(self):
+        sys.argv = [sys.argv[0], '--seed', '0',
+                    '--player_files_path', str(self.abs_input_dir),
+                    '--outputpath', self.output_tempdir.name,
+                    '--profile']
+        print(f'Testing Generate.py {sys.argv} in {os.getcwd()}')
+        Main.main(*Generate.main())
+
+        self.assertOutput(self.output_tempdir.name)
+        output_path = Path(self.output_tempdir.name)
+        reports = list(output_path.glob('*_Profile.json'))
+        self.assertEqual(1, len(reports))
+        with open(reports[0]) as f:
+            report = json.load(f)
+        self.assertEqual({"setup", "world stages", "item links and plando", "pre_fill", "fill", "post_fill",
+                          "output", "spoiler", "archive"}, set(report["phases"]))
+        world = report["worlds"]["1"]
+        self.assertIn("create_regions", world["stages"])
+        self.assertGreater(world["update_reachable_regions"]["calls"], 0)
+        self.assertEqual(1, len(list(output_path.glob('*_Profile.txt'))))
@@ -1,5 +1,13 @@
+import asyncio
+import os
+import tempfile
+import typing
 import unittest
-from MultiServer import Context, ServerCommandProcessor
+from unittest import mock
+
+from MultiServer import Client, Context, DataPackageCache, ServerCommandProcessor, apply_save_journal, send_items_to, \
+    send_new_items
+from NetUtils import Hint, NetworkItem, decode, encode
 
 
 class TestResolvePlayerName(unittest.TestCase):
@@ -38,3 +46,307 @@ class TestResolvePlayerName(unittest.TestCase):
         assert p.resolve_player("ABC") == (1, 2, "abc"), "case insensitive resolves when 1 match"
         assert p.resolve_player("abcd") == (1, 3, "abCD"), "case insensitive resolves when 1 match"
         assert not p.resolve_player("aB"), "partial name shouldn't resolve to player"
+
+
+class FakeSocket:
+    open = True
+
+    def __init__(self, buffered: int = 0) -> None:
+        self.transport = mock.Mock()
+        self.transport.get_write_buffer_size.return_value = buffered
+        self.send = mock.AsyncMock()
+        self.close = mock.AsyncMock()
+
+
+class TestSendNewItems(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.ctx = Context("", 0, "", "", 0, 0, False)
+        self.sent: typing.List[typing.Tuple[Client, typing.List[dict]]] = []
+        self.clients = {}
+        self.ctx.clients = {0: {}}
+        for slot in (1, 2, 3):
+            client = Client(FakeSocket(), self.ctx)
+            client.team, client.slot = 0, slot
+            client.items_handling = 0b111
+            self.clients[slot] = client
+            self.ctx.clients[0][slot] = [client]
+
+        def broadcast(sockets: typing.List[FakeSocket], msg: str) -> None:
+            for client in self.clients.values():
+                if client.socket in sockets:
+                    self.sent.append((client, self.ctx.loader(msg)))
+
+        patcher = mock.patch("MultiServer.websockets.broadcast", broadcast)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_batched_per_client(self) -> None:
+        """Tests items received during one event loop iteration reach only their slots, in one message each"""
+        send_items_to(self.ctx, 0, 1, NetworkItem(1, 1, 2, 0))
+        send_new_items(self.ctx)
+        send_items_to(self.ctx, 0, 1, NetworkItem(2, 2, 2, 0))
+        send_items_to(self.ctx, 0, 2, NetworkItem(3, 3, 1, 0))
+        send_new_items(self.ctx)
+        self.assertEqual([], self.sent)
+        await asyncio.sleep(0)
+        received = {client.slot: msgs for client, msgs in self.sent}
+        self.assertEqual(2, len(self.sent))
+        self.assertEqual([{"cmd": "ReceivedItems", "index": 0,
+                           "items": [NetworkItem(1, 1, 2, 0), NetworkItem(2, 2, 2, 0)]}], received[1])
+        self.assertEqual([{"cmd": "ReceivedItems", "index": 0, "items": [NetworkItem(3, 3, 1, 0)]}], received[2])
+        self.assertEqual(2, self.clients[1].send_index)
+        self.assertEqual(0, self.clients[3].send_index)
+
+        self.sent.clear()
+        send_items_to(self.ctx, 0, 1, NetworkItem(4, 4, 2, 0))
+        send_new_items(self.ctx)
+        await asyncio.sleep(0)
+        self.assertEqual([(self.clients[1], [{"cmd": "ReceivedItems", "index": 2,
+                                              "items": [NetworkItem(4, 4, 2, 0)]}])], self.sent)
+
+    async def test_outbox_order(self) -> None:
+        """Tests new items go out in the same message as what was broadcast to their clients before them"""
+        self.ctx.broadcast([self.clients[1]], [{"cmd": "PrintJSON", "data": [{"text": "sent"}]}])
+        send_items_to(self.ctx, 0, 1, NetworkItem(1, 1, 2, 0))
+        send_new_items(self.ctx)
+        await asyncio.sleep(0)
+        self.assertEqual([(self.clients[1], [{"cmd": "PrintJSON", "data": [{"text": "sent"}]},
+                                             {"cmd": "ReceivedItems", "index": 0,
+                                              "items": [NetworkItem(1, 1, 2, 0)]}])], self.sent)
+
+
+class TestOutbox(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.ctx = Context("", 0, "", "", 0, 0, False)
+        self.ctx.clients = {0: {}}
+        self.clients = []
+        for slot in (1, 2, 3):
+            client = Client(FakeSocket(), self.ctx)
+            client.team, client.slot = 0, slot
+            self.clients.append(client)
+            self.ctx.clients[0][slot] = [client]
+        self.sent: typing.List[typing.Tuple[typing.Set[Client], list]] = []
+
+        def broadcast(sockets: typing.List[FakeSocket], msg: str) -> None:
+            self.sent.append(({client for client in self.clients if client.socket in sockets},
+                              self.ctx.loader(msg)))
+
+        patcher = mock.patch("MultiServer.websockets.broadcast", broadcast)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def flush(self) -> None:
+        await asyncio.sleep(0)
+
+    async def test_merged_per_tick(self) -> None:
+        """Tests everything broadcast during one event loop iteration goes out as one message per group of clients"""
+        first, second, third = self.clients
+        self.ctx.broadcast_team(0, [{"cmd": "PrintJSON", "data": [{"text": "a"}]}])
+        self.ctx.broadcast([first], [{"cmd": "RoomUpdate", "hint_points": 1}])
+        self.ctx.broadcast_team(0, [{"cmd": "PrintJSON", "data": [{"text": "b"}]}])
+        self.assertEqual([], self.sent)
+        await self.flush()
+        self.assertEqual(2, len(self.sent))
+        sent = {frozenset(clients): msgs for clients, msgs in self.sent}
+        self.assertEqual([{"cmd": "PrintJSON", "data": [{"text": "a"}]}, {"cmd": "RoomUpdate", "hint_points": 1},
+                          {"cmd": "PrintJSON", "data": [{"text": "b"}]}], sent[frozenset({first})])
+        self.assertEqual([{"cmd": "PrintJSON", "data": [{"text": "a"}]}, {"cmd": "PrintJSON", "data": [{"text": "b"}]}],
+                         sent[frozenset({second, third})])
+
+    async def test_slow_socket(self) -> None:
+        """Tests a socket with a full write buffer gets its messages once it drained, without holding up others"""
+        first, second, third = self.clients
+        first.socket.transport.get_write_buffer_size.return_value = Context.outbox_write_limit + 1
+        self.ctx.broadcast_team(0, [{"cmd": "PrintJSON", "data": [{"text": "a"}]}])
+        await self.flush()
+        self.assertEqual([({second, third}, [{"cmd": "PrintJSON", "data": [{"text": "a"}]}])], self.sent)
+        self.assertIn(first, self.ctx.outbox)
+
+        self.sent.clear()
+        self.ctx.broadcast_team(0, [{"cmd": "PrintJSON", "data": [{"text": "b"}]}])
+        await self.flush()
+        self.assertEqual([({second, third}, [{"cmd": "PrintJSON", "data": [{"text": "b"}]}])], self.sent)
+
+        self.sent.clear()
+        first.socket.transport.get_write_buffer_size.return_value = 0
+        self.ctx.broadcast_team(0, [{"cmd": "PrintJSON", "data": [{"text": "c"}]}])
+        await self.flush()
+        sent = {frozenset(clients): msgs for clients, msgs in self.sent}
+        self.assertEqual([{"cmd": "PrintJSON", "data": [{"text": text}]} for text in "abc"], sent[frozenset({first})])
+        self.assertEqual([{"cmd": "PrintJSON", "data": [{"text": "c"}]}], sent[frozenset({second, third})])
+        self.assertFalse(self.ctx.outbox)
+
+    async def test_direct_send(self) -> None:
+        """Tests messages sent directly to a client go out behind what is still queued for it"""
+        first = self.clients[0]
+        first.socket.transport.get_write_buffer_size.return_value = Context.outbox_write_limit + 1
+        self.ctx.broadcast([first], [{"cmd": "PrintJSON", "data": [{"text": "a"}]}])
+        await self.flush()
+        self.assertTrue(await self.ctx.send_msgs(first, [{"cmd": "PrintJSON", "data": [{"text": "b"}]}]))
+        first.socket.send.assert_awaited_once()
+        self.assertEqual([{"cmd": "PrintJSON", "data": [{"text": text}]} for text in "ab"],
+                         self.ctx.loader(first.socket.send.await_args.args[0]))
+        self.assertNotIn(first, self.ctx.outbox)
+
+    async def test_backlog_limit(self) -> None:
+        """Tests a client that doesn't catch up gets disconnected instead of messages piling up for it"""
+        first = self.clients[0]
+        first.socket.transport.get_write_buffer_size.return_value = Context.outbox_write_limit + 1
+        with mock.patch.object(Context, "outbox_backlog_limit", 100):
+            self.ctx.broadcast([first], [{"cmd": "PrintJSON", "data": [{"text": "a" * 50}]}])
+            await self.flush()
+            first.socket.close.assert_not_called()
+            self.ctx.broadcast([first], [{"cmd": "PrintJSON", "data": [{"text": "b" * 50}]}])
+            await self.flush()
+            await self.flush()
+        first.socket.close.assert_awaited_once()
+        self.assertNotIn(first, self.ctx.outbox)
+
+
+class TestDataPackageCache(unittest.TestCase):
+    games = {
+        "Game": {"item_name_to_id": {"Item": 1}, "location_name_to_id": {"Location": 2}, "checksum": "a"},
+        "Ünknown": {"item_name_to_id": {}, "location_name_to_id": {}},
+    }
+
+    def test_encode_msgs(self) -> None:
+        """Tests the cached message is the same as encoding it directly"""
+        cache = DataPackageCache()
+        for games in (self.games, {}, {"Game": self.games["Game"]}):
+            self.assertEqual(decode(encode([{"cmd": "DataPackage", "data": {"games": games}}])),
+                             decode(cache.encode_msgs(games)))
+
+    def test_encoded_once(self) -> None:
+        """Tests a data package with a checksum only gets encoded once"""
+        cache = DataPackageCache()
+        cache.encode_msgs(self.games)
+        self.assertEqual(["a"], list(cache.encoded))
+        with mock.patch("MultiServer.encode", side_effect=encode) as mock_encode:
+            cache.encode_msgs({"Game": self.games["Game"]})
+        mock_encode.assert_called_once_with("Game")
+
+    def test_bounded(self) -> None:
+        """Tests the least recently used data packages get dropped once the cache is full"""
+        packages = [{**self.games["Game"], "checksum": checksum} for checksum in "abc"]
+        cache = DataPackageCache(2 * len(encode(packages[0])))
+        cache.encode_package(packages[0])
+        cache.encode_package(packages[1])
+        cache.encode_package(packages[0])
+        cache.encode_package(packages[2])
+        self.assertEqual(["a", "c"], list(cache.encoded))
+        self.assertEqual(sum(map(len, cache.encoded.values())), cache.size)
+
+
+class TestSaveJournal(unittest.TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.save_filename = os.path.join(directory.name, "test.apsave")
+        self.ctx = self.new_context()
+
+    def new_context(self) -> Context:
+        ctx = Context("", 0, "", "", 0, 0, False)
+        ctx.save_filename = self.save_filename
+        with mock.patch.object(ctx, "_start_async_saving"):
+            ctx.init_save()
+        return ctx
+
+    def change(self, ctx: Context) -> None:
+        send_items_to(ctx, 0, 1, NetworkItem(1, 2, 2, 0))
+        ctx.location_checks[0, 1] |= {3, 4}
+        ctx.journal("location_checks", (0, 1))
+        ctx.stored_data["key"] = [1, 2]
+        ctx.journal("stored_data", "key")
+        ctx.name_aliases[0, 1] = "alias"
+        ctx.journal("name_aliases", (0, 1))
+
+    def assertSameSave(self, expected: Context, actual: Context) -> None:
+        expected_save, actual_save = expected.get_save(), actual.get_save()
+        for section in ("received_items", "location_checks", "stored_data", "name_aliases", "hints_used"):
+            self.assertEqual(expected_save[section], actual_save[section], section)
+
+    def test_replay(self) -> None:
+        """Tests changes after a full save only get appended to the journal and come back when loading"""
+        self.assertTrue(self.ctx._save())
+        with open(self.save_filename, "rb") as f:
+            snapshot = f.read()
+        self.ctx.snapshot_size = 2 ** 20
+        self.change(self.ctx)
+        self.assertTrue(self.ctx._save())
+        del self.ctx.name_aliases[0, 1]
+        self.ctx.journal("name_aliases", (0, 1))
+        self.ctx.hints_used[0, 1] += 1
+        self.ctx.journal("hints_used", (0, 1))
+        self.assertTrue(self.ctx._save())
+        with open(self.save_filename, "rb") as f:
+            self.assertEqual(snapshot, f.read())
+        self.assertSameSave(self.ctx, self.new_context())
+
+    def test_partial_record(self) -> None:
+        """Tests a record cut off by a crash is ignored along with everything after it"""
+        self.ctx._save()
+        self.ctx.snapshot_size = 2 ** 20
+        self.change(self.ctx)
+        self.ctx._save()
+        expected = self.new_context()
+        self.ctx.hints_used[0, 1] += 1
+        self.ctx.journal("hints_used", (0, 1))
+        self.ctx._save()
+        with open(self.ctx.journal_filename, "r+b") as f:
+            f.truncate(os.path.getsize(self.ctx.journal_filename) - 1)
+        self.assertSameSave(expected, self.new_context())
+
+    def test_compaction(self) -> None:
+        """Tests a full save gets written once the journal is as big as the last one, starting a new journal"""
+        self.ctx._save()
+        self.ctx.snapshot_size = 1
+        self.change(self.ctx)
+        self.ctx._save()
+        self.assertEqual(1, self.ctx.journal_generation)
+        self.ctx._save()
+        self.assertEqual(2, self.ctx.journal_generation)
+        self.assertEqual(0, self.ctx.journal_size)
+        send_items_to(self.ctx, 0, 1, NetworkItem(5, 6, 2, 0))
+        self.ctx._save()
+        loaded = self.new_context()
+        self.assertSameSave(self.ctx, loaded)
+        self.assertEqual(2, len(loaded.received_items[0, 1, False]))
+
+    def test_replay_is_idempotent(self) -> None:
+        """Tests journaled items that also made it into the full save aren't received twice"""
+        item = NetworkItem(1, 2, 2, 0)
+        save = {"received_items": {(0, 1, True): [item]}}
+        apply_save_journal(save, [[("extend", "received_items", (0, 1, True), 0, [item])],
+                                  [("extend", "received_items", (0, 1, True), 1, [item])]])
+        self.assertEqual([item, item], save["received_items"][0, 1, True])
+
+
+class TestFoundHints(unittest.TestCase):
+    def setUp(self) -> None:
+        self.ctx = Context("", 0, "", "", 0, 0, False)
+        self.hints = [Hint(2, 1, 10, 100, False), Hint(1, 1, 11, 101, False), Hint(1, 2, 20, 102, False)]
+        for hint in self.hints:
+            self.ctx.add_hint(0, hint.finding_player, hint)
+            if hint.receiving_player != hint.finding_player:
+                self.ctx.add_hint(0, hint.receiving_player, hint)
+
+    def test_update_found_hints(self) -> None:
+        """Tests checking a location only marks the hints for that location as found, for both players holding it"""
+        self.ctx.location_checks[0, 1] |= {10, 12}
+        self.assertEqual({1, 2}, self.ctx.update_found_hints(0, 1, {10, 12}))
+        found = self.hints[0]._replace(found=True)
+        self.assertEqual({found, self.hints[1], self.hints[2]}, self.ctx.hints[0, 1])
+        self.assertEqual({found, self.hints[2]}, self.ctx.hints[0, 2])
+        self.assertEqual(set(), self.ctx.update_found_hints(0, 1, {10}))
+        self.assertEqual({1}, self.ctx.update_found_hints(0, 1, {11}))
+
+    def test_matches_recheck(self) -> None:
+        """Tests hints updated per location end up the same as rechecking all of them"""
+        self.ctx.location_checks[0, 1] |= {11}
+        self.ctx.location_checks[0, 2] |= {20}
+        self.ctx.update_found_hints(0, 1, {11})
+        self.ctx.update_found_hints(0, 2, {20})
+        updated = {key: set(hints) for key, hints in self.ctx.hints.items()}
+        self.ctx.index_hints()
+        self.assertEqual(updated, self.ctx.hints)
+        self.assertEqual({(0, 1, 10)}, set(self.ctx.unfound_hints))
@@ -0,0 +1,41 @@
+import pickle
+import unittest
+
+from Utils import LazyDict
+
+
+class TestLazyDict(unittest.TestCase):
+    def setUp(self) -> None:
+        self.loaded = []
+        self.lazy = LazyDict({"a": 1})
+        self.lazy.load_key = self.load_key
+        self.lazy.load_all = self.load_all
+
+    def load_key(self, key: str) -> None:
+        self.loaded.append(key)
+        if key in {"b", "c"}:
+            dict.__setitem__(self.lazy, key, ord(key) - ord("a") + 1)
+
+    def load_all(self) -> None:
+        for key in ("b", "c"):
+            if not dict.__contains__(self.lazy, key):
+                self.load_key(key)
+
+    def test_single_keys(self) -> None:
+        """Tests looking up keys only loads those keys"""
+        self.assertEqual(1, self.lazy["a"])
+        self.assertEqual(2, self.lazy["b"])
+        self.assertIn("b", self.lazy)
+        self.assertNotIn("d", self.lazy)
+        self.assertIsNone(self.lazy.get("d"))
+        self.assertRaises(KeyError, lambda: self.lazy["d"])
+        self.assertEqual(["b", "d", "d", "d"], self.loaded)
+        self.assertEqual({"a": 1, "b": 2}, dict(dict.items(self.lazy)))
+
+    def test_whole(self) -> None:
+        """Tests looking at the dict as a whole loads everything"""
+        self.assertEqual(3, len(self.lazy))
+        self.assertEqual(["a", "b", "c"], list(self.lazy))
+        self.assertEqual({"a": 1, "b": 2, "c": 3}, self.lazy)
+        self.assertEqual({"a": 1, "b": 2, "c": 3}, pickle.loads(pickle.dumps(self.lazy)))
+        self.assertEqual(["b", "c"], self.loaded)
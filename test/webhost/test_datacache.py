@@ -0,0 +1,63 @@
+import pickle
+import unittest
+
+from . import TestBase
+
+
+class TestDecodedCache(unittest.TestCase):
+    def test_lru_eviction(self) -> None:
+        """Tests the least recently used entries get evicted once the cache is over its size, counting hits"""
+        from WebHostLib.datacache import DecodedCache
+
+        cache: DecodedCache[str] = DecodedCache("test", 10)
+        self.assertEqual("a", cache.get("a", lambda: ("a", 4)))
+        self.assertEqual("b", cache.get("b", lambda: ("b", 4)))
+        self.assertEqual("a", cache.get("a", lambda: ("not cached", 4)))
+        cache.get("c", lambda: ("c", 4))
+        self.assertEqual("b again", cache.get("b", lambda: ("b again", 4)))
+        self.assertEqual({"entries": 2, "size": 8, "max_size": 10, "hits": 1, "misses": 4, "evictions": 2},
+                         cache.get_stats())
+
+    def test_oversized(self) -> None:
+        """Tests an entry bigger than the whole cache is still kept until the next one"""
+        from WebHostLib.datacache import DecodedCache
+
+        cache: DecodedCache[str] = DecodedCache("test", 10)
+        cache.get("big", lambda: ("big", 20))
+        self.assertEqual("big", cache.get("big", lambda: ("not cached", 20)))
+        cache.get("small", lambda: ("small", 1))
+        self.assertEqual(1, cache.get_stats()["size"])
+
+    def test_estimate_size(self) -> None:
+        """Tests sizes count what containers hold once each, and the data lazily loaded sections keep"""
+        from NetUtils import MultidataSection
+        from WebHostLib.datacache import estimate_size
+
+        self.assertGreater(estimate_size({1: ["a" * 1000]}), 1000)
+        shared = "b" * 1000
+        self.assertLess(estimate_size([shared, shared]), 2000)
+        self.assertGreater(estimate_size({"section": MultidataSection(b"c" * 1000, {})}), 1000)
+
+
+class TestDataPackageCache(TestBase):
+    def test_get_data_package(self) -> None:
+        """Tests data packages are decoded once with their id to name lookups and missing ones aren't remembered"""
+        from pony.orm import db_session
+        from WebHostLib.datacache import data_package_cache, get_data_package
+        from WebHostLib.models import GameDataPackage
+
+        checksum = "test_get_data_package"
+        with db_session:
+            self.assertIsNone(get_data_package(checksum))
+            GameDataPackage(checksum=checksum, data=pickle.dumps({"item_name_to_id": {"Sword": 1},
+                                                                  "location_name_to_id": {"Chest": 2}}))
+        with db_session:
+            hits = data_package_cache.get_stats()["hits"]
+            data_package = get_data_package(checksum)
+            self.assertEqual("Sword", data_package.item_id_to_name[1])
+            self.assertEqual("Chest", data_package.location_id_to_name[2])
+            self.assertEqual("Unknown Item (ID: 3)", data_package.item_id_to_name[3])
+            self.assertNotIn(3, data_package.item_id_to_name)
+            self.assertIs(data_package, get_data_package(checksum))
+            self.assertEqual(hits + 1, data_package_cache.get_stats()["hits"])
+            GameDataPackage[checksum].delete()
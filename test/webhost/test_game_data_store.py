@@ -0,0 +1,63 @@
+import pickle
+import unittest
+
+
+def data_package(names: dict, checksum: str) -> dict:
+    return {"item_name_to_id": names, "location_name_to_id": {f"{name} Spot": code for name, code in names.items()},
+            "checksum": checksum}
+
+
+class TestGameDataStore(unittest.TestCase):
+    def setUp(self) -> None:
+        from WebHostLib.customserver import GameDataStore
+
+        self.store = GameDataStore({
+            "non_hintable_names": {},
+            "gamespackage": {"Archipelago": data_package({"Nothing": -1}, "ap"),
+                             "Game": data_package({"Sword": 1}, "static")},
+            "item_name_groups": {"Game": {"Weapons": {"Sword"}}},
+            "location_name_groups": {},
+        })
+        custom = data_package({"Shield": 2}, "custom")
+        custom["item_name_groups"] = {"Armor": {"Shield"}}
+        self.custom = pickle.dumps(custom)
+        self.loads = 0
+
+    def load(self) -> bytes:
+        self.loads += 1
+        return self.custom
+
+    def test_static(self) -> None:
+        """Tests static data packages are built once with the Archipelago names and never released"""
+        game_data = self.store.static_game("Game")
+        self.assertIs(game_data, self.store.static_game("Game"))
+        self.assertEqual({1: "Sword", -1: "Nothing"}, game_data.item_names)
+        self.assertEqual(frozenset({"Sword", "Weapons"}), game_data.all_item_and_group_names)
+        self.assertEqual("Unknown item (ID:5)", game_data.item_names[5])
+        self.store.release(game_data)
+        self.assertIs(game_data, self.store.static_game("Game"))
+        self.assertIsNone(self.store.static_game("Other"))
+
+    def test_custom_shared(self) -> None:
+        """Tests rooms with the same custom data package share it until the last of them releases it"""
+        first = self.store.acquire("Game", "custom", self.load)
+        second = self.store.acquire("Game", "custom", self.load)
+        self.assertIs(first, second)
+        self.assertEqual(1, self.loads)
+        self.assertNotIn("item_name_groups", first.package)
+        self.assertEqual({"Armor": {"Shield"}}, first.item_name_groups)
+        self.assertEqual(len(self.custom), self.store.get_stats()["custom_games_size"])
+        self.store.release(first)
+        self.assertIs(first, self.store.acquire("Game", "custom", self.load))
+        self.store.release(first)
+        self.store.release(second)
+        self.assertEqual(0, self.store.get_stats()["custom_games"])
+        self.store.acquire("Game", "custom", self.load)
+        self.assertEqual(2, self.loads)
+
+    def test_without_checksum(self) -> None:
+        """Tests data packages without a checksum are never shared"""
+        first = self.store.acquire("Game", None, self.load)
+        self.assertIsNot(first, self.store.acquire("Game", None, self.load))
+        self.store.release(first)
+        self.assertEqual(0, self.store.get_stats()["custom_games"])
@@ -117,6 +117,183 @@ class TestHostFakeRoom(TestBase):
             self.assertEqual(response.status_code, 206)
             self.assertEqual(response.get_data(True), text)
 
+    def test_dispatch_commands(self) -> None:
+        """Verify that commands of hosted rooms get handed to them in order and removed, leaving other rooms' alone."""
+        from types import SimpleNamespace
+        from unittest import mock
+        from pony.orm import db_session
+        from WebHostLib.customserver import DBCommandDispatcher
+        from WebHostLib.models import Command, Room
+
+        with db_session:
+            room = Room.get(id=self.room_id)
+            other_room = Room(seed=room.seed, owner=room.owner)
+            other_room_id = other_room.id
+            Command(room=room, commandtext="/first")
+            Command(room=other_room, commandtext="/other")
+            Command(room=room, commandtext="/second")
+
+        ctx = SimpleNamespace(main_loop=mock.Mock(), db_command_processor=mock.Mock())
+        dispatcher = DBCommandDispatcher({"provider": "sqlite"}, {self.room_id: ctx})
+        self.assertIsNone(dispatcher.listener.connection)
+        dispatcher.dispatch()
+        self.assertEqual([mock.call(ctx.db_command_processor, "/first"),
+                          mock.call(ctx.db_command_processor, "/second")],
+                         ctx.main_loop.call_soon_threadsafe.call_args_list)
+        with db_session:
+            self.assertEqual(0, Room.get(id=self.room_id).commands.count())
+            other_room = Room.get(id=other_room_id)
+            self.assertEqual(["/other"], [command.commandtext for command in other_room.commands])
+            other_room.delete()
+
+    def test_save_journal(self) -> None:
+        """Verify that saves of a hosted room append to its journal and loading the room's save applies it."""
+        import asyncio
+        import logging
+        from pony.orm import db_session
+        from NetUtils import NetworkItem
+        from WebHostLib.customserver import WebHostContext, load_room_save
+        from WebHostLib.models import Room
+
+        async def create_context() -> WebHostContext:
+            return WebHostContext({"non_hintable_names": {}}, logging.getLogger())
+
+        ctx = asyncio.run(create_context())
+        ctx.room_id = self.room_id
+        ctx.saving = True
+        self.assertTrue(ctx._save())
+        with db_session:
+            snapshot = Room.get(id=self.room_id).multisave
+        ctx.snapshot_size = 2 ** 20
+        ctx.received_items[0, 1, True] = [NetworkItem(1, 2, 2, 0)]
+        ctx.journal("received_items", (0, 1, True))
+        ctx.video[0, 1] = "Twitch", "user"
+        ctx.journal("video", (0, 1))
+        self.assertTrue(ctx._save())
+
+        with db_session:
+            room = Room.get(id=self.room_id)
+            self.assertEqual(snapshot, room.multisave)
+            self.assertEqual(1, room.multisave_journal.count())
+            save = load_room_save(room)
+        self.assertEqual([NetworkItem(1, 2, 2, 0)], save["received_items"][0, 1, True])
+        self.assertEqual((((0, 1), ("Twitch", "user")),), save["video"])
+
+        self.assertTrue(ctx._save(True))
+        with db_session:
+            room = Room.get(id=self.room_id)
+            self.assertEqual(0, room.multisave_journal.count())
+            self.assertEqual(save["received_items"], load_room_save(room)["received_items"])
+
+    def test_save_journal_failure(self) -> None:
+        """Verify that a failed save of a hosted room leaves the last save and its journal as they were."""
+        import asyncio
+        import logging
+        import pickle
+        from unittest import mock
+        from pony.orm import db_session
+        from NetUtils import NetworkItem
+        from WebHostLib.customserver import WebHostContext, load_room_save
+        from WebHostLib.models import Room, RoomJournal
+
+        async def create_context() -> WebHostContext:
+            return WebHostContext({"non_hintable_names": {}}, logging.getLogger())
+
+        ctx = asyncio.run(create_context())
+        ctx.room_id = self.room_id
+        ctx.saving = True
+        self.assertTrue(ctx._save())
+        ctx.snapshot_size = 2 ** 20
+        ctx.received_items[0, 1, True] = [NetworkItem(1, 2, 2, 0)]
+        ctx.journal("received_items", (0, 1, True))
+        self.assertTrue(ctx._save())
+        with db_session:
+            snapshot = Room.get(id=self.room_id).multisave
+
+        ctx.snapshot_size = 0
+        with mock.patch("WebHostLib.customserver.RoomJournal.select", side_effect=RuntimeError("failed")):
+            self.assertFalse(ctx._save())
+        with db_session:
+            room = Room.get(id=self.room_id)
+            self.assertEqual(snapshot, room.multisave)
+            self.assertEqual([NetworkItem(1, 2, 2, 0)], load_room_save(room)["received_items"][0, 1, True])
+
+        self.assertTrue(ctx._save())
+        with db_session:
+            room = Room.get(id=self.room_id)
+            # journal rows of an earlier generation are never applied to a newer save
+            RoomJournal(room=room, generation=ctx.journal_generation - 1, data=pickle.dumps(
+                [("extend", "received_items", (0, 1, True), 1, [NetworkItem(1, 2, 2, 0)])]))
+        with db_session:
+            self.assertEqual([NetworkItem(1, 2, 2, 0)],
+                             load_room_save(Room.get(id=self.room_id))["received_items"][0, 1, True])
+
+    def test_tracker_snapshot(self) -> None:
+        """Verify that saves of a hosted room publish what trackers show, which is read instead of the save."""
+        import asyncio
+        import logging
+        from pony.orm import db_session
+        from NetUtils import NetworkItem
+        from WebHostLib.customserver import WebHostContext, load_tracker_snapshot
+        from WebHostLib.models import Room
+
+        async def create_context() -> WebHostContext:
+            return WebHostContext({"non_hintable_names": {}}, logging.getLogger())
+
+        ctx = asyncio.run(create_context())
+        ctx.room_id = self.room_id
+        ctx.saving = True
+        ctx.received_items[0, 1, True] = [NetworkItem(1, 2, 2, 0)]
+        ctx.received_items[0, 1, False] = [NetworkItem(1, 2, 2, 0)]
+        with db_session:
+            self.assertEqual({}, load_tracker_snapshot(Room.get(id=self.room_id)))
+        self.assertTrue(ctx._save())
+        ctx.location_checks[0, 2] = {2}
+        ctx.journal("location_checks", (0, 2))
+        self.assertTrue(ctx._save())
+
+        with db_session:
+            room = Room.get(id=self.room_id)
+            self.assertEqual(2, room.tracker_snapshot.version)
+            snapshot = load_tracker_snapshot(room)
+        self.assertEqual({(0, 1, True): [NetworkItem(1, 2, 2, 0)]}, snapshot["received_items"])
+        self.assertEqual({2}, snapshot["location_checks"][0, 2])
+        self.assertNotIn("stored_data", snapshot)
+
+    def test_tracker_snapshot_failure(self) -> None:
+        """Verify that a tracker snapshot failing to publish doesn't fail the save and trackers read the save instead."""
+        import asyncio
+        import logging
+        from unittest import mock
+        from pony.orm import db_session
+        from WebHostLib.customserver import WebHostContext, load_tracker_snapshot
+        from WebHostLib.models import Room
+
+        async def create_context() -> WebHostContext:
+            return WebHostContext({"non_hintable_names": {}}, logging.getLogger())
+
+        ctx = asyncio.run(create_context())
+        ctx.room_id = self.room_id
+        ctx.saving = True
+        self.assertTrue(ctx._save())
+        ctx.snapshot_size = 2 ** 20
+        ctx.location_checks[0, 2] = {2}
+        ctx.journal("location_checks", (0, 2))
+        with mock.patch.object(ctx, "get_tracker_snapshot", side_effect=RuntimeError("changed during iteration")):
+            self.assertTrue(ctx._save(True))
+        with db_session:
+            room = Room.get(id=self.room_id)
+            self.assertIsNone(room.tracker_snapshot)
+            self.assertEqual({2}, dict(load_tracker_snapshot(room)["location_checks"])[0, 2])
+
+        ctx.location_checks[0, 2] = {2, 3}
+        ctx.journal("location_checks", (0, 2))
+        self.assertTrue(ctx._save())
+        with db_session:
+            room = Room.get(id=self.room_id)
+            self.assertEqual(ctx.journal_generation, room.tracker_snapshot.generation)
+            self.assertEqual({2, 3}, load_tracker_snapshot(room)["location_checks"][0, 2])
+
     def test_host_room_missing(self) -> None:
         """Verify that missing room gives a 404 response."""
         missing_room_id = uuid5(uuid4(), "")  # rooms are always uuid4, so this can't exist
@@ -0,0 +1,116 @@
+import unittest
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from . import TestBase
+
+
+class TestRoomSchedule(TestBase):
+    def setUp(self) -> None:
+        from pony.orm import db_session
+        from WebHostLib.autolauncher import RoomSchedule
+        from WebHostLib.models import Room, Seed
+
+        super().setUp()
+        with db_session:
+            self.seed = Seed(multidata=b"", owner=uuid4())
+            self.seed_id = self.seed.id
+            self.room_id = Room(seed=self.seed, owner=self.seed.owner, timeout=60).id
+        self.schedule = RoomSchedule()
+
+    def tearDown(self) -> None:
+        from pony.orm import db_session
+        from WebHostLib.models import Seed
+
+        with db_session:
+            seed = Seed.get(id=self.seed_id)
+            for room in seed.rooms:
+                room.delete()
+            seed.delete()
+
+    def set_last_activity(self, last_activity: datetime) -> None:
+        from pony.orm import db_session
+        from WebHostLib.models import Room
+
+        with db_session:
+            Room.get(id=self.room_id).last_activity = last_activity
+
+    def test_new_activity(self) -> None:
+        """Tests rooms are only returned again once they have new activity"""
+        self.assertIn(self.room_id, [room_id for room_id, _ in self.schedule.refresh()])
+        self.assertIn(self.room_id, self.schedule.deadlines)
+        self.assertEqual([], self.schedule.refresh())
+        self.set_last_activity(datetime.utcnow())
+        self.assertEqual([self.room_id], [room_id for room_id, _ in self.schedule.refresh()])
+
+    def test_shut_down(self) -> None:
+        """Tests rooms that shut down only get hosted again if they had new activity since"""
+        self.schedule.refresh()
+        self.set_last_activity(datetime.utcnow() - timedelta(minutes=1, seconds=60))
+        self.assertEqual([], self.schedule.refresh())
+        self.assertFalse(self.schedule.check_shut_down(self.room_id))
+        self.assertNotIn(self.room_id, self.schedule.deadlines)
+        self.set_last_activity(datetime.utcnow())
+        self.assertTrue(self.schedule.check_shut_down(self.room_id))
+
+    def test_expire(self) -> None:
+        """Tests rooms drop out of the schedule once they time out, and stay in it for as long as they are active"""
+        self.schedule.refresh()
+        deadline = self.schedule.deadlines[self.room_id]
+        self.schedule.expire(deadline - timedelta(seconds=1))
+        self.assertIn(self.room_id, self.schedule.deadlines)
+        self.set_last_activity(datetime.utcnow() + timedelta(minutes=5))
+        self.schedule.refresh()
+        self.schedule.expire(deadline + timedelta(seconds=1))
+        self.assertIn(self.room_id, self.schedule.deadlines)
+        self.schedule.expire(self.schedule.deadlines[self.room_id] + timedelta(seconds=1))
+        self.assertNotIn(self.room_id, self.schedule.deadlines)
+
+
+class TestRoomPlacement(unittest.TestCase):
+    def setUp(self) -> None:
+        from WebHostLib.autolauncher import MultiworldInstance
+
+        config = {"PONY": {}, "SELFLAUNCHCERT": None, "SELFLAUNCHKEY": None, "HOST_ADDRESS": ""}
+        self.hosters = [MultiworldInstance(config, x) for x in range(3)]
+
+    def report(self, hoster, time: float, cpu_time: float, clients: int = 0, memory: int = 0) -> None:
+        hoster.record_stats({"time": time, "cpu_time": cpu_time, "memory": memory, "game_data": {},
+                             "rooms": {uuid4(): {"clients": clients, "memory": 0}}})
+
+    def test_least_loaded(self) -> None:
+        """Tests rooms go to the hoster using the least CPU time, and rooms already hosted are left where they are"""
+        from WebHostLib.autolauncher import place_room
+
+        for hoster, cpu_time in zip(self.hosters, (5., 1., 3.)):
+            self.report(hoster, 0., 0.)
+            self.report(hoster, 10., cpu_time)
+        self.assertAlmostEqual(0.1, self.hosters[1].cpu_load)
+        room_id = uuid4()
+        self.assertTrue(place_room(self.hosters, room_id))
+        self.assertIn(room_id, self.hosters[1].room_ids)
+        self.assertFalse(place_room(self.hosters, room_id))
+        self.assertEqual([set(), {room_id}, set()], [hoster.room_ids for hoster in self.hosters])
+
+    def test_spread(self) -> None:
+        """Tests rooms placed before the hosters report again, or onto idle hosters, spread out"""
+        from WebHostLib.autolauncher import place_room
+
+        for _ in range(6):
+            place_room(self.hosters, uuid4())
+        self.assertEqual([2, 2, 2], [len(hoster.room_ids) for hoster in self.hosters])
+        self.report(self.hosters[0], 0., 0., clients=10)
+        place_room(self.hosters, uuid4())
+        place_room(self.hosters, uuid4())
+        self.assertEqual([2, 3, 3], [len(hoster.room_ids) for hoster in self.hosters])
+
+    def test_memory(self) -> None:
+        """Tests rooms go to the hoster using the least memory when they use about as much CPU time"""
+        from WebHostLib.autolauncher import place_room
+
+        for hoster, memory in zip(self.hosters, (2 ** 30, 2 ** 28, 2 ** 31)):
+            self.report(hoster, 0., 0.)
+            self.report(hoster, 10., 0.1, memory=memory)
+        room_id = uuid4()
+        place_room(self.hosters, room_id)
+        self.assertIn(room_id, self.hosters[1].room_ids)
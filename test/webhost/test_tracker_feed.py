@@ -0,0 +1,121 @@
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+from uuid import uuid4
+
+from flask import url_for
+
+from NetUtils import ClientStatus, Hint, NetworkItem, NetworkSlot, SlotType
+from . import TestBase
+
+
+class TestTrackerDelta(unittest.TestCase):
+    previous = {
+        "location_checks": {(0, 1): {10}},
+        "received_items": {(0, 1, True): [NetworkItem(100, 20, 2, 0)]},
+        "client_game_state": {(0, 1): ClientStatus.CLIENT_PLAYING, (0, 2): ClientStatus.CLIENT_PLAYING},
+        "hints": {(0, 1): {Hint(1, 2, 20, 101, False)}, (0, 2): {Hint(1, 2, 20, 101, False)}},
+        "client_activity_timers": (((0, 1), 1000.0), ((0, 2), 1000.0)),
+    }
+    current = {
+        "location_checks": {(0, 1): {10, 11}},
+        "received_items": {(0, 1, True): [NetworkItem(100, 20, 2, 0), NetworkItem(101, 20, 2, 0)]},
+        "client_game_state": {(0, 1): ClientStatus.CLIENT_GOAL, (0, 2): ClientStatus.CLIENT_PLAYING},
+        "hints": {(0, 1): {Hint(1, 2, 20, 101, True)}, (0, 2): {Hint(1, 2, 20, 101, True)}},
+        "client_activity_timers": (((0, 1), 2000.0), ((0, 2), 1000.0)),
+    }
+
+    def get_tracker_data(self, snapshot: dict, version: int = 0):
+        from WebHostLib.tracker import TrackerData
+
+        tracker_data = TrackerData.__new__(TrackerData)
+        tracker_data._multidata = {"slot_info": {1: NetworkSlot("Player1", "Game", SlotType.player),
+                                                 2: NetworkSlot("Player2", "Game", SlotType.player)}}
+        tracker_data._multisave = snapshot
+        tracker_data._tracker_version = version
+        tracker_data._tracker_cache = {}
+        tracker_data.item_id_to_name = {"Game": {100: "Sword", 101: "Shield"}}
+        tracker_data.location_id_to_name = {"Game": {10: "Chest", 11: "Pot", 20: "Tree"}}
+        return tracker_data
+
+    def test_delta(self) -> None:
+        """Tests only what changed is in the delta, with names resolved"""
+        from WebHostLib.trackerfeed import get_tracker_delta
+
+        delta = get_tracker_delta(self.get_tracker_data(self.current), self.previous)
+        self.assertEqual(["0-1"], list(delta["players"]))
+        changes = delta["players"]["0-1"]
+        self.assertEqual(["Pot"], changes["checks"])
+        self.assertEqual(2, changes["checked"])
+        self.assertEqual([{"item": "Shield", "sender": "Player2"}], changes["items"])
+        self.assertEqual(ClientStatus.CLIENT_GOAL, changes["status"])
+        self.assertIn("activity", changes)
+        self.assertEqual({"0-2-20": {"finder": "Player2", "receiver": "Player1", "item": "Shield", "location": "Tree",
+                                     "game": "Game", "receiver_game": "Game", "entrance": "Vanilla", "found": True}},
+                         delta["hints"])
+
+    def test_no_changes(self) -> None:
+        """Tests the delta of a snapshot to itself is empty"""
+        from WebHostLib.trackerfeed import get_tracker_delta
+
+        self.assertEqual({"players": {}, "hints": {}},
+                         get_tracker_delta(self.get_tracker_data(self.current), self.current))
+
+    def test_updates(self) -> None:
+        """Tests trackers get nothing at the current version, deltas from the previous one, and only the version from
+        older ones, with rooms loaded once per version"""
+        from WebHostLib.trackerfeed import TrackerFeed
+
+        tracker = uuid4()
+        room = SimpleNamespace(tracker_snapshot=SimpleNamespace(version=1))
+        snapshots = {1: self.previous, 2: self.current}
+        tracker_feed = TrackerFeed(1)
+        with mock.patch("WebHostLib.trackerfeed.Room.get", return_value=room) as loads, \
+                mock.patch("WebHostLib.trackerfeed.TrackerData",
+                           side_effect=lambda room: self.get_tracker_data(snapshots[room.tracker_snapshot.version],
+                                                                          room.tracker_snapshot.version)):
+            self.assertIsNone(tracker_feed.get_update(tracker, 1, 1))
+            self.assertEqual(0, loads.call_count)
+            self.assertEqual({"version": 1}, tracker_feed.get_update(tracker, 0, 1))
+            room.tracker_snapshot.version = 2
+            update = tracker_feed.get_update(tracker, 1, 2)
+            self.assertEqual((2, 1), (update["version"], update["previous"]))
+            self.assertEqual(["0-1"], list(update["players"]))
+            self.assertIs(update, tracker_feed.get_update(tracker, 1, 2))
+            self.assertEqual({"version": 2}, tracker_feed.get_update(tracker, 0, 2))
+            # from a cached version older than what the tracker got to
+            self.assertIsNone(tracker_feed.get_update(tracker, 2, 1))
+            self.assertIs(update, tracker_feed.get_update(tracker, 1, 1))
+            self.assertEqual(2, loads.call_count)
+
+
+class TestTrackerFeedRoute(TestBase):
+    def test_cached_version(self) -> None:
+        """Tests trackers at the current version get nothing, with the version looked up once per interval"""
+        from pony.orm import db_session
+        from WebHostLib.models import Room, Seed
+
+        with db_session:
+            seed = Seed(multidata=b"", owner=uuid4())
+            room = Room(seed=seed, owner=seed.owner, tracker=uuid4())
+            tracker = room.tracker
+        self.addCleanup(self.delete_seed, seed.id)
+        with self.app.app_context(), self.app.test_request_context(), \
+                mock.patch("WebHostLib.trackerfeed.Room.get", wraps=Room.get) as lookups:
+            url = url_for("get_multiworld_tracker_feed", tracker=tracker, version=0)
+            self.assertEqual(204, self.client.get(url).status_code)
+            self.assertEqual(204, self.client.get(url).status_code)
+            self.assertEqual(1, lookups.call_count)
+            response = self.client.get(url_for("get_multiworld_tracker_feed", tracker=uuid4()))
+            self.assertEqual(404, response.status_code)
+
+    @staticmethod
+    def delete_seed(seed_id) -> None:
+        from pony.orm import db_session
+        from WebHostLib.models import Seed
+
+        with db_session:
+            seed = Seed.get(id=seed_id)
+            for room in seed.rooms:
+                room.delete()
+            seed.delete()
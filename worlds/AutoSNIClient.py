@@ -59,6 +59,10 @@ class AutoSNIClientRegister(abc.ABCMeta):
 
     @staticmethod
     async def get_handler(ctx: SNIContext) -> Optional[SNIClient]:
+        # clients register when their world gets imported
+        from worlds import load_all_worlds
+        load_all_worlds()
+
         for _game, handler in AutoSNIClientRegister.game_handlers.items():
             if await handler.validate_rom(ctx):
                 return handler
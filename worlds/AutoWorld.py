@@ -12,6 +12,7 @@ from typing import (Any, Callable, ClassVar, Dict, FrozenSet, List, Mapping, Opt
 
 from Options import item_and_loc_options, OptionGroup, PerGameCommonOptions
 from BaseClasses import CollectionState
+from Utils import LazyDict
 
 if TYPE_CHECKING:
     from BaseClasses import MultiWorld, Item, Location, Tutorial, Region, Entrance
@@ -22,7 +23,8 @@ perf_logger = logging.getLogger("performance")
 
 
 class AutoWorldRegister(type):
-    world_types: Dict[str, Type[World]] = {}
+    world_types: Dict[str, Type[World]] = LazyDict()
+    """all registered worlds by game, worlds get imported by the worlds package when their game is first asked for"""
     __file__: str
     zip_path: Optional[str]
     settings_key: str
@@ -48,6 +50,7 @@ class AutoWorldRegister(type):
 
         # build rest
         dct["item_names"] = frozenset(dct["item_name_to_id"])
+        dct["item_name_to_index"] = {name: index for index, name in enumerate(dct["item_name_to_id"])}
         dct["item_name_groups"] = {group_name: frozenset(group_set) for group_name, group_set
                                    in dct.get("item_name_groups", {}).items()}
         dct["item_name_groups"]["Everything"] = dct["item_names"]
@@ -149,6 +152,8 @@ def _timed_call(method: Callable[..., Any], *args: Any,
     start = time.perf_counter()
     ret = method(*args)
     taken = time.perf_counter() - start
+    if multiworld and multiworld.profiler:
+        multiworld.profiler.add_call(method, player, taken)
     if taken > 1.0:
         if player and multiworld:
             perf_logger.info(f"Took {taken:.4f} seconds in {method.__qualname__} for player {player}, "
@@ -195,7 +200,7 @@ def call_stage(multiworld: "MultiWorld", method_name: str, *args: Any) -> None:
     for world_type in sorted(world_types, key=lambda world: world.__name__):
         stage_callable = getattr(world_type, f"stage_{method_name}", None)
         if stage_callable:
-            _timed_call(stage_callable, multiworld, *args)
+            _timed_call(stage_callable, multiworld, *args, multiworld=multiworld)
 
 
 class WebWorld(metaclass=WebWorldRegister):
@@ -295,6 +300,11 @@ class World(metaclass=AutoWorldRegister):
     origin_region_name: str = "Menu"
     """Name of the Region from which accessibility is tested."""
 
+    interned_item_counts: ClassVar[bool] = False
+    """If True, this world's counts in CollectionState.prog_items are kept in an ItemCounter, which stores the
+    counts of item_name_to_index in an array that is cheaper to copy and lets compiled rules skip the name lookup.
+    Only enable this if the world and its rules treat prog_items as a Counter of names, not a plain dict."""
+
     explicit_indirect_conditions: bool = True
     """If True, the world implementation is supposed to use MultiWorld.register_indirect_condition() correctly.
     If False, everything is rechecked at every step, which is slower computationally, 
@@ -312,6 +322,8 @@ class World(metaclass=AutoWorldRegister):
 
     item_names: ClassVar[Set[str]]
     """set of all potential item names"""
+    item_name_to_index: ClassVar[Dict[str, int]]
+    """automatically generated dense index of each item name, for ItemCounter"""
     location_names: ClassVar[Set[str]]
     """set of all potential location names"""
 
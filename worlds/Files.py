@@ -33,6 +33,10 @@ class AutoPatchRegister(abc.ABCMeta):
 
     @staticmethod
     def get_handler(file: str) -> Optional[AutoPatchRegister]:
+        # patch types register when their world gets imported
+        from worlds import load_all_worlds
+        load_all_worlds()
+
         for file_ending, handler in AutoPatchRegister.file_endings.items():
             if file.endswith(file_ending):
                 return handler
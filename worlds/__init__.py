@@ -1,15 +1,18 @@
 import importlib
 import importlib.util
+import json
 import logging
 import os
 import sys
+import threading
 import warnings
 import zipimport
 import time
 import dataclasses
-from typing import Dict, List, TypedDict
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple, TypedDict
 
-from Utils import local_path, user_path
+from Utils import (LazyDict, cache_path, load_data_package_for_checksum, local_path, store_data_package_for_checksum,
+                   user_path, version_tuple)
 
 local_folder = os.path.dirname(__file__)
 user_folder = user_path("worlds") if user_path() != local_path() else user_path("custom_worlds")
@@ -22,10 +25,15 @@ __all__ = {
     "network_data_package",
     "AutoWorldRegister",
     "world_sources",
+    "world_manifest",
+    "load_all_worlds",
+    "load_world_module",
+    "get_hint_blacklist",
     "local_folder",
     "user_folder",
     "GamesPackage",
     "DataPackage",
+    "GameInfo",
     "failed_world_loads",
 }
 
@@ -45,6 +53,22 @@ class DataPackage(TypedDict):
     games: Dict[str, GamesPackage]
 
 
+class GameInfo(TypedDict):
+    """What the manifest knows about a game without importing its world."""
+    hidden: bool
+    item_count: int
+    location_count: int
+    item_ids: Optional[List[int]]
+    """lowest and highest item id"""
+    location_ids: Optional[List[int]]
+    checksum: str
+    """checksum of the data package, which is kept in the data package cache"""
+    hint_blacklist: List[str]
+    settings_key: str
+    settings: Optional[str]
+    """module.Class of the world, if it has settings"""
+
+
 @dataclasses.dataclass(order=True)
 class WorldSource:
     path: str  # typically relative path from this module
@@ -61,6 +85,32 @@ class WorldSource:
             return os.path.join(local_folder, self.path)
         return self.path
 
+    @property
+    def module_name(self) -> str:
+        """name of the module below worlds this source gets imported as"""
+        return os.path.basename(self.path).rsplit(".", 1)[0]
+
+    @property
+    def loaded(self) -> bool:
+        return f"worlds.{self.module_name}" in sys.modules
+
+    def fingerprint(self) -> List[int]:
+        """Changes whenever a file of the source changes, to tell if the manifest still describes it."""
+        path = self.resolved_path
+        if self.is_zip:
+            stat = os.stat(path)
+            return [1, stat.st_size, stat.st_mtime_ns]
+        files = size = latest = 0
+        for folder, folders, file_names in os.walk(path):
+            # compiling the world must not change its fingerprint
+            folders[:] = [name for name in folders if name != "__pycache__"]
+            for file_name in file_names:
+                stat = os.stat(os.path.join(folder, file_name))
+                files += 1
+                size += stat.st_size
+                latest = max(latest, stat.st_mtime_ns)
+        return [files, size, latest]
+
     def load(self) -> bool:
         try:
             start = time.perf_counter()
@@ -122,15 +172,198 @@ for folder in (folder for folder in (user_folder, local_folder) if folder):
             elif entry.is_file() and entry.name.endswith(".apworld"):
                 world_sources.append(WorldSource(file_name, is_zip=True, relative=relative))
 
-# import all submodules to trigger AutoWorldRegister
 world_sources.sort()
-for world_source in world_sources:
-    world_source.load()
 
 # Build the data package for each game.
 from .AutoWorld import AutoWorldRegister
 
 network_data_package: DataPackage = {
-    "games": {world_name: world.get_data_package_data() for world_name, world in AutoWorldRegister.world_types.items()},
+    "games": LazyDict(),
 }
 
+# The manifest describes the games of each world source as of its last import, which lets a world only be imported
+# once its game is asked for. Sources that changed since, or that failed to import, get imported right away.
+# Data packages of the games in the manifest are kept in the data package cache and only built again with the manifest.
+manifest_path = cache_path("world_manifest.json")
+_manifest_format = 1
+world_manifest: Dict[str, GameInfo] = {}
+"""every known game, including those whose world has not been imported"""
+_game_sources: Dict[str, WorldSource] = {}
+_attempted_sources: Dict[str, bool] = {}
+_all_loaded = False
+_load_lock = threading.RLock()
+
+
+def _read_manifest() -> Dict[str, Any]:
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest["format"] == _manifest_format and manifest["version"] == list(version_tuple) and \
+                manifest["python"] == list(sys.version_info[:2]):
+            return manifest["sources"]
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logging.debug(f"Could not read world manifest: {e}")
+    return {}
+
+
+def _write_manifest(sources: Dict[str, Any]) -> None:
+    try:
+        os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+        temp_path = f"{manifest_path}.{os.getpid()}"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"format": _manifest_format, "version": list(version_tuple), "python": list(sys.version_info[:2]),
+                       "sources": sources}, f, separators=(",", ":"))
+        os.replace(temp_path, manifest_path)
+    except Exception as e:
+        logging.debug(f"Could not write world manifest: {e}")
+
+
+def _describe_game(game: str) -> GameInfo:
+    world = AutoWorldRegister.world_types[game]
+    data_package = network_data_package["games"][game]
+    # clients store the data packages servers send under the same checksum, which lack the name groups
+    if not _is_complete(load_data_package_for_checksum(game, data_package["checksum"])):
+        store_data_package_for_checksum(game, data_package, replace=True)
+    settings_annotation = world.__annotations__.get("settings", None)
+    has_settings = settings_annotation is not None and settings_annotation != "ClassVar[Optional['Group']]"
+    return {
+        "hidden": world.hidden,
+        "item_count": len(world.item_names),
+        "location_count": len(world.location_names),
+        "item_ids": [min(world.item_id_to_name), max(world.item_id_to_name)] if world.item_id_to_name else None,
+        "location_ids": [min(world.location_id_to_name), max(world.location_id_to_name)]
+        if world.location_id_to_name else None,
+        "checksum": data_package["checksum"],
+        "hint_blacklist": sorted(world.hint_blacklist),
+        "settings_key": world.settings_key,
+        "settings": f"{world.__module__}.{world.__name__}" if has_settings else None,
+    }
+
+
+def _source_games(source: WorldSource) -> List[str]:
+    prefix = f"worlds.{source.module_name}"
+    return [game for game, world in dict.items(AutoWorldRegister.world_types)
+            if world.__module__ == prefix or world.__module__.startswith(prefix + ".")]
+
+
+def _load_source(source: WorldSource) -> None:
+    with _load_lock:
+        if source.loaded or source.resolved_path in _attempted_sources:
+            return
+        _attempted_sources[source.resolved_path] = source.load()
+
+
+def _load_game(game: str) -> None:
+    source = _game_sources.get(game, None)
+    if source:
+        _load_source(source)
+
+
+def _is_complete(data_package: Dict[str, Any]) -> bool:
+    """Returns whether data_package has everything a world builds into it, and not just what servers send."""
+    return "item_name_groups" in data_package and "location_name_groups" in data_package
+
+
+def _load_data_package(game: str) -> None:
+    games = network_data_package["games"]
+    # a world that is imported already builds its own, to be sure it matches the world's current ids
+    if game in world_manifest and not dict.__contains__(AutoWorldRegister.world_types, game):
+        checksum = world_manifest[game]["checksum"]
+        data_package = load_data_package_for_checksum(game, checksum)
+        if data_package.get("checksum", None) == checksum and _is_complete(data_package):
+            dict.__setitem__(games, game, data_package)
+            return
+    world = AutoWorldRegister.world_types.get(game, None)
+    if world:
+        dict.__setitem__(games, game, world.get_data_package_data())
+
+
+def load_all_worlds() -> None:
+    """Imports every world that is not imported yet, for everything that needs to look at all of them."""
+    global _all_loaded
+    if _all_loaded:
+        return
+    with _load_lock:
+        for source in world_sources:
+            _load_source(source)
+        # keep the order the worlds would have had if all of them got imported up front
+        order = {f"worlds.{source.module_name}": index for index, source in enumerate(world_sources)}
+
+        def source_index(world_type: Tuple[str, Any]) -> int:
+            return order.get(".".join(world_type[1].__module__.split(".", 2)[:2]), len(order))
+
+        world_types = sorted(dict.items(AutoWorldRegister.world_types), key=source_index)
+        dict.clear(AutoWorldRegister.world_types)
+        dict.update(AutoWorldRegister.world_types, world_types)
+        _all_loaded = True
+
+
+def _load_all_data_packages() -> None:
+    games = network_data_package["games"]
+    # games outside the manifest are only there if their world got imported or registered otherwise
+    for game in [*world_manifest, *dict.keys(AutoWorldRegister.world_types)]:
+        if not dict.__contains__(games, game):
+            _load_data_package(game)
+    # in the order of the manifest, then anything else in the order it was added
+    packages = dict(dict.items(games))
+    dict.clear(games)
+    for game in world_manifest:
+        if game in packages:
+            dict.__setitem__(games, game, packages.pop(game))
+    dict.update(games, packages)
+
+
+def get_hint_blacklist(game: str) -> FrozenSet[str]:
+    """Returns the names that can't be hinted for in game, from the manifest if the game is in it."""
+    if game in world_manifest:
+        return frozenset(world_manifest[game]["hint_blacklist"])
+    return AutoWorldRegister.world_types[game].hint_blacklist
+
+
+def load_world_module(module_name: str) -> None:
+    """Imports the world source that provides module_name, like worlds.alttp.Options, if there is one."""
+    if module_name.startswith("worlds."):
+        top_module = module_name.split(".", 2)[1]
+        for source in world_sources:
+            if source.module_name == top_module:
+                _load_source(source)
+                return
+
+
+AutoWorldRegister.world_types.load_key = _load_game
+AutoWorldRegister.world_types.load_all = load_all_worlds
+network_data_package["games"].load_key = _load_data_package
+network_data_package["games"].load_all = _load_all_data_packages
+
+_manifest_sources = _read_manifest()
+_changed_sources = False
+for world_source in world_sources:
+    source_entry = _manifest_sources.get(world_source.resolved_path, None)
+    if source_entry and source_entry["module"] == world_source.module_name and \
+            source_entry["fingerprint"] == world_source.fingerprint():
+        continue
+    _load_source(world_source)
+    if _attempted_sources.get(world_source.resolved_path, world_source.loaded):
+        _changed_sources = True
+        _manifest_sources[world_source.resolved_path] = {
+            "module": world_source.module_name,
+            "fingerprint": world_source.fingerprint(),
+            "games": {game_name: _describe_game(game_name) for game_name in _source_games(world_source)},
+        }
+    elif _manifest_sources.pop(world_source.resolved_path, None):
+        # failed sources get retried each time, they might work again without changing
+        _changed_sources = True
+
+# drop sources that are gone
+_changed_sources |= not {world_source.resolved_path for world_source in world_sources}.issuperset(_manifest_sources)
+_manifest_sources = {world_source.resolved_path: _manifest_sources[world_source.resolved_path]
+                     for world_source in world_sources if world_source.resolved_path in _manifest_sources}
+for world_source in world_sources:
+    for game_name, game_info in _manifest_sources.get(world_source.resolved_path, {"games": {}})["games"].items():
+        if game_name not in _game_sources:
+            _game_sources[game_name] = world_source
+            world_manifest[game_name] = game_info
+if _changed_sources:
+    _write_manifest(_manifest_sources)
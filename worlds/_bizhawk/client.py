@@ -55,6 +55,10 @@ class AutoBizHawkClientRegister(abc.ABCMeta):
 
     @staticmethod
     async def get_handler(ctx: "BizHawkClientContext", system: str) -> Optional[BizHawkClient]:
+        # clients register when their world gets imported
+        from worlds import load_all_worlds
+        load_all_worlds()
+
         for systems, handlers in AutoBizHawkClientRegister.game_handlers.items():
             if system in systems:
                 for handler in handlers.values():
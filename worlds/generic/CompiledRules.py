@@ -0,0 +1,260 @@
+"""
+Declarative access rules, as an alternative to writing them as lambdas.
+
+A Rule describes what a spot needs in terms of has/has_all/has_any/count/group/can_reach and gets compiled for a
+player into a CompiledRule, which is a flat generated function that can be used as an access_rule and pickled.
+
+set_rule(location, Has("Sword") & (HasGroup("Bombs") | CanReach("Cave")))
+"""
+import dataclasses
+import functools
+import typing
+
+from BaseClasses import ItemCounter
+
+if typing.TYPE_CHECKING:
+    from BaseClasses import CollectionState
+    from worlds.AutoWorld import World
+
+
+class Rule:
+    """Base of all declarative rules. Combine rules with & and |."""
+
+    def __and__(self, other: "Rule") -> "Rule":
+        return And((self, other))
+
+    def __or__(self, other: "Rule") -> "Rule":
+        return Or((self, other))
+
+
+@dataclasses.dataclass(frozen=True)
+class Constant(Rule):
+    value: bool
+
+
+@dataclasses.dataclass(frozen=True)
+class Has(Rule):
+    item: str
+    count: int = 1
+
+
+@dataclasses.dataclass(frozen=True)
+class HasAll(Rule):
+    items: typing.Tuple[str, ...]
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "items", tuple(self.items))
+
+
+@dataclasses.dataclass(frozen=True)
+class HasAny(Rule):
+    items: typing.Tuple[str, ...]
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "items", tuple(self.items))
+
+
+@dataclasses.dataclass(frozen=True)
+class HasFromList(Rule):
+    """Needs count items total out of items, like CollectionState.has_from_list."""
+    items: typing.Tuple[str, ...]
+    count: int = 1
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "items", tuple(self.items))
+
+
+@dataclasses.dataclass(frozen=True)
+class HasGroup(Rule):
+    """Needs count items total out of an item_name_group, resolved when compiled."""
+    group: str
+    count: int = 1
+
+
+@dataclasses.dataclass(frozen=True)
+class CanReach(Rule):
+    """Needs a spot of the same player to be reachable, resolution_hint being Region, Location or Entrance."""
+    spot: str
+    resolution_hint: str = "Region"
+
+
+@dataclasses.dataclass(frozen=True)
+class And(Rule):
+    rules: typing.Tuple[Rule, ...]
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "rules", tuple(self.rules))
+
+
+@dataclasses.dataclass(frozen=True)
+class Or(Rule):
+    rules: typing.Tuple[Rule, ...]
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "rules", tuple(self.rules))
+
+
+def resolve(rule: Rule, world: typing.Optional["World"] = None) -> Rule:
+    """
+    Returns rule simplified into Constant, Has, HasAll, HasAny, HasFromList, CanReach, And and Or only.
+    Groups need the world they belong to, everything else resolves without one.
+    """
+    if isinstance(rule, HasGroup):
+        if world is None:
+            raise ValueError(f"Can't resolve {rule} without a world.")
+        return resolve(HasFromList(sorted(world.item_name_groups[rule.group]), rule.count))
+    if isinstance(rule, Has):
+        return Constant(True) if rule.count <= 0 else rule
+    if isinstance(rule, HasAll):
+        items = tuple(dict.fromkeys(rule.items))
+        return Constant(True) if not items else Has(items[0]) if len(items) == 1 else HasAll(items)
+    if isinstance(rule, HasAny):
+        items = tuple(dict.fromkeys(rule.items))
+        return Constant(False) if not items else Has(items[0]) if len(items) == 1 else HasAny(items)
+    if isinstance(rule, HasFromList):
+        if rule.count <= 0:
+            return Constant(True)
+        if len(rule.items) == 1:
+            return Has(rule.items[0], rule.count)
+        return rule if rule.items else Constant(False)
+    if isinstance(rule, (And, Or)):
+        is_and = isinstance(rule, And)
+        rules: typing.List[Rule] = []
+        # Has(item) is merged into a single HasAll or HasAny, depending on the operator
+        items: typing.Dict[str, None] = {}
+        merged_type = HasAll if is_and else HasAny
+        for child in rule.rules:
+            child = resolve(child, world)
+            children = child.rules if type(child) is type(rule) else (child,)
+            for flat_child in children:
+                if isinstance(flat_child, Constant):
+                    if bool(flat_child.value) == is_and:
+                        continue
+                    return flat_child
+                if isinstance(flat_child, Has) and flat_child.count == 1:
+                    items[flat_child.item] = None
+                elif isinstance(flat_child, merged_type):
+                    items.update(dict.fromkeys(flat_child.items))
+                elif flat_child not in rules:
+                    rules.append(flat_child)
+        if items:
+            rules.insert(0, resolve(merged_type(tuple(items))))
+        if not rules:
+            return Constant(is_and)
+        if len(rules) == 1:
+            return rules[0]
+        return type(rule)(tuple(rules))
+    if isinstance(rule, (Constant, CanReach)):
+        return rule
+    raise TypeError(f"Unknown rule {rule!r}.")
+
+
+def _expression(rule: Rule, count: typing.Callable[[str], str], constant: typing.Callable[[object], str],
+                player: str) -> str:
+    """Returns python source for a resolved rule. count returns the source for the count of an item name,
+    constant returns the name a value is made available as and player is the source for the player."""
+    if isinstance(rule, Constant):
+        return repr(bool(rule.value))
+    if isinstance(rule, Has):
+        return f"{count(rule.item)} >= {int(rule.count)}"
+    if isinstance(rule, HasAll):
+        return "(" + " and ".join(f"{count(item)} > 0" for item in rule.items) + ")"
+    if isinstance(rule, HasAny):
+        return "(" + " or ".join(f"{count(item)} > 0" for item in rule.items) + ")"
+    if isinstance(rule, HasFromList):
+        return "(" + " + ".join(count(item) for item in rule.items) + f" >= {int(rule.count)})"
+    if isinstance(rule, CanReach):
+        return f"state.can_reach({constant(rule.spot)}, {constant(rule.resolution_hint)}, {player})"
+    if isinstance(rule, And):
+        return "(" + " and ".join(_expression(child, count, constant, player) for child in rule.rules) + ")"
+    if isinstance(rule, Or):
+        return "(" + " or ".join(_expression(child, count, constant, player) for child in rule.rules) + ")"
+    raise TypeError(f"Can't compile {rule!r}, resolve it first.")
+
+
+class _Namespace:
+    """Collects the values generated source refers to, so no value ever ends up in the source itself."""
+
+    def __init__(self) -> None:
+        self.values: typing.Dict[str, object] = {}
+        self.names: typing.Dict[typing.Tuple[type, object], str] = {}
+
+    def __call__(self, value: object) -> str:
+        key = (type(value), value)
+        name = self.names.get(key, None)
+        if name is None:
+            name = self.names[key] = f"_{len(self.names)}"
+            self.values[name] = value
+        return name
+
+    def function(self, name: str, source: str) -> typing.Callable:
+        exec(compile(source, f"<{name}>", "exec"), self.values)
+        return self.values[name]
+
+
+def _uses_items(rule: Rule) -> bool:
+    if isinstance(rule, (And, Or)):
+        return any(_uses_items(child) for child in rule.rules)
+    return not isinstance(rule, (Constant, CanReach))
+
+
+class CompiledRule:
+    """
+    A resolved Rule for a single player, callable with a CollectionState like any other access rule.
+    With the item_name_to_index of an interned world, counts of an ItemCounter get read by position.
+    """
+    __slots__ = ("rule", "player", "index", "function")
+
+    rule: Rule
+    player: int
+    index: typing.Optional[typing.Mapping[str, int]]
+    function: typing.Callable[["CollectionState"], bool]
+
+    def __init__(self, rule: Rule, player: int, index: typing.Optional[typing.Mapping[str, int]] = None) -> None:
+        self.rule = resolve(rule)
+        self.player = player
+        self.index = index
+        namespace = _Namespace()
+        player_name = namespace(player)
+        expression = _expression(self.rule, lambda item: f"items[{namespace(item)}]", namespace, player_name)
+        # the item counts only get looked up if the rule needs them
+        if not _uses_items(self.rule):
+            source = f"def rule(state):\n    return {expression}\n"
+        elif index is None:
+            source = f"def rule(state):\n    items = state.prog_items[{player_name}]\n    return {expression}\n"
+        else:
+            interned_expression = _expression(self.rule, functools.partial(_count_source, index, namespace),
+                                              namespace, player_name)
+            source = (f"def rule(state):\n"
+                      f"    items = state.prog_items[{player_name}]\n"
+                      f"    if items.__class__ is {namespace(ItemCounter)}:\n"
+                      f"        counts = items.counts\n"
+                      f"        return {interned_expression}\n"
+                      f"    return {expression}\n")
+        self.function = namespace.function("rule", source)
+
+    def __call__(self, state: "CollectionState") -> bool:
+        return self.function(state)
+
+    def __reduce__(self) -> typing.Tuple[type, typing.Tuple[Rule, int]]:
+        # the index belongs to the world, region sweep workers get item counts by name, see BaseClasses.RegionSweeper
+        return CompiledRule, (self.rule, self.player)
+
+    def combine(self, other: "CompiledRule", combine: str = "and") -> "CompiledRule":
+        assert self.player == other.player, "can't combine rules of different players"
+        return CompiledRule(And((self.rule, other.rule)) if combine == "and" else Or((self.rule, other.rule)),
+                            self.player, self.index)
+
+    def __repr__(self) -> str:
+        return f"CompiledRule({self.rule!r}, {self.player})"
+
+
+def _count_source(index: typing.Mapping[str, int], namespace: _Namespace, item: str) -> str:
+    position = index.get(item, None)
+    return f"items[{namespace(item)}]" if position is None else f"counts[{position}]"
+
+
+def compile_rule(rule: Rule, world: "World") -> CompiledRule:
+    return CompiledRule(resolve(rule, world), world.player,
+                        world.item_name_to_index if world.interned_item_counts else None)
+
@@ -3,6 +3,7 @@ import logging
 import typing
 
 from BaseClasses import LocationProgressType, MultiWorld, Location, Region, Entrance
+from .CompiledRules import CompiledRule, Rule, compile_rule
 
 if typing.TYPE_CHECKING:
     import BaseClasses
@@ -96,15 +97,28 @@ def exclusion_rules(multiworld: MultiWorld, player: int, exclude_locations: typi
                 logging.warning(f"Unable to exclude location {loc_name} in player {player}'s world.")
 
 
-def set_rule(spot: typing.Union["BaseClasses.Location", "BaseClasses.Entrance"], rule: CollectionRule):
-    spot.access_rule = rule
+def _compile_for(spot: typing.Union["BaseClasses.Location", "BaseClasses.Entrance"],
+                 rule: typing.Union[CollectionRule, Rule]) -> CollectionRule:
+    if isinstance(rule, Rule):
+        return compile_rule(rule, spot.parent_region.multiworld.worlds[spot.player])
+    return rule
 
 
-def add_rule(spot: typing.Union["BaseClasses.Location", "BaseClasses.Entrance"], rule: CollectionRule, combine="and"):
+def set_rule(spot: typing.Union["BaseClasses.Location", "BaseClasses.Entrance"],
+             rule: typing.Union[CollectionRule, Rule]):
+    spot.access_rule = _compile_for(spot, rule)
+
+
+def add_rule(spot: typing.Union["BaseClasses.Location", "BaseClasses.Entrance"],
+             rule: typing.Union[CollectionRule, Rule], combine="and"):
+    rule = _compile_for(spot, rule)
     old_rule = spot.access_rule
     # empty rule, replace instead of add
     if old_rule is spot.__class__.access_rule:
         spot.access_rule = rule if combine == "and" else old_rule
+    # declarative rules merge into one flat rule instead of nesting
+    elif isinstance(rule, CompiledRule) and isinstance(old_rule, CompiledRule) and rule.player == old_rule.player:
+        spot.access_rule = old_rule.combine(rule, combine)
     else:
         if combine == "and":
             spot.access_rule = lambda state: rule(state) and old_rule(state)